@@ -0,0 +1,117 @@
+"""catalog search, category closure, compatibility and article lookup
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+Databases that ran ``create_all`` with these models before migrations were
+introduced may already contain some of these objects, so each step checks
+for them first.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def _inspector():
+    # Offline (--sql) runs cannot inspect and emit everything
+    if op.get_context().as_sql:
+        return None
+    return sa.inspect(op.get_bind())
+
+def _has_table(name: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(name)
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and column in {c['name'] for c in inspector.get_columns(table)}
+
+def _has_index(table: str, name: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and name in {i['name'] for i in inspector.get_indexes(table)}
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    if is_postgresql:
+        # Needed by the trigram index on products.sku_normalized
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Product specifications and article lookup key
+    if not _has_column('products', 'specifications'):
+        op.add_column('products', sa.Column(
+            'specifications', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True
+        ))
+    if not _has_column('products', 'sku_normalized'):
+        op.add_column('products', sa.Column('sku_normalized', sa.String(), nullable=True))
+    if not _has_index('products', 'ix_products_sku_normalized'):
+        op.create_index('ix_products_sku_normalized', 'products', ['sku_normalized'])
+    if is_postgresql and not _has_index('products', 'ix_products_sku_normalized_trgm'):
+        op.create_index(
+            'ix_products_sku_normalized_trgm', 'products', ['sku_normalized'],
+            postgresql_using='gin', postgresql_ops={'sku_normalized': 'gin_trgm_ops'},
+        )
+
+    if not _has_index('product_category', 'ix_product_category_category_product'):
+        op.create_index('ix_product_category_category_product', 'product_category', ['category_id', 'product_id'])
+
+    # Full-text search documents
+    if not _has_table('product_search'):
+        op.create_table(
+            'product_search',
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('document', sa.Text(), nullable=False),
+            sa.Column('search_vector', postgresql.TSVECTOR().with_variant(sa.Text(), 'sqlite'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('product_id'),
+        )
+    if is_postgresql and not _has_index('product_search', 'ix_product_search_vector'):
+        op.create_index('ix_product_search_vector', 'product_search', ['search_vector'], postgresql_using='gin')
+
+    # Category hierarchy closure table
+    if not _has_table('category_closure'):
+        op.create_table(
+            'category_closure',
+            sa.Column('ancestor_id', sa.Integer(), nullable=False),
+            sa.Column('descendant_id', sa.Integer(), nullable=False),
+            sa.Column('depth', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+        )
+        op.create_index('ix_category_closure_descendant', 'category_closure', ['descendant_id'])
+
+    # Machine compatibility index
+    if not _has_table('product_compatibility'):
+        op.create_table(
+            'product_compatibility',
+            sa.Column('machine_key', sa.String(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('machine_model', sa.String(), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('machine_key', 'product_id'),
+        )
+        op.create_index('ix_product_compatibility_product_id', 'product_compatibility', ['product_id'])
+    if is_postgresql and not _has_index('product_compatibility', 'ix_product_compatibility_key_pattern'):
+        op.create_index(
+            'ix_product_compatibility_key_pattern', 'product_compatibility', ['machine_key'],
+            postgresql_ops={'machine_key': 'text_pattern_ops'},
+        )
+
+def downgrade() -> None:
+    op.drop_table('product_compatibility')
+    op.drop_table('category_closure')
+    op.drop_table('product_search')
+    op.drop_index('ix_product_category_category_product', table_name='product_category')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_products_sku_normalized_trgm', table_name='products')
+    op.drop_index('ix_products_sku_normalized', table_name='products')
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('sku_normalized')
+        batch_op.drop_column('specifications')
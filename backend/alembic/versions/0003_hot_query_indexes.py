@@ -0,0 +1,66 @@
+"""composite indexes for the hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+Each index matches the WHERE / ORDER BY of an endpoint:
+
+* catalog: equality filters (seller, brand, condition, is_active) with the
+  default id order; price ranges and price / date keyset pages
+* orders: a buyer's orders newest first, optionally by status; order items
+  loaded per order and joined per product
+* chats and messages: a user's chats on either side, a chat's messages
+* notifications: listing, unread-only listing and the unread counter
+* product_category: both directions of the association, plus per-product
+  images and reviews loaded for product responses
+
+Use ``python -m app.db.query_plans`` to check that the planner picks them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_products_seller_id_id', 'products', ['seller_id', 'id']),
+    ('ix_products_brand_id', 'products', ['brand', 'id']),
+    ('ix_products_condition_id', 'products', ['condition', 'id']),
+    ('ix_products_is_active_id', 'products', ['is_active', 'id']),
+    ('ix_products_price_id', 'products', ['price', 'id']),
+    ('ix_products_created_at_id', 'products', ['created_at', 'id']),
+    ('ix_product_category_product_category', 'product_category', ['product_id', 'category_id']),
+    ('ix_product_images_product_id', 'product_images', ['product_id']),
+    ('ix_reviews_product_id', 'reviews', ['product_id']),
+    ('ix_orders_buyer_created', 'orders', ['buyer_id', 'created_at', 'id']),
+    ('ix_orders_buyer_status_created', 'orders', ['buyer_id', 'status', 'created_at', 'id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_product_id', 'order_items', ['product_id']),
+    ('ix_chats_buyer_created', 'chats', ['buyer_id', 'created_at', 'id']),
+    ('ix_chats_seller_created', 'chats', ['seller_id', 'created_at', 'id']),
+    ('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'id']),
+    ('ix_notifications_user_read_created', 'notifications', ['user_id', 'is_read', 'created_at']),
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at']),
+]
+
+def _existing_indexes(table: str) -> set:
+    if op.get_context().as_sql:
+        return set()
+    return {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+def upgrade() -> None:
+    existing = {}
+    for name, table, columns in INDEXES:
+        if table not in existing:
+            existing[table] = _existing_indexes(table)
+        # Skip indexes already created by create_all on pre-migration databases
+        if name not in existing[table]:
+            op.create_index(name, table, columns)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
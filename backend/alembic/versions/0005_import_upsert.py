@@ -0,0 +1,28 @@
+"""incremental re-import by seller and SKU
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 12:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('content_hash', sa.String(length=40), nullable=True))
+    op.add_column('import_jobs', sa.Column('upsert', sa.Boolean(), server_default=sa.false(), nullable=False))
+    for column in ('inserted_count', 'updated_count', 'unchanged_count'):
+        op.add_column('import_jobs', sa.Column(column, sa.Integer(), server_default='0', nullable=False))
+
+def downgrade() -> None:
+    with op.batch_alter_table('import_jobs') as batch_op:
+        for column in ('unchanged_count', 'updated_count', 'inserted_count', 'upsert'):
+            batch_op.drop_column(column)
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('content_hash')
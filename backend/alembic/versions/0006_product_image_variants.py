@@ -0,0 +1,28 @@
+"""uploaded product images with resized variants
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('product_images', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('product_images', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('product_images', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('product_images', sa.Column('variants', sa.JSON(), nullable=True))
+    op.create_index('ix_product_images_content_hash', 'product_images', ['content_hash'])
+
+def downgrade() -> None:
+    op.drop_index('ix_product_images_content_hash', table_name='product_images')
+    with op.batch_alter_table('product_images') as batch_op:
+        for column in ('variants', 'height', 'width', 'content_hash'):
+            batch_op.drop_column(column)
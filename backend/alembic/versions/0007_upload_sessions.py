@@ -0,0 +1,57 @@
+"""resumable price list uploads
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('UPLOADING', 'ASSEMBLING', 'COMPLETED', 'ABORTED', name='uploadstatus'),
+            nullable=False,
+        ),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('part_size', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('upsert', sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('import_job_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['import_job_id'], ['import_jobs.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_upload_sessions_id', 'upload_sessions', ['id'])
+    op.create_index('ix_upload_sessions_seller_created', 'upload_sessions', ['seller_id', 'created_at'])
+    op.create_index('ix_upload_sessions_status_expires', 'upload_sessions', ['status', 'expires_at'])
+
+    op.create_table(
+        'upload_parts',
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('session_id', 'number'),
+    )
+
+def downgrade() -> None:
+    op.drop_table('upload_parts')
+    op.drop_table('upload_sessions')
+    sa.Enum(name='uploadstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,40 @@
+"""seller order inbox
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 17:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('order_items', sa.Column('seller_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE order_items SET seller_id = "
+        "(SELECT products.seller_id FROM products WHERE products.id = order_items.product_id)"
+    )
+    # The inbox pages by the order's creation time; items were written in
+    # the same transaction, so this only aligns the microseconds.
+    op.execute(
+        "UPDATE order_items SET created_at = "
+        "(SELECT orders.created_at FROM orders WHERE orders.id = order_items.order_id)"
+    )
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.alter_column('seller_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_order_items_seller_id_users', 'users', ['seller_id'], ['id'])
+    op.create_index(
+        'ix_order_items_seller_created', 'order_items', ['seller_id', 'created_at', 'order_id']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_seller_created', table_name='order_items')
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_constraint('fk_order_items_seller_id_users', type_='foreignkey')
+        batch_op.drop_column('seller_id')
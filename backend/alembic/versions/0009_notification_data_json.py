@@ -0,0 +1,29 @@
+"""notification data as JSON
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:50:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.alter_column(
+            'data', existing_type=sa.String(), type_=sa.JSON(), existing_nullable=True,
+            postgresql_using='data::json',
+        )
+
+def downgrade() -> None:
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.alter_column(
+            'data', existing_type=sa.JSON(), type_=sa.String(), existing_nullable=True,
+            postgresql_using='data::text',
+        )
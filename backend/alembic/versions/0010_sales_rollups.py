@@ -0,0 +1,66 @@
+"""daily sales rollups
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 18:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily_product',
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('seller_id', 'day', 'product_id'),
+    )
+    op.create_table(
+        'sales_daily_status',
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column(
+            'status',
+            # The type already exists for orders.status
+            postgresql.ENUM(
+                'PENDING', 'PAID', 'SHIPPED', 'DELIVERED', 'CANCELLED', 'REFUNDED',
+                name='orderstatus', create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('seller_id', 'day', 'status'),
+    )
+    # Existing orders; later ones are added as they are placed
+    op.execute(
+        "INSERT INTO sales_daily_product (seller_id, day, product_id, quantity, revenue) "
+        "SELECT order_items.seller_id, date(orders.created_at), order_items.product_id, "
+        "sum(order_items.quantity), sum(order_items.price * order_items.quantity) "
+        "FROM order_items JOIN orders ON orders.id = order_items.order_id "
+        "GROUP BY order_items.seller_id, date(orders.created_at), order_items.product_id"
+    )
+    op.execute(
+        "INSERT INTO sales_daily_status (seller_id, day, status, orders, revenue) "
+        "SELECT order_items.seller_id, date(orders.created_at), orders.status, "
+        "count(DISTINCT orders.id), sum(order_items.price * order_items.quantity) "
+        "FROM order_items JOIN orders ON orders.id = order_items.order_id "
+        "GROUP BY order_items.seller_id, date(orders.created_at), orders.status"
+    )
+
+def downgrade() -> None:
+    op.drop_table('sales_daily_status')
+    op.drop_table('sales_daily_product')
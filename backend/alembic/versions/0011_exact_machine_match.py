@@ -0,0 +1,26 @@
+"""match machine models exactly
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 10:20:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Keys are matched by equality, which the primary key serves
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_product_compatibility_key_pattern', table_name='product_compatibility')
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index(
+            'ix_product_compatibility_key_pattern', 'product_compatibility', ['machine_key'],
+            postgresql_ops={'machine_key': 'text_pattern_ops'},
+        )
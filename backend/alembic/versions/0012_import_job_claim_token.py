@@ -0,0 +1,22 @@
+"""import job claim token
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('import_jobs', sa.Column('claim_token', sa.String(length=32), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('import_jobs') as batch_op:
+        batch_op.drop_column('claim_token')
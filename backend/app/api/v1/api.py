@@ -1,12 +1,11 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, products, orders, reviews, messages, notifications
+from app.api.v1.endpoints import auth, products, orders, chat, notifications, analytics
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
-api_router.include_router(reviews.router, prefix="/reviews", tags=["reviews"])
-api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"]) 
\ No newline at end of file
+api_router.include_router(chat.router, prefix="/chats", tags=["chats"])
+api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(analytics.router, tags=["analytics"])
\ No newline at end of file
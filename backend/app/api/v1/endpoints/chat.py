@@ -1,7 +1,10 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_active_user
+from app.core.idempotency import idempotency
+from app.db.loaders import with_loaders
+from app.db.pagination import paginate
 from app.models.user import User
 from app.models.chat import Chat, Message
 from app.schemas.chat import (
@@ -38,21 +41,23 @@ def list_chats(
     *,
     db: Session = Depends(get_db),
     filter: ChatFilter = Depends(),
+    response: Response,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve chats with filtering and pagination.
     """
-    query = db.query(Chat).filter(
+    query = with_loaders(db.query(Chat), Chat, ChatSchema).filter(
         (Chat.buyer_id == current_user.id) | (Chat.seller_id == current_user.id)
     )
     
     if filter.product_id:
         query = query.filter(Chat.product_id == filter.product_id)
     
-    # Apply pagination
-    total = query.count()
-    chats = query.offset((filter.page - 1) * filter.per_page).limit(filter.per_page).all()
+    chats = paginate(
+        query, filter, response,
+        sort_column=Chat.created_at, id_column=Chat.id, descending=True,
+    )
     
     return chats
 
@@ -111,26 +116,31 @@ def create_message(
     chat_id: int,
     message_in: MessageCreate,
     current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ) -> Any:
     """
-    Create new message.
+    Create new message. A repeated request with the same
+    ``Idempotency-Key`` returns the first message instead of posting again.
     """
     chat = db.query(Chat).filter(Chat.id == chat_id).first()
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
     if chat.buyer_id != current_user.id and chat.seller_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    message = Message(
-        chat_id=chat_id,
-        user_id=current_user.id,
-        content=message_in.content
-    )
-    
-    db.add(message)
-    db.commit()
-    db.refresh(message)
-    return message
+
+    with idempotency(idempotency_key, f"messages:{current_user.id}:{chat_id}", message_in) as request:
+        if request.replay is not None:
+            return request.replay
+        message = Message(
+            chat_id=chat_id,
+            user_id=current_user.id,
+            content=message_in.content
+        )
+
+        db.add(message)
+        db.commit()
+        db.refresh(message)
+        return request.save(MessageSchema.model_validate(message).model_dump(mode="json"))
 
 @router.websocket("/ws/{chat_id}")
 async def websocket_endpoint(
@@ -1,15 +1,32 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_db, get_current_active_user, get_current_active_seller
+from app.db.loaders import with_loaders
+from app.db.pagination import paginate
+from app.core.idempotency import idempotency
+from app.services.analytics import invalidate_seller_analytics
+from app.services.autocomplete import autocomplete_index
+from app.services.order_status import bulk_update_orders
+from app.services.product_cache import invalidate_products
+from app.services.sales_rollups import record_new_orders, record_status_changes
+from app.services.stock import lock_products, order_quantities, release_stock, reserve_stock
+from app.services.stock_holds import create_hold, get_hold, release_hold
 from app.models.user import User
 from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import Product
 from app.schemas.order import (
+    BulkOrderStatusUpdate,
     Order as OrderSchema,
+    OrderItem as OrderItemSchema,
     OrderCreate,
     OrderUpdate,
     OrderFilter,
+    OrderStatusChangeResult,
+    SellerOrder,
+    StockHold,
+    StockHoldCreate,
 )
 
 router = APIRouter()
@@ -19,12 +36,15 @@ def list_orders(
     *,
     db: Session = Depends(get_db),
     filter: OrderFilter = Depends(),
+    response: Response,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Retrieve orders with filtering and pagination.
     """
-    query = db.query(Order).filter(Order.buyer_id == current_user.id)
+    query = with_loaders(db.query(Order), Order, OrderSchema).filter(
+        Order.buyer_id == current_user.id
+    )
     
     if filter.status:
         query = query.filter(Order.status == filter.status)
@@ -33,9 +53,10 @@ def list_orders(
     if filter.end_date:
         query = query.filter(Order.created_at <= filter.end_date)
     
-    # Apply pagination
-    total = query.count()
-    orders = query.offset((filter.page - 1) * filter.per_page).limit(filter.per_page).all()
+    orders = paginate(
+        query, filter, response,
+        sort_column=Order.created_at, id_column=Order.id, descending=True,
+    )
     
     return orders
 
@@ -45,52 +66,216 @@ def create_order(
     db: Session = Depends(get_db),
     order_in: OrderCreate,
     current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ) -> Any:
     """
     Create new order.
+
+    The units come from a stock hold: the one taken at checkout
+    (``hold_id``) or, without one, a hold taken here, so orders never take
+    units other buyers hold. The ordered products are then locked in one
+    statement and their stock is taken in one conditional UPDATE, so
+    concurrent orders cannot oversell.
+
+    With an ``Idempotency-Key`` header, repeating the request returns the
+    order created by the first one instead of placing another.
     """
-    # Calculate total amount and validate products
-    total_amount = 0
-    order_items = []
-    
-    for item in order_in.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
-        if product.stock < item.quantity:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Not enough stock for product {product.name}"
-            )
-        
-        total_amount += product.price * item.quantity
-        order_items.append(
-            OrderItem(
-                product_id=product.id,
-                quantity=item.quantity,
-                price=product.price
+    with idempotency(idempotency_key, f"orders:{current_user.id}", order_in) as request:
+        if request.replay is not None:
+            return request.replay
+        order = _place_order(db, order_in, current_user)
+        return request.save(OrderSchema.model_validate(order).model_dump(mode="json"))
+
+def _place_order(db: Session, order_in: OrderCreate, current_user: User) -> Order:
+    quantities = order_quantities((item.product_id, item.quantity) for item in order_in.items)
+    if order_in.hold_id:
+        hold = get_hold(order_in.hold_id)
+        if hold is None or hold["user_id"] != current_user.id:
+            raise HTTPException(status_code=404, detail="Stock hold not found or expired")
+        if hold["items"] != quantities:
+            raise HTTPException(status_code=400, detail="Order items do not match the stock hold")
+        hold_id = order_in.hold_id
+    else:
+        try:
+            hold_id = create_hold(db, current_user.id, quantities)["id"]
+        except HTTPException as e:
+            if e.status_code != 409:
+                raise
+            raise HTTPException(status_code=400, detail=e.detail)
+
+    try:
+        products = lock_products(db, quantities)
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if not product:
+                raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+            if product.stock < quantity:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Not enough stock for product {product.name}"
+                )
+        reserve_stock(db, quantities)
+
+        # Calculate total amount
+        created_at = datetime.utcnow()
+        total_amount = 0
+        order_items = []
+        for item in order_in.items:
+            product = products[item.product_id]
+            total_amount += product.price * item.quantity
+            order_items.append(
+                OrderItem(
+                    product_id=product.id,
+                    seller_id=product.seller_id,
+                    quantity=item.quantity,
+                    price=product.price,
+                    created_at=created_at,
+                )
             )
+
+        # Create order
+        order = Order(
+            created_at=created_at,
+            buyer_id=current_user.id,
+            total_amount=total_amount,
+            shipping_address=order_in.shipping_address,
+            notes=order_in.notes,
+            items=order_items
         )
-    
-    # Create order
-    order = Order(
-        buyer_id=current_user.id,
-        total_amount=total_amount,
-        shipping_address=order_in.shipping_address,
-        notes=order_in.notes,
-        items=order_items
-    )
-    
-    # Update product stock
-    for item in order_items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        product.stock -= item.quantity
-    
-    db.add(order)
-    db.commit()
+
+        db.add(order)
+        db.flush()
+        sellers = record_new_orders(db, [order.id])
+        db.commit()
+    except BaseException:
+        # A checkout hold stays usable for another attempt until it expires
+        if not order_in.hold_id:
+            release_hold(hold_id)
+        raise
+
+    # Drop the cached stock levels before the held units are given back, so
+    # availability is never overstated in between
+    invalidate_products(quantities)
+    release_hold(hold_id)
+    invalidate_seller_analytics(sellers)
+    # Ordered units rank autocomplete suggestions
+    autocomplete_index.refresh_products(db, quantities)
     db.refresh(order)
     return order
 
+@router.post("/holds", response_model=StockHold, status_code=201)
+def create_stock_hold(
+    *,
+    db: Session = Depends(get_db),
+    hold_in: StockHoldCreate,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Hold stock for a checkout for STOCK_HOLD_TTL seconds. Pass the hold's id
+    as ``hold_id`` when creating the order.
+    """
+    quantities = order_quantities((item.product_id, item.quantity) for item in hold_in.items)
+    hold = create_hold(db, current_user.id, quantities)
+    return _hold_response(hold)
+
+@router.delete("/holds/{hold_id}")
+def release_stock_hold(
+    *,
+    hold_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Release a checkout's stock hold before it expires.
+    """
+    hold = get_hold(hold_id)
+    if hold is None or hold["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Stock hold not found or expired")
+    release_hold(hold_id)
+    return {"status": "success"}
+
+def _hold_response(hold: Dict[str, Any]) -> StockHold:
+    return StockHold(
+        id=hold["id"],
+        items=[
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, quantity in hold["items"].items()
+        ],
+        expires_at=datetime.utcfromtimestamp(hold["expires_at"]),
+    )
+
+@router.get("/seller/inbox", response_model=List[SellerOrder])
+def seller_inbox(
+    *,
+    db: Session = Depends(get_db),
+    filter: OrderFilter = Depends(),
+    response: Response,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Orders containing the current seller's products, newest first, with
+    only the seller's items.
+
+    Pages are read from the order items' (seller_id, created_at) index; the
+    orders themselves are loaded for the page only.
+    """
+    query = db.query(OrderItem.order_id, OrderItem.created_at).filter(
+        OrderItem.seller_id == current_user.id
+    )
+    if filter.status:
+        query = query.join(Order, Order.id == OrderItem.order_id).filter(Order.status == filter.status)
+    if filter.start_date:
+        query = query.filter(OrderItem.created_at >= filter.start_date)
+    if filter.end_date:
+        query = query.filter(OrderItem.created_at <= filter.end_date)
+    # One row per order however many of the seller's items it has
+    query = query.group_by(OrderItem.order_id, OrderItem.created_at)
+
+    page = paginate(
+        query, filter, response,
+        sort_column=OrderItem.created_at, id_column=OrderItem.order_id, descending=True,
+    )
+    order_ids = [row.order_id for row in page]
+    orders = {
+        order.id: order
+        for order in db.query(Order).filter(Order.id.in_(order_ids))
+    }
+    items: Dict[int, List[OrderItem]] = {order_id: [] for order_id in order_ids}
+    item_query = with_loaders(db.query(OrderItem), OrderItem, OrderItemSchema)
+    for item in item_query.filter(
+        OrderItem.order_id.in_(order_ids), OrderItem.seller_id == current_user.id
+    ).order_by(OrderItem.id):
+        items[item.order_id].append(item)
+
+    return [
+        SellerOrder(
+            id=order.id,
+            buyer_id=order.buyer_id,
+            status=order.status,
+            shipping_address=order.shipping_address,
+            notes=order.notes,
+            tracking_number=order.tracking_number,
+            created_at=order.created_at,
+            updated_at=order.updated_at,
+            seller_total=sum(item.price * item.quantity for item in items[order.id]),
+            items=items[order.id],
+        )
+        for order in (orders[order_id] for order_id in order_ids)
+    ]
+
+@router.post("/seller/status", response_model=List[OrderStatusChangeResult])
+def bulk_update_order_status(
+    *,
+    db: Session = Depends(get_db),
+    update_in: BulkOrderStatusUpdate,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Change the status and/or tracking number of many of the seller's
+    orders in one transaction. Only transitions in ALLOWED_TRANSITIONS are
+    applied; the result of every change is returned, in request order.
+    """
+    return bulk_update_orders(db, current_user.id, update_in.changes)
+
 @router.get("/{order_id}", response_model=OrderSchema)
 def get_order(
     *,
@@ -101,7 +286,9 @@ def get_order(
     """
     Get order by ID.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = with_loaders(db.query(Order), Order, OrderSchema).filter(
+        Order.id == order_id
+    ).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     if order.buyer_id != current_user.id:
@@ -119,20 +306,24 @@ def update_order(
     """
     Update order status.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Locked, so the sales rollups move the order from the status it really had
+    order = db.query(Order).filter(Order.id == order_id).with_for_update().first()
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     if order.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
     # Only allow status updates
+    sellers = set()
     if order_in.status:
+        sellers = record_status_changes(db, {order.id: (order.status, order_in.status)})
         order.status = order_in.status
     if order_in.tracking_number:
         order.tracking_number = order_in.tracking_number
     
     db.add(order)
     db.commit()
+    invalidate_seller_analytics(sellers)
     db.refresh(order)
     return order
 
@@ -153,13 +344,23 @@ def cancel_order(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     if order.status != OrderStatus.PENDING:
         raise HTTPException(status_code=400, detail="Can only cancel pending orders")
-    
+
+    # Conditional, so that two concurrent cancels restore stock only once
+    cancelled = db.execute(
+        update(Order)
+        .where(Order.id == order.id, Order.status == OrderStatus.PENDING)
+        .values(status=OrderStatus.CANCELLED, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Can only cancel pending orders")
+    sellers = record_status_changes(db, {order.id: (OrderStatus.PENDING, OrderStatus.CANCELLED)})
+
     # Restore product stock
-    for item in order.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        product.stock += item.quantity
-    
-    order.status = OrderStatus.CANCELLED
-    db.add(order)
+    product_ids = [item.product_id for item in order.items]
+    release_stock(db, order_quantities((item.product_id, item.quantity) for item in order.items))
     db.commit()
-    return {"status": "success"} 
\ No newline at end of file
+    invalidate_products(product_ids)
+    invalidate_seller_analytics(sellers)
+    return {"status": "success"}
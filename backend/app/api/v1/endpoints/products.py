@@ -1,72 +1,237 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, UploadFile, File, Form, Response
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_active_user, get_current_active_seller
-from app.models.user import User
+from app.api.deps import (
+    get_db,
+    get_current_active_user,
+    get_current_active_seller,
+    get_current_active_admin,
+)
+from app.core.config import get_settings
+from app.core.idempotency import fingerprint, idempotency
+from app.core.http_cache import (
+    compute_etag,
+    http_now,
+    is_not_modified,
+    not_modified_response,
+    validator_headers,
+)
+from app.db.loaders import with_loaders
+from app.db.pagination import paginate
+from app.models.user import User, UserRole
 from app.models.product import Product, Category, ProductImage
+from app.models.import_job import ImportJob, ImportJobError
+from app.models.upload import UploadSession
 from app.schemas.product import (
     Product as ProductSchema,
+    ProductImage as ProductImageSchema,
     ProductCreate,
     ProductUpdate,
     ProductFilter,
+    ProductFacets,
+    ArticleMatch,
+    AutocompleteSuggestion,
+    StockAvailability,
     Category as CategorySchema,
     CategoryCreate,
     CategoryUpdate,
+    CategoryTreeNode,
+)
+from app.schemas.import_job import ImportJob as ImportJobSchema, ImportJobDetail
+from app.schemas.upload import (
+    UploadPart as UploadPartSchema,
+    UploadSession as UploadSessionSchema,
+    UploadSessionCreate,
 )
-from sqlalchemy import or_
+from app.services.product_cache import (
+    cache_product,
+    cache_stats,
+    get_cached_product,
+    invalidate_category,
+    invalidate_products,
+)
+from app.services.articles import lookup_articles
+from app.services.autocomplete import autocomplete_index
+from app.services.catalog import filter_products
+from app.services.categories import add_to_closure, category_tree, move_in_closure
+from app.services.compatibility import sync_compatibility
+from app.services.facets import get_facets
+from app.services.images import ingest_image
+from app.services.import_jobs import submit_import
+from app.services.product_export import EXPORT_FORMATS, export_products
+from app.services.product_import import import_products
+from app.services.search import index_products, remove_products
+from app.services.stock_holds import stock_availability
+from app.services.uploads import abort_upload, complete_upload, create_upload, store_part
 import pandas as pd
 from io import BytesIO
-from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 router = APIRouter()
+settings = get_settings()
+
+# Product columns that are NOT NULL and can back keyset pagination
+KEYSET_SORT_COLUMNS = {"id", "name", "price", "created_at", "updated_at"}
+
+def _product_page(db: Session, request: Request, filter: ProductFilter, response: Response) -> Response:
+    """
+    A page of the products matching ``filter``, served from the product
+    cache, so only the page's ids and sort keys come from the query. The
+    ETag covers the page's product ETags and pagination headers; a matching
+    If-None-Match gets a 304.
+    """
+    query, rank = filter_products(db, db.query(Product.id), filter)
+    
+    # Apply sorting; NOT NULL columns are paged by keyset, the rest by offset
+    sort_column = None
+    descending = filter.sort_order == "desc"
+    if rank is not None and filter.sort_by in (None, "relevance"):
+        query = query.order_by(rank.desc(), Product.id)
+    elif filter.sort_by in KEYSET_SORT_COLUMNS or filter.sort_by is None:
+        sort_column = getattr(Product, filter.sort_by or "id")
+        if sort_column is not Product.id:
+            # The cursor holds the last row's sort key
+            query = query.add_columns(sort_column)
+    else:
+        legacy_column = getattr(Product, filter.sort_by, None)
+        if legacy_column is not None:
+            if descending:
+                query = query.order_by(legacy_column.desc(), Product.id.desc())
+            else:
+                query = query.order_by(legacy_column.asc(), Product.id.asc())
+    
+    products = paginate(
+        query, filter, response,
+        sort_column=sort_column, id_column=Product.id, descending=descending,
+    )
+
+    entries = {product.id: get_cached_product(product.id) for product in products}
+    missing = [product_id for product_id, entry in entries.items() if entry is None]
+    if missing:
+        loaded = with_loaders(db.query(Product), Product, ProductSchema).filter(
+            Product.id.in_(missing)
+        )
+        for product in loaded:
+            entries[product.id] = cache_product(product)
+    entries = [entries[product.id] for product in products]
+
+    pagination = {
+        name: value for name, value in response.headers.items() if name.startswith("x-")
+    }
+    headers = {
+        **pagination,
+        **validator_headers(compute_etag([[entry["etag"] for entry in entries], pagination])),
+    }
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    return JSONResponse(content=[entry["payload"] for entry in entries], headers=headers)
 
 @router.get("/", response_model=List[ProductSchema])
 def list_products(
     *,
     db: Session = Depends(get_db),
+    request: Request,
     filter: ProductFilter = Depends(),
+    response: Response,
 ) -> Any:
     """
     Retrieve products with filtering and pagination.
     """
-    query = db.query(Product)
-    
-    if filter.category_id:
-        query = query.filter(Product.categories.any(Category.id == filter.category_id))
-    if filter.min_price is not None:
-        query = query.filter(Product.price >= filter.min_price)
-    if filter.max_price is not None:
-        query = query.filter(Product.price <= filter.max_price)
-    if filter.brand:
-        query = query.filter(Product.brand == filter.brand)
-    if filter.condition:
-        query = query.filter(Product.condition == filter.condition)
-    if filter.search:
-        search = f"%{filter.search}%"
-        query = query.filter(
-            or_(
-                Product.name.ilike(search),
-                Product.description.ilike(search),
-                Product.sku.ilike(search),
-                Product.brand.ilike(search),
-                Product.model.ilike(search),
-            )
-        )
-    
-    # Apply sorting
-    if filter.sort_by:
-        sort_column = getattr(Product, filter.sort_by, None)
-        if sort_column is not None:
-            if filter.sort_order == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Apply pagination
-    total = query.count()
-    products = query.offset((filter.page - 1) * filter.per_page).limit(filter.per_page).all()
-    
-    return products
+    return _product_page(db, request, filter, response)
+
+@router.get("/facets", response_model=ProductFacets)
+def get_product_facets(
+    *,
+    db: Session = Depends(get_db),
+    filter: ProductFilter = Depends(),
+) -> Any:
+    """
+    Brand, condition, category and price-range counts for a product filter.
+    """
+    return get_facets(db, filter)
+
+@router.get("/compatible", response_model=List[ProductSchema])
+def list_compatible_products(
+    *,
+    db: Session = Depends(get_db),
+    request: Request,
+    filter: ProductFilter = Depends(),
+    response: Response,
+) -> Any:
+    """
+    Retrieve parts that fit the machine model given in ``machine``.
+    """
+    if not filter.machine or not filter.machine.strip():
+        raise HTTPException(status_code=400, detail="machine is required")
+    return _product_page(db, request, filter, response)
+
+@router.get("/lookup", response_model=List[ArticleMatch])
+def lookup_by_article(
+    *,
+    db: Session = Depends(get_db),
+    article: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+) -> Any:
+    """
+    Find products by article number (SKU), tolerating separators, case and
+    typos. Exact matches come first.
+    """
+    return lookup_articles(db, article, limit)
+
+@router.get("/autocomplete", response_model=List[AutocompleteSuggestion])
+def autocomplete(
+    *,
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=20),
+) -> Any:
+    """
+    Typeahead suggestions for the search box: product names, SKUs, brands
+    and models starting with ``q``, most popular first.
+    """
+    return autocomplete_index.suggest(db, q, limit)
+
+@router.get("/availability", response_model=List[StockAvailability])
+def get_stock_availability(
+    *,
+    db: Session = Depends(get_db),
+    ids: List[int] = Query(..., max_length=100),
+) -> Any:
+    """
+    Available-to-sell units (stock minus checkout holds) of the given
+    products, served from the stock hold store.
+    """
+    return stock_availability(db, list(dict.fromkeys(ids)))
+
+@router.get("/export")
+def export_catalog(
+    *,
+    format: str = Query("csv", description="csv, xlsx or parquet"),
+    seller_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download the catalog in the bulk upload layout. Sellers export their
+    own products; admins export one seller's or, without ``seller_id``,
+    every product.
+    """
+    if current_user.role == UserRole.SELLER:
+        if seller_id is not None and seller_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        seller_id = current_user.id
+    elif current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    body = export_products(format, seller_id)
+    filename = f"products_{seller_id}" if seller_id is not None else "products"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{format}"}
+    )
 
 @router.post("/", response_model=ProductSchema)
 def create_product(
@@ -89,27 +254,53 @@ def create_product(
     
     # Add images
     if product_in.images:
-        images = [ProductImage(**img.dict(), product=product) for img in product_in.images]
+        images = [ProductImage(**img.model_dump(mode="json"), product=product) for img in product_in.images]
         product.images = images
     
     db.add(product)
+    db.flush()
+    sync_compatibility(db, [product])
+    index_products(db, [product.id])
     db.commit()
+    autocomplete_index.refresh_products(db, [product.id])
     db.refresh(product)
     return product
 
+@router.get("/cache/stats")
+def get_product_cache_stats(
+    current_user: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    Product cache hit/miss counters for this worker.
+    """
+    return cache_stats()
+
 @router.get("/{product_id}", response_model=ProductSchema)
 def get_product(
     *,
     db: Session = Depends(get_db),
+    request: Request,
     product_id: int,
 ) -> Any:
     """
-    Get product by ID.
+    Get product by ID. Supports If-None-Match and If-Modified-Since; a
+    cached product is answered without touching the database.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    entry = get_cached_product(product_id)
+    if entry is None:
+        product = with_loaders(db.query(Product), Product, ProductSchema).filter(
+            Product.id == product_id
+        ).first()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        entry = cache_product(product)
+    # Last-Modified is when the entry was built, so it only moves forward
+    last_modified = datetime.fromisoformat(entry["modified"])
+    headers = validator_headers(entry["etag"], last_modified)
+    if is_not_modified(request, entry["etag"], last_modified):
+        return not_modified_response(headers)
+    # The payload is already a serialized ProductSchema
+    return JSONResponse(content=entry["payload"], headers=headers)
 
 @router.put("/{product_id}", response_model=ProductSchema)
 def update_product(
@@ -139,17 +330,81 @@ def update_product(
     
     # Update images if provided
     if product_in.images is not None:
+        # Uploaded images that are kept keep their variants
+        stored = {
+            row.url: {
+                "content_hash": row.content_hash,
+                "width": row.width,
+                "height": row.height,
+                "variants": row.variants,
+            }
+            for row in db.query(
+                ProductImage.url, ProductImage.content_hash, ProductImage.width,
+                ProductImage.height, ProductImage.variants,
+            ).filter(ProductImage.product_id == product.id, ProductImage.content_hash.isnot(None))
+        }
         # Remove existing images
         db.query(ProductImage).filter(ProductImage.product_id == product.id).delete()
         # Add new images
-        images = [ProductImage(**img.dict(), product=product) for img in product_in.images]
+        images = [
+            ProductImage(**img.model_dump(mode="json"), **stored.get(str(img.url), {}), product=product)
+            for img in product_in.images
+        ]
         product.images = images
     
     db.add(product)
+    db.flush()
+    sync_compatibility(db, [product])
+    index_products(db, [product.id])
     db.commit()
+    invalidate_products([product.id])
+    autocomplete_index.refresh_products(db, [product.id])
     db.refresh(product)
     return product
 
+@router.post("/{product_id}/images", response_model=ProductImageSchema)
+def upload_product_image(
+    *,
+    db: Session = Depends(get_db),
+    product_id: int,
+    file: UploadFile = File(...),
+    alt_text: Optional[str] = Form(None),
+    is_primary: bool = Form(False),
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Upload an image for a product. The original and its resized JPEG and
+    WebP variants (IMAGE_SIZES) are stored by content hash.
+    """
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    if product.seller_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    data = file.file.read(settings.IMAGE_MAX_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image is larger than {settings.IMAGE_MAX_BYTES // (1024 * 1024)} MB"
+        )
+
+    image = ProductImage(
+        **ingest_image(db, data),
+        alt_text=alt_text,
+        is_primary=is_primary,
+        product_id=product.id,
+    )
+    if is_primary:
+        db.query(ProductImage).filter(ProductImage.product_id == product.id).update(
+            {ProductImage.is_primary: False}, synchronize_session=False
+        )
+    db.add(image)
+    db.commit()
+    invalidate_products([product.id])
+    db.refresh(image)
+    return image
+
 @router.delete("/{product_id}")
 def delete_product(
     *,
@@ -166,8 +421,11 @@ def delete_product(
     if product.seller_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
+    remove_products(db, [product.id])
     db.delete(product)
     db.commit()
+    invalidate_products([product_id])
+    autocomplete_index.refresh_products(db, [product_id])
     return {"status": "success"}
 
 # Category endpoints
@@ -175,12 +433,26 @@ def delete_product(
 def list_categories(
     *,
     db: Session = Depends(get_db),
+    request: Request,
 ) -> Any:
     """
     Retrieve all categories.
     """
-    categories = db.query(Category).all()
-    return categories
+    categories, etag, last_modified = category_tree.validated_categories(db)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+    return JSONResponse(content=categories, headers=headers)
+
+@router.get("/categories/tree", response_model=List[CategoryTreeNode])
+def get_category_tree(
+    *,
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Retrieve the category hierarchy.
+    """
+    return category_tree.tree(db)
 
 @router.post("/categories/", response_model=CategorySchema)
 def create_category(
@@ -192,9 +464,14 @@ def create_category(
     """
     Create new category.
     """
+    if category_in.parent_id is not None and not db.get(Category, category_in.parent_id):
+        raise HTTPException(status_code=404, detail="Parent category not found")
     category = Category(**category_in.dict())
     db.add(category)
+    db.flush()
+    add_to_closure(db, category)
     db.commit()
+    category_tree.invalidate()
     db.refresh(category)
     return category
 
@@ -213,11 +490,18 @@ def update_category(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
+    if category_in.parent_id != category.parent_id:
+        if category_in.parent_id is not None and not db.get(Category, category_in.parent_id):
+            raise HTTPException(status_code=404, detail="Parent category not found")
+        move_in_closure(db, category, category_in.parent_id)
+    
     for field, value in category_in.dict().items():
         setattr(category, field, value)
     
     db.add(category)
     db.commit()
+    category_tree.invalidate()
+    invalidate_category(db, category.id)
     db.refresh(category)
     return category
 
@@ -226,10 +510,17 @@ def bulk_upload_products(
     *,
     db: Session = Depends(get_db),
     file: UploadFile = File(...),
+    upsert: bool = False,
     current_user: User = Depends(get_current_active_seller),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ) -> Any:
     """
     Bulk upload products from Excel/CSV file.
+
+    With ``upsert`` rows whose SKU the seller already has update that
+    product if anything changed, instead of failing as duplicates. A
+    repeated upload with the same ``Idempotency-Key`` returns the first
+    upload's result without importing the file again.
     """
     if not file.filename.endswith(('.xlsx', '.csv')):
         raise HTTPException(
@@ -237,85 +528,28 @@ def bulk_upload_products(
             detail="Only Excel (.xlsx) and CSV (.csv) files are supported"
         )
 
-    try:
-        # Read file content
-        content = await file.read()
-        if file.filename.endswith('.xlsx'):
-            df = pd.read_excel(content)
-        else:
-            df = pd.read_csv(content)
-
-        # Validate required columns
-        required_columns = ['name', 'description', 'price', 'stock', 'category_ids']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
+    payload = None
+    if idempotency_key is not None:
+        payload = {"filename": file.filename, "upsert": upsert, "file": fingerprint(file.file)}
+    with idempotency(idempotency_key, f"bulk-upload:{current_user.id}", payload) as request:
+        if request.replay is not None:
+            return request.replay
+        try:
+            result = import_products(db, file.file, file.filename, current_user.id, upsert=upsert)
+        except HTTPException:
+            raise
+        except Exception as e:
             raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
+                status_code=500,
+                detail=f"Error processing file: {str(e)}"
             )
+        return request.save(jsonable_encoder(result))
 
-        # Process products
-        success_count = 0
-        failed_count = 0
-        errors = []
-
-        for index, row in df.iterrows():
-            try:
-                # Convert category_ids string to list
-                category_ids = [int(id.strip()) for id in str(row['category_ids']).split(',')]
-                
-                # Create product
-                product = Product(
-                    name=row['name'],
-                    description=row['description'],
-                    price=float(row['price']),
-                    stock=int(row['stock']),
-                    seller_id=current_user.id,
-                    brand=row.get('brand', ''),
-                    model=row.get('model', ''),
-                    condition=row.get('condition', 'new'),
-                    sku=row.get('sku', ''),
-                )
-
-                # Add categories
-                categories = db.query(Category).filter(Category.id.in_(category_ids)).all()
-                product.categories = categories
-
-                # Add images if provided
-                if 'images' in row and pd.notna(row['images']):
-                    image_urls = [url.strip() for url in str(row['images']).split(',')]
-                    images = [ProductImage(url=url, product=product) for url in image_urls]
-                    product.images = images
-
-                db.add(product)
-                success_count += 1
-
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Row {index + 2}: {str(e)}")
-
-        db.commit()
-
-        return {
-            "success": success_count,
-            "failed": failed_count,
-            "errors": errors
-        }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error processing file: {str(e)}"
-        )
+# Fixed so that every worker builds byte-identical files with the same ETag
+TEMPLATE_CREATED = datetime(2024, 1, 1)
 
-@router.get("/bulk-upload/template")
-def get_bulk_upload_template(
-    *,
-    db: Session = Depends(get_db),
-) -> Any:
-    """
-    Get template file for bulk product upload.
-    """
+@lru_cache()
+def _bulk_upload_template() -> Tuple[bytes, str, datetime]:
     # Create sample data
     data = {
         'name': ['Sample Product 1', 'Sample Product 2'],
@@ -341,6 +575,7 @@ def get_bulk_upload_template(
         # Get workbook and worksheet objects
         workbook = writer.book
         worksheet = writer.sheets['Products']
+        workbook.set_properties({'created': TEMPLATE_CREATED})
 
         # Add some formatting
         header_format = workbook.add_format({
@@ -354,11 +589,159 @@ def get_bulk_upload_template(
             worksheet.write(0, col_num, value, header_format)
             worksheet.set_column(col_num, col_num, 15)
 
-    output.seek(0)
-    return StreamingResponse(
-        output,
+    content = output.getvalue()
+    return content, compute_etag(content), http_now()
+
+@router.get("/bulk-upload/template")
+def get_bulk_upload_template(
+    *,
+    request: Request,
+) -> Any:
+    """
+    Get template file for bulk product upload. The file is built once per
+    worker.
+    """
+    content, etag, last_modified = _bulk_upload_template()
+    headers = validator_headers(etag, last_modified, cache_control="public, max-age=86400")
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+    return Response(
+        content=content,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
+            **headers,
             "Content-Disposition": "attachment; filename=product_template.xlsx"
         }
-    ) 
\ No newline at end of file
+    )
+
+@router.post("/import-jobs", response_model=ImportJobSchema, status_code=202)
+def create_import_job(
+    *,
+    db: Session = Depends(get_db),
+    file: UploadFile = File(...),
+    upsert: bool = False,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Queue a bulk upload (same file format as /bulk-upload) to run in the
+    background. Poll /import-jobs/{job_id} for its progress.
+    """
+    if not file.filename.endswith(('.xlsx', '.csv')):
+        raise HTTPException(
+            status_code=400,
+            detail="Only Excel (.xlsx) and CSV (.csv) files are supported"
+        )
+    return submit_import(db, file.file, file.filename, current_user.id, upsert=upsert)
+
+@router.get("/import-jobs/{job_id}", response_model=ImportJobDetail)
+def get_import_job(
+    *,
+    db: Session = Depends(get_db),
+    job_id: int,
+    errors_after_row: int = 0,
+    errors_limit: int = Query(100, ge=0, le=1000),
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Import job status and progress, with row errors after ``errors_after_row``.
+    """
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.seller_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    errors = db.query(ImportJobError).filter(
+        ImportJobError.job_id == job.id,
+        ImportJobError.row > errors_after_row,
+    ).order_by(ImportJobError.row).limit(errors_limit).all()
+    return ImportJobDetail(
+        **ImportJobSchema.model_validate(job).model_dump(),
+        errors=[{"row": error.row, "message": error.message} for error in errors],
+    )
+# Resumable uploads: create a session, PUT its parts in any order (again
+# after a failure), then complete it to queue an import job.
+def _get_upload(db: Session, upload_id: int, current_user: User) -> UploadSession:
+    upload = db.query(UploadSession).filter(UploadSession.id == upload_id).first()
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if upload.seller_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return upload
+
+@router.post("/uploads", response_model=UploadSessionSchema, status_code=201)
+def create_upload_session(
+    *,
+    db: Session = Depends(get_db),
+    upload_in: UploadSessionCreate,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Start a resumable upload of a price list. The response tells the client
+    the part size and number of parts to send.
+    """
+    return create_upload(
+        db,
+        seller_id=current_user.id,
+        filename=upload_in.filename,
+        size=upload_in.size,
+        sha256=upload_in.sha256,
+        upsert=upload_in.upsert,
+    )
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionSchema)
+def get_upload_session(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: int,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Upload status with the parts received so far, to resume an upload.
+    """
+    return _get_upload(db, upload_id, current_user)
+
+@router.put("/uploads/{upload_id}/parts/{number}", response_model=UploadPartSchema)
+def upload_part(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: int,
+    number: int,
+    file: UploadFile = File(...),
+    sha256: str = Form(...),
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Store part ``number`` (1-based) of an upload; ``sha256`` is the part's
+    checksum.
+    """
+    upload = _get_upload(db, upload_id, current_user)
+    return store_part(db, upload, number, file.file, sha256)
+
+@router.post("/uploads/{upload_id}/complete", response_model=ImportJobSchema, status_code=202)
+def complete_upload_session(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: int,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Assemble the uploaded parts and import the file in the background.
+    Poll /import-jobs/{job_id} for its progress.
+    """
+    upload = _get_upload(db, upload_id, current_user)
+    return complete_upload(db, upload)
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload_session(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: int,
+    current_user: User = Depends(get_current_active_seller),
+) -> Any:
+    """
+    Abandon an upload and delete its parts.
+    """
+    upload = _get_upload(db, upload_id, current_user)
+    abort_upload(db, upload)
+    return {"status": "success"}
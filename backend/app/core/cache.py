@@ -0,0 +1,184 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+from app.core.config import get_settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional for local runs
+    redis = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_MISSING = object()
+
+# After a Redis error the Redis tier is skipped until this monotonic time,
+# so an unavailable Redis costs one timeout per interval, not per request.
+_redis_retry_at = 0.0
+
+@lru_cache()
+def get_redis() -> Optional["redis.Redis"]:
+    """
+    Shared Redis client, or None when caching in Redis is disabled or the
+    client library is not installed.
+    """
+    if redis is None or not settings.REDIS_HOST:
+        return None
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+
+def available_redis() -> Optional["redis.Redis"]:
+    if time.monotonic() < _redis_retry_at:
+        return None
+    return get_redis()
+
+def mark_redis_down(error: Exception) -> None:
+    global _redis_retry_at
+    _redis_retry_at = time.monotonic() + settings.REDIS_RETRY_INTERVAL
+    logger.warning("Redis unavailable, retrying in %ss: %s", settings.REDIS_RETRY_INTERVAL, error)
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU with a per-entry TTL.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TieredCache:
+    """
+    Read-through cache for JSON-serializable values: an in-process LRU in
+    front of Redis. The local tier uses a short TTL so entries invalidated by
+    another worker do not outlive it for long.
+
+    Redis errors are logged and treated as misses; the cache never fails a
+    request.
+    """
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        local_size: int,
+        local_ttl: float,
+        redis_ttl: int,
+        use_redis: bool = True,
+    ):
+        self.namespace = namespace
+        self.local = LocalCache(local_size, local_ttl)
+        self.redis_ttl = redis_ttl
+        self.use_redis = use_redis
+        self._stats_lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def _key(self, key: Any) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _redis(self):
+        return available_redis() if self.use_redis else None
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: Any) -> Optional[Any]:
+        full_key = self._key(key)
+        value = self.local.get(full_key, _MISSING)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.get(full_key)
+            except redis.RedisError as e:
+                mark_redis_down(e)
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(full_key, value)
+                self._count("redis_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: Any, value: Any, ttl: Optional[int] = None) -> None:
+        full_key = self._key(key)
+        self.local.set(full_key, value, None if ttl is None else min(ttl, self.local.ttl))
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(full_key, json.dumps(value), ex=ttl or self.redis_ttl)
+            except redis.RedisError as e:
+                mark_redis_down(e)
+
+    def delete(self, keys: Iterable[Any]) -> None:
+        full_keys = [self._key(key) for key in keys]
+        if not full_keys:
+            return
+        for full_key in full_keys:
+            self.local.delete(full_key)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.delete(*full_keys)
+            except redis.RedisError as e:
+                mark_redis_down(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats["local_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        stats.update(
+            namespace=self.namespace,
+            hits=hits,
+            hit_ratio=round(hits / lookups, 4) if lookups else 0.0,
+            local_entries=len(self.local),
+        )
+        return stats
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 from functools import lru_cache
 
 class Settings(BaseSettings):
@@ -29,6 +29,66 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_DB: int = 0
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_RETRY_INTERVAL: int = 30
+
+    # Product cache
+    PRODUCT_CACHE_TTL: int = 300
+    PRODUCT_CACHE_LOCAL_TTL: int = 30
+    PRODUCT_CACHE_LOCAL_SIZE: int = 10000
+
+    # Category tree cache
+    CATEGORY_TREE_CHECK_INTERVAL: int = 5
+    CATEGORY_TREE_LOCAL_TTL: int = 60  # seconds a copy is kept; bounds staleness while Redis is down
+
+    # Catalog facets
+    FACETS_CACHE_TTL: int = 60
+    PRICE_FACET_BOUNDARIES: List[float] = [1000, 5000, 10000, 50000, 100000]
+
+    # Bulk product import
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_DIR: str = "uploads/imports"
+    IMPORT_WORKERS: int = 2
+    IMPORT_JOB_STALE_AFTER: int = 300  # seconds without a heartbeat before another worker takes over
+
+    # Catalog export
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched per round trip from the server-side cursor
+
+    # Resumable price list uploads
+    UPLOAD_DIR: str = "uploads/parts"
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_MAX_SIZE: int = 2 * 1024 * 1024 * 1024
+    UPLOAD_SESSION_TTL: int = 24 * 60 * 60  # seconds after the last part before parts are discarded
+
+    # Stock holds during checkout
+    STOCK_HOLD_TTL: int = 600  # seconds a checkout keeps its units
+    STOCK_HOLD_SWEEP_INTERVAL: int = 5
+    STOCK_LEVEL_TTL: int = 30  # seconds a cached products.stock value is used
+
+    # Seller analytics cache (closed days only; today is always queried)
+    ANALYTICS_CACHE_TTL: int = 24 * 60 * 60  # entries are keyed by day, so this only bounds their lifetime
+    ANALYTICS_CACHE_LOCAL_TTL: int = 60
+    ANALYTICS_CACHE_LOCAL_SIZE: int = 1000
+
+    # Idempotency keys
+    IDEMPOTENCY_TTL: int = 24 * 60 * 60  # seconds a stored response is replayed
+    IDEMPOTENCY_LOCK_TTL: int = 60  # seconds without renewal before an unfinished request's key can be claimed again
+    IDEMPOTENCY_WAIT_TIMEOUT: int = 30  # seconds a duplicate waits for the first request
+
+    # Product images
+    IMAGE_STORAGE: str = "local"  # "local" (MEDIA_ROOT) or "minio" (MINIO_BUCKET_NAME)
+    MEDIA_ROOT: str = "uploads/media"
+    MEDIA_URL: str = "http://localhost:8000/media"  # public base URL of stored images
+    IMAGE_SIZES: Dict[str, int] = {"thumb": 160, "card": 480, "large": 1200}  # longest edge, px
+    IMAGE_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+
+    # Autocomplete
+    AUTOCOMPLETE_CACHE_SIZE: int = 10000
+    AUTOCOMPLETE_CACHE_TTL: int = 600
+    AUTOCOMPLETE_CHECK_INTERVAL: int = 5
+    AUTOCOMPLETE_CHANGE_LOG_SIZE: int = 10000
 
     class Config:
         case_sensitive = True
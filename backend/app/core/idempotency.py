@@ -0,0 +1,299 @@
+"""
+Idempotency keys for POST endpoints that clients retry.
+
+A client sends ``Idempotency-Key: <unique value>`` with a request. The first
+request with a key runs normally and its successful response is stored for
+IDEMPOTENCY_TTL seconds; repeating the request with the same key returns the
+stored response (with ``Idempotent-Replayed: true``) without running the
+endpoint again. A repeat that arrives while the first request is still
+running waits for its result. Failed requests are not stored, so they can
+be retried with the same key.
+
+While a request runs its key holds an in-flight marker with a token of its
+own. The marker expires IDEMPOTENCY_LOCK_TTL seconds after its last renewal,
+so the key frees up if the worker dies, and is renewed every third of that
+for as long as the request runs, however long that is. Completing or
+releasing a key only touches the marker carrying the request's token.
+
+Keys are scoped per endpoint and user, and bound to a fingerprint of the
+request body: reusing a key for a different request is rejected with 422.
+
+Usage inside an endpoint::
+
+    with idempotency(key, f"orders:{current_user.id}", order_in) as request:
+        if request.replay is not None:
+            return request.replay
+        ...
+        return request.save(payload)
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.core.cache import available_redis, mark_redis_down, redis
+from app.core.config import get_settings
+
+settings = get_settings()
+
+KEY_PREFIX = "idempotency:"
+MAX_KEY_LENGTH = 255
+
+# How often a waiting duplicate checks Redis for the first request's result
+POLL_INTERVAL = 0.05
+
+# KEYS: key; ARGV: token, lock TTL (ms)
+# Renews the in-flight marker if it still carries the token.
+_EXTEND_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw or cjson.decode(raw)['token'] ~= ARGV[1] then return 0 end
+return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+"""
+
+# KEYS: key; ARGV: token, record, TTL (s)
+# Stores the completed record unless another request's marker took the key.
+_COMPLETE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if raw and cjson.decode(raw)['token'] ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS: key; ARGV: token
+# Deletes the in-flight marker if it still carries the token.
+_RELEASE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw or cjson.decode(raw)['token'] ~= ARGV[1] then return 0 end
+return redis.call('DEL', KEYS[1])
+"""
+
+def fingerprint(payload: Any) -> str:
+    """
+    Hash of a request body: a pydantic model, a JSON-serializable value or
+    an uploaded file (read to the end and rewound).
+    """
+    digest = hashlib.sha256()
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    if hasattr(payload, "read"):
+        for data in iter(lambda: payload.read(1024 * 1024), b""):
+            digest.update(data)
+        payload.seek(0)
+    else:
+        digest.update(json.dumps(payload, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+class LocalIdempotencyStore:
+    """
+    In-process records, used while Redis is unavailable.
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._records: Dict[str, Dict[str, Any]] = {}
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(key)
+        if record is not None and record["expires_at"] < time.monotonic():
+            del self._records[key]
+            return None
+        return record
+
+    def _owned(self, key: str, token: str) -> bool:
+        record = self._get(key)
+        return record is not None and record.get("token") == token
+
+    def claim(self, key: str, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Store ``record`` as in flight unless the key exists; returns the
+        existing record, after waiting for it to complete.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        with self._condition:
+            while True:
+                existing = self._get(key)
+                if existing is None:
+                    self._records[key] = {
+                        **record, "expires_at": time.monotonic() + settings.IDEMPOTENCY_LOCK_TTL
+                    }
+                    return None
+                if existing["state"] == "done":
+                    return existing
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return existing
+                self._condition.wait(remaining)
+
+    def extend(self, key: str, token: str) -> bool:
+        """
+        Renew the in-flight marker of ``token``; False if it is gone.
+        """
+        with self._condition:
+            if not self._owned(key, token):
+                return False
+            self._records[key]["expires_at"] = time.monotonic() + settings.IDEMPOTENCY_LOCK_TTL
+            return True
+
+    def complete(self, key: str, token: str, record: Dict[str, Any]) -> None:
+        with self._condition:
+            if self._get(key) is None or self._owned(key, token):
+                self._records[key] = {**record, "expires_at": time.monotonic() + settings.IDEMPOTENCY_TTL}
+            self._condition.notify_all()
+
+    def release(self, key: str, token: str) -> None:
+        with self._condition:
+            if self._owned(key, token):
+                del self._records[key]
+            self._condition.notify_all()
+
+class RedisIdempotencyStore:
+    """
+    Records shared by all workers. The in-flight marker is created with
+    SET NX and expires after IDEMPOTENCY_LOCK_TTL unless renewed, in case
+    its worker dies.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def claim(self, key: str, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            if self.client.set(key, json.dumps(record), nx=True, ex=settings.IDEMPOTENCY_LOCK_TTL):
+                return None
+            raw = self.client.get(key)
+            if raw is None:
+                # Released or expired in between; try to claim it again
+                continue
+            existing = json.loads(raw)
+            if existing["state"] == "done" or time.monotonic() >= deadline:
+                return existing
+            time.sleep(POLL_INTERVAL)
+
+    def extend(self, key: str, token: str) -> bool:
+        ttl = int(settings.IDEMPOTENCY_LOCK_TTL * 1000)
+        return bool(self.client.eval(_EXTEND_SCRIPT, 1, key, token, ttl))
+
+    def complete(self, key: str, token: str, record: Dict[str, Any]) -> None:
+        self.client.eval(_COMPLETE_SCRIPT, 1, key, token, json.dumps(record), settings.IDEMPOTENCY_TTL)
+
+    def release(self, key: str, token: str) -> None:
+        self.client.eval(_RELEASE_SCRIPT, 1, key, token)
+
+local_store = LocalIdempotencyStore()
+
+class IdempotentRequest:
+    def __init__(self, store, key: Optional[str], fingerprint: Optional[str], token: Optional[str] = None):
+        self.store = store
+        self.key = key
+        self.fingerprint = fingerprint
+        self.token = token
+        self.replay: Optional[JSONResponse] = None
+        self.saved = False
+        self._stop_renewing = threading.Event()
+
+    def _renew(self) -> None:
+        interval = settings.IDEMPOTENCY_LOCK_TTL / 3
+        while not self._stop_renewing.wait(interval):
+            try:
+                if not self.store.extend(self.key, self.token):
+                    return
+            except redis.RedisError as e:
+                mark_redis_down(e)
+                return
+
+    def start_renewing(self) -> None:
+        """
+        Keep the in-flight marker alive until the request is saved or
+        released.
+        """
+        threading.Thread(target=self._renew, name="idempotency-renew", daemon=True).start()
+
+    def save(self, content: Any, status_code: int = 200) -> Any:
+        """
+        Store a successful response for replays and return it. ``content``
+        must be JSON-serializable.
+        """
+        if self.key is not None:
+            record = {
+                "state": "done",
+                "fingerprint": self.fingerprint,
+                "status_code": status_code,
+                "content": content,
+            }
+            self._stop_renewing.set()
+            try:
+                self.store.complete(self.key, self.token, record)
+            except redis.RedisError as e:
+                mark_redis_down(e)
+            self.saved = True
+        return content
+
+    def release(self) -> None:
+        self._stop_renewing.set()
+        if self.key is None or self.saved:
+            return
+        try:
+            self.store.release(self.key, self.token)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+
+def _claim(key: str, record: Dict[str, Any]):
+    client = available_redis()
+    if client is not None:
+        store = RedisIdempotencyStore(client)
+        try:
+            return store, store.claim(key, record)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    return local_store, local_store.claim(key, record)
+
+@contextmanager
+def idempotency(key: Optional[str], scope: str, payload: Any) -> Iterator[IdempotentRequest]:
+    """
+    Claim ``key`` within ``scope`` for the enclosed request. Without a key
+    the request simply runs. If the block raises, the key is released so
+    that a retry runs the request again.
+    """
+    if key is None:
+        yield IdempotentRequest(None, None, None)
+        return
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    request_fingerprint = fingerprint(payload)
+    full_key = f"{KEY_PREFIX}{scope}:{key}"
+    token = uuid.uuid4().hex
+    store, existing = _claim(full_key, {"state": "running", "fingerprint": request_fingerprint, "token": token})
+    if existing is not None:
+        if existing["fingerprint"] != request_fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        if existing["state"] != "done":
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        request = IdempotentRequest(None, None, None)
+        request.replay = JSONResponse(
+            content=existing["content"],
+            status_code=existing["status_code"],
+            headers={"Idempotent-Replayed": "true"},
+        )
+        yield request
+        return
+
+    request = IdempotentRequest(store, full_key, request_fingerprint, token)
+    request.start_renewing()
+    try:
+        yield request
+    finally:
+        request.release()
@@ -0,0 +1,12 @@
+# Import every model so that Base.metadata describes the whole schema,
+# as needed by Alembic.
+from app.models.base import Base  # noqa
+from app.models.user import User  # noqa
+from app.models.product import Category, Product, ProductImage, ProductCompatibility  # noqa
+from app.models.search import ProductSearch  # noqa
+from app.models.order import Order, OrderItem, Review  # noqa
+from app.models.chat import Chat, Message  # noqa
+from app.models.notification import Notification  # noqa
+from app.models.import_job import ImportJob, ImportJobError  # noqa
+from app.models.upload import UploadSession, UploadPart  # noqa
+from app.models.sales_rollup import SalesDailyProduct, SalesDailyStatus  # noqa
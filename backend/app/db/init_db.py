@@ -1,17 +1,41 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from app.core.config import get_settings
-from app.models.base import Base
 from app.db.session import engine
 from app.models.user import User, UserRole
 from app.models.product import Category
+from app.services.articles import backfill_sku_keys
+from app.services.categories import ensure_closure
+from app.services.search import get_search_backend, reindex_all
 from passlib.context import CryptContext
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def run_migrations() -> None:
+    """
+    Upgrade the schema to the latest revision. Databases created by the
+    former ``create_all`` startup have no version table and are stamped with
+    the initial revision first.
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logging"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if not inspector.has_table("alembic_version") and inspector.has_table("users"):
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
+
 def init_db(db: Session) -> None:
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create or upgrade tables
+    run_migrations()
+    get_search_backend(engine).ensure_schema(engine)
     
     # Create admin user if not exists
     admin = db.query(User).filter(User.email == "admin@example.com").first()
@@ -43,4 +67,13 @@ def init_db(db: Session) -> None:
             category = Category(**cat_data)
             db.add(category)
     
-    db.commit() 
\ No newline at end of file
+    db.commit()
+
+    # Fill the category closure table for categories created without it
+    ensure_closure(db)
+
+    # Article lookup keys for products written before they existed
+    backfill_sku_keys(db)
+
+    # Index products that have no search document yet
+    reindex_all(db, missing_only=True) 
\ No newline at end of file
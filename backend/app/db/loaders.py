@@ -0,0 +1,53 @@
+from functools import lru_cache
+from inspect import isclass
+from typing import Any, List, Optional, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel as Schema
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, joinedload, selectinload
+
+def _nested_schema(annotation: Any) -> Optional[Type[Schema]]:
+    """
+    Return the response schema wrapped in ``annotation``, unwrapping
+    ``Optional[...]`` and ``List[...]``.
+    """
+    if isclass(annotation) and issubclass(annotation, Schema):
+        return annotation
+    if get_origin(annotation) in (list, List, Union):
+        for arg in get_args(annotation):
+            nested = _nested_schema(arg)
+            if nested is not None:
+                return nested
+    return None
+
+def _build_options(model: Any, schema: Type[Schema], seen: Tuple[Any, ...]) -> List[Any]:
+    options = []
+    relationships = inspect(model).relationships
+    for name, field in schema.model_fields.items():
+        nested = _nested_schema(field.annotation)
+        if nested is None or name not in relationships:
+            continue
+        relationship = relationships[name]
+        target = relationship.mapper.class_
+        if (target, nested) in seen:
+            continue
+        attribute = getattr(model, name)
+        # Collections get one extra SELECT ... IN per level; scalar references
+        # are joined into the parent query.
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        children = _build_options(target, nested, seen + ((target, nested),))
+        if children:
+            loader = loader.options(*children)
+        options.append(loader)
+    return options
+
+@lru_cache(maxsize=None)
+def loader_options(model: Any, schema: Type[Schema]) -> Tuple[Any, ...]:
+    """
+    Eager-loading plan that covers every relationship ``schema`` serializes
+    for ``model``, so a response is produced with a fixed number of queries
+    instead of one lazy load per row and relationship.
+    """
+    return tuple(_build_options(model, schema, ((model, schema),)))
+
+def with_loaders(query: Query, model: Any, schema: Type[Schema]) -> Query:
+    return query.options(*loader_options(model, schema))
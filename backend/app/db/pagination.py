@@ -0,0 +1,147 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_, text
+from sqlalchemy.orm import Query
+
+ESTIMATE_THRESHOLD = 10000  # below this an "estimate" is computed exactly
+MAX_PER_PAGE = 100
+
+def encode_cursor(sort_key: str, values: List[Any]) -> str:
+    """
+    Build an opaque cursor from the sort key and the last row's key values.
+    """
+    payload = {
+        "s": sort_key,
+        "v": [
+            {"dt": value.isoformat()} if isinstance(value, datetime) else value
+            for value in values
+        ],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_key: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload["v"]
+        ]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != sort_key:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    return values
+
+def keyset_paginate(
+    query: Query,
+    *,
+    sort_column: Any,
+    id_column: Any,
+    descending: bool,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Page through ``query`` ordered by (sort_column, id_column).
+
+    The sort column must be NOT NULL. Returns the page and the cursor for the
+    next page (None on the last page).
+    """
+    sort_key = f"{sort_column.key}:{'desc' if descending else 'asc'}"
+    keys = tuple_(sort_column, id_column)
+    if cursor:
+        last = tuple_(*decode_cursor(cursor, sort_key))
+        query = query.filter(keys < last if descending else keys > last)
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(
+            sort_key,
+            [getattr(last_row, sort_column.key), getattr(last_row, id_column.key)],
+        )
+    return rows, next_cursor
+
+def count_total(query: Query, mode: str = "exact") -> Tuple[int, bool]:
+    """
+    Count the rows matched by ``query``.
+
+    With ``mode="estimate"`` PostgreSQL's planner estimate is used for large
+    results. Returns the count and whether it is an estimate.
+    """
+    query = query.order_by(None)
+    session = query.session
+    if mode == "estimate" and session.get_bind().dialect.name == "postgresql":
+        statement = query.statement.compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= ESTIMATE_THRESHOLD:
+            return estimate, True
+    return query.count(), False
+
+def set_pagination_headers(
+    response: Response,
+    *,
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None,
+    estimated: bool = False,
+) -> None:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+        if estimated:
+            response.headers["X-Total-Count-Estimated"] = "true"
+
+def paginate(
+    query: Query,
+    params: Any,
+    response: Response,
+    *,
+    sort_column: Any = None,
+    id_column: Any = None,
+    descending: bool = False,
+) -> List[Any]:
+    """
+    Apply ``PaginationParams`` to ``query``.
+
+    Keyset pagination is used when a sort column is given and the client sent
+    a cursor or asked for the first page; ``page`` > 1 without a cursor keeps
+    the legacy offset behaviour. Totals are only counted when requested.
+    """
+    per_page = max(1, min(params.per_page, MAX_PER_PAGE))
+    page = max(1, params.page)
+
+    if params.with_total:
+        total, estimated = count_total(query, params.total_mode)
+        set_pagination_headers(response, total=total, estimated=estimated)
+
+    if sort_column is not None and (params.cursor or page == 1):
+        items, next_cursor = keyset_paginate(
+            query,
+            sort_column=sort_column,
+            id_column=id_column,
+            descending=descending,
+            cursor=params.cursor,
+            limit=per_page,
+        )
+        set_pagination_headers(response, next_cursor=next_cursor)
+        return items
+
+    return query.offset((page - 1) * per_page).limit(per_page).all()
@@ -0,0 +1,224 @@
+"""
+Check that the hot queries are served by the indexes meant for them.
+
+    python -m app.db.query_plans [--verbose]
+
+Every check runs EXPLAIN for the query shape an endpoint sends and fails if
+the expected index does not appear in the plan. On PostgreSQL sequential
+scans are disabled for the check, so the result does not depend on how much
+data the database holds: a query that still gets a sequential scan has no
+usable index at all. Exits with status 1 if any check fails.
+"""
+import argparse
+import json
+import re
+import sys
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+import app.db.base  # noqa: F401  (configures every mapper)
+from app.db.session import engine
+from app.models.chat import Chat, Message
+from app.models.notification import Notification
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product, ProductCompatibility, normalize_sku, product_category
+from app.services.categories import descendant_ids
+
+PAGE = 20
+
+_SQLITE_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+class PlanCheck(NamedTuple):
+    name: str
+    build: Callable[[], Any]
+    # Indexes that must all appear in the plan, per dialect when a dict;
+    # None skips the check on that dialect.
+    expected: Any
+
+CHECKS: List[PlanCheck] = [
+    PlanCheck(
+        "catalog: seller's products",
+        lambda: select(Product.id).where(Product.seller_id == 1).order_by(Product.id).limit(PAGE),
+        ("ix_products_seller_id_id",),
+    ),
+    PlanCheck(
+        "catalog: brand filter",
+        lambda: select(Product.id).where(Product.brand == "Komatsu").order_by(Product.id).limit(PAGE),
+        ("ix_products_brand_id",),
+    ),
+    PlanCheck(
+        "catalog: condition filter",
+        lambda: select(Product.id).where(Product.condition == "new").order_by(Product.id).limit(PAGE),
+        ("ix_products_condition_id",),
+    ),
+    PlanCheck(
+        "catalog: active products",
+        lambda: select(Product.id).where(Product.is_active.is_(True)).order_by(Product.id).limit(PAGE),
+        ("ix_products_is_active_id",),
+    ),
+    PlanCheck(
+        "catalog: price range sorted by price",
+        lambda: select(Product.id)
+        .where(Product.price >= 1000, Product.price <= 5000)
+        .order_by(Product.price, Product.id)
+        .limit(PAGE),
+        ("ix_products_price_id",),
+    ),
+    PlanCheck(
+        "catalog: newest first",
+        lambda: select(Product.id).order_by(Product.created_at.desc(), Product.id.desc()).limit(PAGE),
+        ("ix_products_created_at_id",),
+    ),
+    PlanCheck(
+        "catalog: category subtree",
+        lambda: select(product_category.c.product_id).where(
+            product_category.c.category_id.in_(descendant_ids(1))
+        ),
+        ("ix_product_category_category_product",),
+    ),
+    PlanCheck(
+        "catalog: categories of a page of products",
+        lambda: select(product_category.c.category_id).where(
+            product_category.c.product_id.in_([1, 2, 3])
+        ),
+        ("ix_product_category_product_category",),
+    ),
+    PlanCheck(
+        "catalog: article lookup",
+        lambda: select(Product.id).where(Product.sku_normalized == normalize_sku("KOM-12345")),
+        ("ix_products_sku_normalized",),
+    ),
+    PlanCheck(
+        "catalog: machine compatibility",
+        lambda: select(ProductCompatibility.product_id).where(
+            ProductCompatibility.machine_key == "komatsupc2008"
+        ),
+        {
+            "postgresql": ("product_compatibility_pkey",),
+            "sqlite": ("sqlite_autoindex_product_compatibility_1",),
+        },
+    ),
+    PlanCheck(
+        "orders: buyer's orders",
+        lambda: select(Order.id)
+        .where(Order.buyer_id == 1)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(PAGE),
+        ("ix_orders_buyer_created",),
+    ),
+    PlanCheck(
+        "orders: buyer's orders by status",
+        lambda: select(Order.id)
+        .where(Order.buyer_id == 1, Order.status == OrderStatus.PENDING)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(PAGE),
+        ("ix_orders_buyer_status_created",),
+    ),
+    PlanCheck(
+        "orders: items of a page of orders",
+        lambda: select(OrderItem.id).where(OrderItem.order_id.in_([1, 2, 3])),
+        ("ix_order_items_order_id",),
+    ),
+    PlanCheck(
+        "orders: orders containing a product",
+        lambda: select(OrderItem.order_id).where(OrderItem.product_id == 1),
+        ("ix_order_items_product_id",),
+    ),
+    PlanCheck(
+        "chats: user's chats",
+        lambda: select(Chat.id)
+        .where((Chat.buyer_id == 1) | (Chat.seller_id == 1))
+        .order_by(Chat.created_at.desc(), Chat.id.desc())
+        .limit(PAGE),
+        ("ix_chats_buyer_created", "ix_chats_seller_created"),
+    ),
+    PlanCheck(
+        "chats: messages of a chat",
+        lambda: select(Message.id).where(Message.chat_id == 1).order_by(Message.created_at, Message.id),
+        ("ix_messages_chat_created",),
+    ),
+    PlanCheck(
+        "notifications: list",
+        lambda: select(Notification.id)
+        .where(Notification.user_id == 1)
+        .order_by(Notification.created_at.desc())
+        .limit(100),
+        ("ix_notifications_user_created",),
+    ),
+    PlanCheck(
+        "notifications: unread count",
+        lambda: select(func.count(Notification.id)).where(
+            Notification.user_id == 1, Notification.is_read.is_(False)
+        ),
+        ("ix_notifications_user_read_created",),
+    ),
+]
+
+def _compile(connection: Connection, statement: Any) -> str:
+    return str(statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    ))
+
+def _postgresql_plan(connection: Connection, sql: str) -> Tuple[Set[str], str]:
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    indexes = set()
+
+    def walk(node: Dict[str, Any]) -> None:
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return indexes, json.dumps(plan, indent=2)
+
+def _sqlite_plan(connection: Connection, sql: str) -> Tuple[Set[str], str]:
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    details = [row[-1] for row in rows]
+    indexes = {name for detail in details for name in _SQLITE_INDEX_RE.findall(detail)}
+    return indexes, "\n".join(details)
+
+def _expected(check: PlanCheck, dialect: str) -> Optional[Sequence[str]]:
+    if isinstance(check.expected, dict):
+        return check.expected.get(dialect)
+    return check.expected
+
+def run_checks(verbose: bool = False) -> bool:
+    dialect = engine.dialect.name
+    explain = _postgresql_plan if dialect == "postgresql" else _sqlite_plan
+    ok = True
+    with engine.connect() as connection:
+        for check in CHECKS:
+            expected = _expected(check, dialect)
+            if expected is None:
+                print(f"SKIP  {check.name} (not applicable to {dialect})")
+                continue
+            transaction = connection.begin()
+            try:
+                sql = _compile(connection, check.build())
+                used, plan = explain(connection, sql)
+            finally:
+                transaction.rollback()
+            missing = [name for name in expected if name not in used]
+            if missing:
+                ok = False
+                print(f"FAIL  {check.name}: expected {', '.join(missing)}, "
+                      f"plan uses {', '.join(sorted(used)) or 'no index'}")
+            else:
+                print(f"OK    {check.name} ({', '.join(expected)})")
+            if verbose or missing:
+                print(f"      {sql}")
+                print("      " + plan.replace("\n", "\n      "))
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every query and its plan")
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(verbose=args.verbose) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.staticfiles import StaticFiles
 from app.api.v1.api import api_router
 from app.core.config import get_settings
 from app.db.init_db import init_db
 from app.db.session import SessionLocal
+from app.services.image_storage import media_path
+from app.services.images import shutdown_image_pool
+from app.services.import_jobs import resume_import_jobs, shutdown_import_jobs
+from app.services.stock_holds import start_hold_sweeper, stop_hold_sweeper
+from app.services.uploads import purge_expired_uploads
 
 settings = get_settings()
 
@@ -23,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"],
 )
 
 # Error handling
@@ -36,14 +44,28 @@ async def validation_exception_handler(request, exc):
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Uploaded images, when they are stored on local disk
+if settings.IMAGE_STORAGE == "local":
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    app.mount(media_path(), StaticFiles(directory=settings.MEDIA_ROOT), name="media")
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     db = SessionLocal()
     try:
         init_db(db)
+        purge_expired_uploads(db)
     finally:
         db.close()
+    resume_import_jobs()
+    start_hold_sweeper()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_import_jobs()
+    shutdown_image_pool()
+    stop_hold_sweeper()
 
 # Health check endpoint
 @app.get("/health")
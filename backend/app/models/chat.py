@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -15,6 +15,12 @@ class Chat(BaseModel):
     seller = relationship("User", foreign_keys=[seller_id])
     product = relationship("Product")
     messages = relationship("Message", back_populates="chat")
+
+    __table_args__ = (
+        # Chats are listed for a user on either side, newest first
+        Index('ix_chats_buyer_created', 'buyer_id', 'created_at', 'id'),
+        Index('ix_chats_seller_created', 'seller_id', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f"<Chat {self.id}>"
@@ -32,6 +38,10 @@ class Message(BaseModel):
     # Relationships
     chat = relationship("Chat", back_populates="messages")
     user = relationship("User", back_populates="messages")
+
+    __table_args__ = (
+        Index('ix_messages_chat_created', 'chat_id', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f"<Message {self.id}>" 
\ No newline at end of file
@@ -0,0 +1,74 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Enum, Text, DateTime, Index, Boolean, false
+from sqlalchemy.orm import relationship
+import enum
+from .base import Base, BaseModel
+
+class ImportJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class ImportJob(BaseModel):
+    """
+    Bulk product import running in the background. Progress is committed
+    with every chunk, so an interrupted job resumes at ``chunks_done``.
+    """
+    __tablename__ = "import_jobs"
+
+    status = Column(Enum(ImportJobStatus), default=ImportJobStatus.PENDING, nullable=False)
+    filename = Column(String, nullable=False)  # as uploaded
+    path = Column(String, nullable=False)  # spooled copy on disk
+    chunk_size = Column(Integer, nullable=False)
+    upsert = Column(Boolean, default=False, server_default=false(), nullable=False)  # update the seller's existing SKUs
+    chunks_done = Column(Integer, default=0, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    inserted_count = Column(Integer, default=0, server_default="0", nullable=False)
+    updated_count = Column(Integer, default=0, server_default="0", nullable=False)
+    unchanged_count = Column(Integer, default=0, server_default="0", nullable=False)
+    error = Column(Text)  # why the whole job failed
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # last sign of life of the running worker
+    claim_token = Column(String(32))  # set by the worker that claimed the job; only it may write progress
+    finished_at = Column(DateTime)
+
+    # Foreign keys
+    seller_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+
+    # Relationships
+    seller = relationship("User")
+    errors = relationship(
+        "ImportJobError", back_populates="job", order_by="ImportJobError.row",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index('ix_import_jobs_seller_created', 'seller_id', 'created_at'),
+        Index('ix_import_jobs_status', 'status'),
+    )
+
+    @property
+    def rows_processed(self) -> int:
+        return self.success_count + self.failed_count
+
+    def __repr__(self):
+        return f"<ImportJob {self.id}>"
+
+class ImportJobError(Base):
+    __tablename__ = "import_job_errors"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey('import_jobs.id', ondelete="CASCADE"), nullable=False)
+    row = Column(Integer, nullable=False)  # spreadsheet row number
+    message = Column(Text, nullable=False)
+
+    # Relationships
+    job = relationship("ImportJob", back_populates="errors")
+
+    __table_args__ = (
+        Index('ix_import_job_errors_job_row', 'job_id', 'row'),
+    )
+
+    def __repr__(self):
+        return f"<ImportJobError {self.job_id}:{self.row}>"
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
-from app.db.base_class import Base
+from .base import Base
 
 class NotificationType(str, enum.Enum):
     ORDER_RECEIVED = "order_received"
@@ -21,10 +21,16 @@ class Notification(Base):
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    data = Column(String, nullable=True)  # JSON string for additional data
+    data = Column(JSON, nullable=True)  # additional data, e.g. the order id
 
     # Relationships
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        # Listing (optionally unread only) and the unread counter
+        Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        Index('ix_notifications_user_created', 'user_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f"<Notification {self.id}>" 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import BaseModel
@@ -26,6 +26,12 @@ class Order(BaseModel):
     # Relationships
     buyer = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
+
+    __table_args__ = (
+        # Buyer's order history, newest first, optionally by status
+        Index('ix_orders_buyer_created', 'buyer_id', 'created_at', 'id'),
+        Index('ix_orders_buyer_status_created', 'buyer_id', 'status', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f"<Order {self.id}>"
@@ -39,10 +45,19 @@ class OrderItem(BaseModel):
     # Foreign keys
     order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    # Copied from the product when the order is placed, for the seller's inbox
+    seller_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     
     # Relationships
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
+
+    __table_args__ = (
+        Index('ix_order_items_order_id', 'order_id'),
+        Index('ix_order_items_product_id', 'product_id'),
+        # Seller's order inbox, newest first; created_at is the order's
+        Index('ix_order_items_seller_created', 'seller_id', 'created_at', 'order_id'),
+    )
     
     def __repr__(self):
         return f"<OrderItem {self.id}>"
@@ -60,6 +75,10 @@ class Review(BaseModel):
     # Relationships
     user = relationship("User", back_populates="reviews")
     product = relationship("Product", back_populates="reviews")
+
+    __table_args__ = (
+        Index('ix_reviews_product_id', 'product_id'),
+    )
     
     def __repr__(self):
         return f"<Review {self.id}>" 
\ No newline at end of file
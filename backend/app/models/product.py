@@ -1,13 +1,42 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, Boolean, Table, Text
-from sqlalchemy.orm import relationship
-from .base import BaseModel
+from typing import Optional
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Boolean, Table, Text, Index, JSON, event, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, validates
+from .base import Base, BaseModel
+
+# Cyrillic letters that look like Latin ones; sellers mix layouts when typing
+# part numbers ("КОМ-12345" vs "KOM-12345").
+_HOMOGLYPHS = str.maketrans("АВЕКМНОРСТУХ", "ABEKMHOPCTYX")
+
+def normalize_sku(sku: Optional[str]) -> Optional[str]:
+    """
+    Lookup key for an article number: upper case, Cyrillic homoglyphs mapped
+    to Latin, separators removed. "KOM-12345", "kom12345" and "KOM 12345"
+    all become "KOM12345".
+    """
+    if sku is None:
+        return None
+    return "".join(ch for ch in sku.upper().translate(_HOMOGLYPHS) if ch.isalnum())
 
 # Association table for product categories
 product_category = Table(
     'product_category',
     BaseModel.metadata,
     Column('product_id', Integer, ForeignKey('products.id')),
-    Column('category_id', Integer, ForeignKey('categories.id'))
+    Column('category_id', Integer, ForeignKey('categories.id')),
+    Index('ix_product_category_category_product', 'category_id', 'product_id'),
+    Index('ix_product_category_product_category', 'product_id', 'category_id'),
+)
+
+# Closure table of the category hierarchy: one row per (ancestor, descendant)
+# pair, including each category as its own ancestor at depth 0.
+category_closure = Table(
+    'category_closure',
+    BaseModel.metadata,
+    Column('ancestor_id', Integer, ForeignKey('categories.id', ondelete="CASCADE"), primary_key=True),
+    Column('descendant_id', Integer, ForeignKey('categories.id', ondelete="CASCADE"), primary_key=True),
+    Column('depth', Integer, nullable=False),
+    Index('ix_category_closure_descendant', 'descendant_id'),
 )
 
 class Category(BaseModel):
@@ -19,7 +48,7 @@ class Category(BaseModel):
     parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
     
     # Relationships
-    parent = relationship("Category", remote_side=[id], backref="subcategories")
+    parent = relationship("Category", remote_side="Category.id", backref="subcategories")
     products = relationship("Product", secondary=product_category, back_populates="categories")
 
     def __repr__(self):
@@ -34,10 +63,13 @@ class Product(BaseModel):
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0)
     sku = Column(String, unique=True, nullable=False)
+    sku_normalized = Column(String, index=True)  # maintained from sku, see normalize_sku
     brand = Column(String)
     model = Column(String)
     condition = Column(String)  # new/used
     is_active = Column(Boolean, default=True)
+    specifications = Column(JSON().with_variant(JSONB(), "postgresql"))
+    content_hash = Column(String(40))  # of the last imported price list row, see services.product_import
     
     # Foreign keys
     seller_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -48,10 +80,45 @@ class Product(BaseModel):
     images = relationship("ProductImage", back_populates="product")
     reviews = relationship("Review", back_populates="product")
     order_items = relationship("OrderItem", back_populates="product")
+    compatibility = relationship(
+        "ProductCompatibility", back_populates="product",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+    search_document = relationship(
+        "ProductSearch", back_populates="product", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True
+    )
     
+    __table_args__ = (
+        # Equality filters of the catalog combined with its default id order
+        Index('ix_products_seller_id_id', 'seller_id', 'id'),
+        Index('ix_products_brand_id', 'brand', 'id'),
+        Index('ix_products_condition_id', 'condition', 'id'),
+        Index('ix_products_is_active_id', 'is_active', 'id'),
+        # Price ranges and keyset pages sorted by price / creation date
+        Index('ix_products_price_id', 'price', 'id'),
+        Index('ix_products_created_at_id', 'created_at', 'id'),
+        Index(
+            'ix_products_sku_normalized_trgm', 'sku_normalized',
+            postgresql_using='gin', postgresql_ops={'sku_normalized': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+
+    @validates('sku')
+    def _set_sku_normalized(self, key, sku):
+        self.sku_normalized = normalize_sku(sku)
+        return sku
+
     def __repr__(self):
         return f"<Product {self.name}>"
 
+@event.listens_for(Product, "before_update")
+def _reset_content_hash(mapper, connection, target):
+    # A product changed outside the price list import no longer matches the
+    # hash of its last imported row, so the next re-import must rewrite it.
+    if not inspect(target).attrs.content_hash.history.has_changes():
+        target.content_hash = None
+
 class ProductImage(BaseModel):
     __tablename__ = "product_images"
 
@@ -59,9 +126,41 @@ class ProductImage(BaseModel):
     alt_text = Column(String)
     is_primary = Column(Boolean, default=False)
     product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    # Set for uploaded images: SHA-256 of the original, its size and the
+    # URLs of the resized copies, {"thumb": {"jpeg": url, "webp": url}, ...}
+    content_hash = Column(String(64))
+    width = Column(Integer)
+    height = Column(Integer)
+    variants = Column(JSON)
     
     # Relationships
     product = relationship("Product", back_populates="images")
+
+    __table_args__ = (
+        Index('ix_product_images_product_id', 'product_id'),
+        Index('ix_product_images_content_hash', 'content_hash'),
+    )
     
     def __repr__(self):
-        return f"<ProductImage {self.url}>" 
\ No newline at end of file
+        return f"<ProductImage {self.url}>"
+
+class ProductCompatibility(Base):
+    """
+    Inverted index from normalized machine model to the products that fit
+    it, built from ``specifications["compatibility"]``.
+    """
+    __tablename__ = "product_compatibility"
+
+    machine_key = Column(String, primary_key=True)  # see services.compatibility.machine_key
+    product_id = Column(Integer, ForeignKey('products.id', ondelete="CASCADE"), primary_key=True)
+    machine_model = Column(String, nullable=False)  # as written by the seller
+
+    # Relationships
+    product = relationship("Product", back_populates="compatibility")
+
+    __table_args__ = (
+        Index('ix_product_compatibility_product_id', 'product_id'),
+    )
+
+    def __repr__(self):
+        return f"<ProductCompatibility {self.machine_key} -> {self.product_id}>"
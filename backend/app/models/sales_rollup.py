@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Float, Date, ForeignKey, Enum
+from .base import Base
+from .order import OrderStatus
+
+class SalesDailyProduct(Base):
+    """
+    Units and revenue of one seller's product per day (UTC) of ordering,
+    over orders in every status. Maintained by app.services.sales_rollups.
+    """
+    __tablename__ = "sales_daily_product"
+
+    seller_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), primary_key=True)
+    quantity = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<SalesDailyProduct {self.seller_id}:{self.day}:{self.product_id}>"
+
+class SalesDailyStatus(Base):
+    """
+    Orders containing a seller's items, and the revenue of those items, per
+    day of ordering and current order status. An order moves between
+    status rows when its status changes.
+    """
+    __tablename__ = "sales_daily_status"
+
+    seller_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(OrderStatus), primary_key=True)
+    orders = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<SalesDailyStatus {self.seller_id}:{self.day}:{self.status}>"
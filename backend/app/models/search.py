@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class ProductSearch(Base):
+    """
+    Search document maintained for every product.
+
+    On PostgreSQL ``search_vector`` holds the weighted Russian + English
+    tsvector and is served by a GIN index. SQLite keeps its documents in the
+    ``product_search_fts`` FTS5 table instead (see ``app.services.search``).
+    """
+    __tablename__ = "product_search"
+
+    product_id = Column(Integer, ForeignKey('products.id', ondelete="CASCADE"), primary_key=True)
+    document = Column(Text, nullable=False, default="")
+    search_vector = Column(TSVECTOR().with_variant(Text(), "sqlite"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    product = relationship("Product", back_populates="search_document")
+
+    __table_args__ = (
+        Index('ix_product_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+    def __repr__(self):
+        return f"<ProductSearch {self.product_id}>"
@@ -0,0 +1,69 @@
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, Enum, DateTime, Index, Boolean, false
+from sqlalchemy.orm import relationship
+import enum
+from .base import Base, BaseModel
+
+class UploadStatus(str, enum.Enum):
+    UPLOADING = "uploading"
+    ASSEMBLING = "assembling"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+class UploadSession(BaseModel):
+    """
+    Resumable upload of a price list, sent as numbered parts of
+    ``part_size`` bytes (the last one shorter). Parts are spooled under
+    UPLOAD_DIR and assembled into an import job on completion.
+    """
+    __tablename__ = "upload_sessions"
+
+    status = Column(Enum(UploadStatus), default=UploadStatus.UPLOADING, nullable=False)
+    filename = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)  # of the whole file, in bytes
+    part_size = Column(Integer, nullable=False)
+    sha256 = Column(String(64))  # of the whole file, if the client sent it
+    upsert = Column(Boolean, default=False, server_default=false(), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    # Foreign keys
+    seller_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    import_job_id = Column(Integer, ForeignKey('import_jobs.id'))
+
+    # Relationships
+    seller = relationship("User")
+    import_job = relationship("ImportJob")
+    parts = relationship(
+        "UploadPart", back_populates="session", order_by="UploadPart.number",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __table_args__ = (
+        Index('ix_upload_sessions_seller_created', 'seller_id', 'created_at'),
+        Index('ix_upload_sessions_status_expires', 'status', 'expires_at'),
+    )
+
+    @property
+    def part_count(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+    def expected_part_size(self, number: int) -> int:
+        if number < self.part_count:
+            return self.part_size
+        return self.size - self.part_size * (self.part_count - 1)
+
+    def __repr__(self):
+        return f"<UploadSession {self.id}>"
+
+class UploadPart(Base):
+    __tablename__ = "upload_parts"
+
+    session_id = Column(Integer, ForeignKey('upload_sessions.id', ondelete="CASCADE"), primary_key=True)
+    number = Column(Integer, primary_key=True)  # 1-based
+    size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+
+    # Relationships
+    session = relationship("UploadSession", back_populates="parts")
+
+    def __repr__(self):
+        return f"<UploadPart {self.session_id}:{self.number}>"
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from .user import User
 from .product import Product
+from .pagination import PaginationParams
 
 class MessageBase(BaseModel):
     content: str
@@ -42,7 +43,5 @@ class Chat(ChatBase):
     class Config:
         from_attributes = True
 
-class ChatFilter(BaseModel):
-    product_id: Optional[int] = None
-    page: int = 1
-    per_page: int = 20 
\ No newline at end of file
+class ChatFilter(PaginationParams):
+    product_id: Optional[int] = None 
\ No newline at end of file
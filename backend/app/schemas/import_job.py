@@ -0,0 +1,33 @@
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel
+from app.models.import_job import ImportJobStatus
+
+class ImportJobRowError(BaseModel):
+    row: int
+    message: str
+
+    class Config:
+        from_attributes = True
+
+class ImportJob(BaseModel):
+    id: int
+    status: ImportJobStatus
+    filename: str
+    upsert: bool
+    rows_processed: int
+    success_count: int
+    failed_count: int
+    inserted_count: int
+    updated_count: int
+    unchanged_count: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ImportJobDetail(ImportJob):
+    errors: List[ImportJobRowError] = []
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from app.models.order import OrderStatus
 from .product import Product
+from .pagination import PaginationParams
 
 class OrderItemBase(BaseModel):
     quantity: int
@@ -14,6 +15,7 @@ class OrderItemCreate(OrderItemBase):
 class OrderItem(OrderItemBase):
     id: int
     order_id: int
+    seller_id: int
     product: Product
     created_at: datetime
     updated_at: datetime
@@ -27,6 +29,7 @@ class OrderBase(BaseModel):
 
 class OrderCreate(OrderBase):
     items: List[OrderItemCreate]
+    hold_id: Optional[str] = None  # stock hold taken at checkout
 
 class OrderUpdate(BaseModel):
     status: Optional[OrderStatus] = None
@@ -45,9 +48,47 @@ class Order(OrderBase):
     class Config:
         from_attributes = True
 
-class OrderFilter(BaseModel):
+class SellerOrder(OrderBase):
+    """
+    An order as seen by one of its sellers: only that seller's items, and
+    their total instead of the order's.
+    """
+    id: int
+    buyer_id: int
+    status: OrderStatus
+    seller_total: float
+    tracking_number: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    items: List[OrderItem]
+
+class OrderStatusChange(BaseModel):
+    order_id: int
+    status: Optional[OrderStatus] = None
+    tracking_number: Optional[str] = None
+
+class BulkOrderStatusUpdate(BaseModel):
+    changes: List[OrderStatusChange]
+
+class OrderStatusChangeResult(BaseModel):
+    order_id: int
+    success: bool
+    status: Optional[OrderStatus] = None  # after the change
+    error: Optional[str] = None
+
+class OrderFilter(PaginationParams):
     status: Optional[OrderStatus] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    page: int = 1
-    per_page: int = 20 
\ No newline at end of file
+
+class StockHoldItem(BaseModel):
+    product_id: int
+    quantity: int
+
+class StockHoldCreate(BaseModel):
+    items: List[StockHoldItem]
+
+class StockHold(BaseModel):
+    id: str
+    items: List[StockHoldItem]
+    expires_at: datetime
@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class PaginationParams(BaseModel):
+    page: int = 1
+    per_page: int = 20
+    # Opaque cursor taken from the X-Next-Cursor header of the previous page
+    cursor: Optional[str] = None
+    # Report the total in X-Total-Count; "estimate" may use planner statistics
+    with_total: bool = False
+    total_mode: str = "exact"
@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
+from .pagination import PaginationParams
 
 class CategoryBase(BaseModel):
     name: str
@@ -22,6 +23,9 @@ class Category(CategoryBase):
     class Config:
         from_attributes = True
 
+class CategoryTreeNode(Category):
+    children: List["CategoryTreeNode"] = []
+
 class ProductImageBase(BaseModel):
     url: HttpUrl
     alt_text: Optional[str] = None
@@ -33,6 +37,10 @@ class ProductImageCreate(ProductImageBase):
 class ProductImage(ProductImageBase):
     id: int
     product_id: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # Resized copies of uploaded images by size name, then "jpeg"/"webp"
+    variants: Optional[Dict[str, Dict[str, HttpUrl]]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -50,6 +58,7 @@ class ProductBase(BaseModel):
     model: Optional[str] = None
     condition: str
     is_active: bool = True
+    specifications: Optional[Dict[str, Any]] = None
 
 class ProductCreate(ProductBase):
     category_ids: List[int]
@@ -70,14 +79,58 @@ class Product(ProductBase):
     class Config:
         from_attributes = True
 
-class ProductFilter(BaseModel):
+class ArticleMatch(BaseModel):
+    id: int
+    name: str
+    sku: str
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    price: float
+    stock: Optional[int] = None
+    seller_id: int
+    exact: bool
+    score: float
+
+class AutocompleteSuggestion(BaseModel):
+    text: str
+    kind: str  # product, sku, brand or model
+    product_id: Optional[int] = None  # set for product and sku suggestions
+    popularity: int
+
+class ProductFilter(PaginationParams):
     category_id: Optional[int] = None
     min_price: Optional[float] = None
     max_price: Optional[float] = None
     brand: Optional[str] = None
     condition: Optional[str] = None
     search: Optional[str] = None
+    machine: Optional[str] = None  # machine model the part must fit
     sort_by: Optional[str] = None
     sort_order: Optional[str] = None
-    page: int = 1
-    per_page: int = 20 
\ No newline at end of file
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+class CategoryFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
+class PriceRangeFacet(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    count: int
+
+class ProductFacets(BaseModel):
+    total: int
+    brands: List[FacetValue]
+    conditions: List[FacetValue]
+    categories: List[CategoryFacet]
+    price_ranges: List[PriceRangeFacet]
+
+class StockAvailability(BaseModel):
+    product_id: int
+    stock: int
+    held: int
+    available: int
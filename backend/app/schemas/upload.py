@@ -0,0 +1,34 @@
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.models.upload import UploadStatus
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int = Field(..., ge=0)
+    sha256: Optional[str] = None  # of the whole file, checked on completion
+    upsert: bool = False
+
+class UploadPart(BaseModel):
+    number: int
+    size: int
+    sha256: str
+
+    class Config:
+        from_attributes = True
+
+class UploadSession(BaseModel):
+    id: int
+    status: UploadStatus
+    filename: str
+    size: int
+    part_size: int
+    part_count: int
+    upsert: bool
+    parts: List[UploadPart] = []
+    import_job_id: Optional[int] = None
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,258 @@
+"""
+Seller analytics computed from the daily sales rollups.
+
+Every figure of the dashboard (daily series, period totals, status
+breakdown, top products) is an aggregate over the seller's rows of
+``sales_daily_status`` and ``sales_daily_product`` for the requested days,
+so its cost depends on the length of the period and not on how many
+orders were placed. The aggregates are returned together as rows of a
+UNION ALL tagged with their ``kind``.
+
+Days before today no longer change unless an order's status does, so the
+figures for them are cached per seller and time range and only today's
+bucket is queried on every request and merged in. Cached entries are keyed
+by a per-seller version that is bumped whenever the seller's rollups
+change; the catalog breakdown by category is always read fresh.
+"""
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+from sqlalchemy import Float, Integer, String, case, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import Session
+from app.core.cache import TieredCache, available_redis, mark_redis_down, redis
+from app.core.config import get_settings
+from app.models.order import OrderStatus
+from app.models.product import Category, Product, product_category
+from app.models.sales_rollup import SalesDailyProduct, SalesDailyStatus
+
+settings = get_settings()
+
+TimeRange = Literal["week", "month", "year"]
+
+# Length of the period for each time_range, in days
+TIME_RANGES: Dict[TimeRange, int] = {"week": 7, "month": 30, "year": 365}
+
+TOP_PRODUCTS = 5
+
+VERSION_KEY = "analytics-version:{}"
+
+# Figures for the closed days of a period, keyed by seller, time range,
+# today's date and the seller's version, so an entry is never read after
+# the seller's rollups changed. While Redis is down versions are per
+# worker, and other workers' entries live for the local TTL.
+analytics_cache = TieredCache(
+    "analytics",
+    local_size=settings.ANALYTICS_CACHE_LOCAL_SIZE,
+    local_ttl=settings.ANALYTICS_CACHE_LOCAL_TTL,
+    redis_ttl=settings.ANALYTICS_CACHE_TTL,
+)
+
+# Versions while Redis is unavailable; only this worker sees them
+_local_versions: Dict[str, int] = defaultdict(int)
+_local_versions_lock = threading.Lock()
+
+def period_bounds(time_range: TimeRange, now: datetime = None) -> Tuple[date, date, date]:
+    """
+    (previous period's first day, period's first day, last day) for
+    ``time_range``. A period ends today (UTC) and includes it.
+    """
+    end = (now or datetime.utcnow()).date()
+    start = end - timedelta(days=TIME_RANGES[time_range] - 1)
+    return start - timedelta(days=TIME_RANGES[time_range]), start, end
+
+def _row(kind: str, key: Any, *, label: Any = None, amount: Any = None, quantity: Any = None, orders: Any = None):
+    # Every branch of the UNION ALL has the same columns and types
+    return (
+        literal(kind).label("kind"),
+        cast(key, String).label("key"),
+        cast(label if label is not None else null(), String).label("label"),
+        cast(amount if amount is not None else null(), Float).label("amount"),
+        cast(quantity if quantity is not None else null(), Integer).label("quantity"),
+        cast(orders if orders is not None else null(), Integer).label("orders"),
+    )
+
+def _status_rows(seller_id: int, prev_start: date, start: date, end: date) -> List[Any]:
+    by_status = SalesDailyStatus
+    in_period = (by_status.seller_id == seller_id, by_status.day >= start, by_status.day <= end)
+    period = case((by_status.day >= start, "current"), else_="previous")
+    return [
+        select(*_row("day", by_status.day, amount=func.sum(by_status.revenue), orders=func.sum(by_status.orders)))
+        .where(*in_period)
+        .group_by(by_status.day),
+        select(*_row("period", period, amount=func.sum(by_status.revenue), orders=func.sum(by_status.orders)))
+        .where(by_status.seller_id == seller_id, by_status.day >= prev_start, by_status.day <= end)
+        .group_by(period),
+        select(*_row("status", by_status.status, orders=func.sum(by_status.orders)))
+        .where(*in_period)
+        .group_by(by_status.status),
+    ]
+
+def _product_sums(seller_id: int, start: date, end: date):
+    by_product = SalesDailyProduct
+    return (
+        select(
+            by_product.product_id,
+            func.sum(by_product.quantity).label("quantity"),
+            func.sum(by_product.revenue).label("amount"),
+        )
+        .where(by_product.seller_id == seller_id, by_product.day >= start, by_product.day <= end)
+        .group_by(by_product.product_id)
+    )
+
+def closed_statement(seller_id: int, prev_start: date, start: date, end: date):
+    """
+    Figures for the days from ``prev_start`` to ``end``, with the sales
+    (without names) of every product sold from ``start``: any of them may
+    reach the top once today's sales are added.
+    """
+    sums = _product_sums(seller_id, start, end).subquery()
+    products = select(*_row("product", sums.c.product_id, amount=sums.c.amount, quantity=sums.c.quantity))
+    return union_all(*_status_rows(seller_id, prev_start, start, end), products)
+
+def open_statement(seller_id: int, day: date, candidates: Iterable[int]):
+    """
+    Figures for ``day`` alone, the names and ``day``'s sales of the products
+    sold on it or in ``candidates``, and the seller's catalog by category.
+    """
+    sums = _product_sums(seller_id, day, day).subquery()
+    products = (
+        select(*_row(
+            "product", Product.id, label=Product.name,
+            amount=func.coalesce(sums.c.amount, 0), quantity=func.coalesce(sums.c.quantity, 0),
+        ))
+        .select_from(Product)
+        .outerjoin(sums, sums.c.product_id == Product.id)
+        .where(or_(sums.c.product_id.isnot(None), Product.id.in_(list(candidates))))
+    )
+    categories = (
+        select(*_row("category", Category.name, orders=func.count(Product.id)))
+        .select_from(Product)
+        .join(product_category, product_category.c.product_id == Product.id)
+        .join(Category, Category.id == product_category.c.category_id)
+        .where(Product.seller_id == seller_id)
+        .group_by(Category.name)
+    )
+    return union_all(*_status_rows(seller_id, day, day, day), products, categories)
+
+def _collect(rows: Iterable[Any]) -> Dict[str, Any]:
+    figures = {
+        "days": {},
+        "periods": {"current": [0.0, 0], "previous": [0.0, 0]},
+        "statuses": {},
+        "products": {},
+        "categories": [],
+    }
+    for row in rows:
+        if row.kind == "day":
+            figures["days"][row.key] = [float(row.amount), row.orders]
+        elif row.kind == "period":
+            figures["periods"][row.key] = [float(row.amount or 0), row.orders]
+        elif row.kind == "status":
+            # Enums are stored by name
+            figures["statuses"][row.key] = row.orders
+        elif row.kind == "product":
+            figures["products"][row.key] = [row.label, row.quantity, float(row.amount)]
+        else:
+            figures["categories"].append({"category": row.key, "count": row.orders})
+    return figures
+
+def _versions(seller_id: int) -> str:
+    keys = [VERSION_KEY.format("all"), VERSION_KEY.format(seller_id)]
+    client = available_redis()
+    if client is not None:
+        try:
+            return ".".join((value or b"0").decode() for value in client.mget(keys))
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    with _local_versions_lock:
+        return "local." + ".".join(str(_local_versions[key]) for key in keys)
+
+def invalidate_seller_analytics(seller_ids: Optional[Iterable[int]]) -> None:
+    """
+    Drop the cached analytics of ``seller_ids``, or of every seller with
+    None. Call after the transaction that changed their rollups committed.
+    """
+    keys = [VERSION_KEY.format("all")] if seller_ids is None else [
+        VERSION_KEY.format(seller_id) for seller_id in set(seller_ids)
+    ]
+    if not keys:
+        return
+    with _local_versions_lock:
+        for key in keys:
+            _local_versions[key] += 1
+    client = available_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            for key in keys:
+                pipe.incr(key)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_down(e)
+
+def _closed_figures(db: Session, seller_id: int, time_range: TimeRange, now: Optional[datetime]) -> Dict[str, Any]:
+    prev_start, start, today = period_bounds(time_range, now)
+    key = f"{seller_id}:{time_range}:{today.isoformat()}:{_versions(seller_id)}"
+    figures = analytics_cache.get(key)
+    if figures is None:
+        figures = _collect(db.execute(closed_statement(seller_id, prev_start, start, today - timedelta(days=1))))
+        analytics_cache.set(key, figures)
+    return figures
+
+def seller_analytics(db: Session, seller_id: int, time_range: TimeRange, now: datetime = None) -> Dict[str, Any]:
+    """
+    Dashboard figures for ``seller_id`` over ``time_range``: the closed days
+    from the cache (one query to fill it), merged with today's, queried
+    every time. Orders are counted once however many of the seller's items
+    they have.
+    """
+    today = (now or datetime.utcnow()).date()
+    closed = _closed_figures(db, seller_id, time_range, now)
+    # Only the closed days' top products and today's can make the top
+    candidates = sorted(closed["products"], key=lambda key: (-closed["products"][key][1], int(key)))
+    current = _collect(db.execute(
+        open_statement(seller_id, today, [int(key) for key in candidates[:TOP_PRODUCTS]])
+    ))
+
+    days = {**closed["days"], **current["days"]}
+    revenue = closed["periods"]["current"][0] + current["periods"]["current"][0]
+    order_count = closed["periods"]["current"][1] + current["periods"]["current"][1]
+    prev_revenue = closed["periods"]["previous"][0]
+    statuses = {
+        status: closed["statuses"].get(status.name, 0) + current["statuses"].get(status.name, 0)
+        for status in OrderStatus
+    }
+    products = []
+    for key, (name, quantity, amount) in current["products"].items():
+        _, closed_quantity, closed_amount = closed["products"].get(key, (None, 0, 0.0))
+        products.append((-(quantity + closed_quantity), int(key), name, amount + closed_amount))
+    products.sort()
+
+    return {
+        "sales": [
+            {"date": day, "amount": amount, "orders": orders}
+            for day, (amount, orders) in sorted(days.items())
+        ],
+        "products": current["categories"],
+        "revenue": {
+            "total": revenue,
+            "average": revenue / order_count if order_count else 0.0,
+            "growth": (revenue - prev_revenue) / prev_revenue * 100 if prev_revenue > 0 else 0.0,
+        },
+        "orders": {
+            "total": order_count,
+            "pending": statuses[OrderStatus.PENDING],
+            # There is no separate "completed" status; delivered orders are
+            "completed": statuses[OrderStatus.DELIVERED],
+            "cancelled": statuses[OrderStatus.CANCELLED],
+            "byStatus": {status.value: count for status, count in statuses.items()},
+        },
+        "topProducts": [
+            {"name": name, "sales": -negative_quantity, "revenue": amount}
+            for negative_quantity, _, name, amount in products[:TOP_PRODUCTS]
+        ],
+    }
+
+def cache_stats() -> Dict[str, Any]:
+    return analytics_cache.stats()
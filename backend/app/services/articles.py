@@ -0,0 +1,57 @@
+from typing import Any, Dict, List
+from sqlalchemy import Float, case, func, literal, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.product import Product, normalize_sku
+
+def lookup_articles(db: Session, article: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Products whose article number matches ``article`` exactly or closely,
+    best first, in one query.
+
+    PostgreSQL uses the btree index on ``sku_normalized`` for the exact match
+    and the pg_trgm GIN index for typo-tolerant similarity (``%``); SQLite
+    falls back to exact and prefix matches.
+    """
+    key = normalize_sku(article)
+    if not key:
+        return []
+
+    exact = Product.sku_normalized == key
+    if db.get_bind().dialect.name == "postgresql":
+        score = func.similarity(Product.sku_normalized, key)
+        condition = or_(exact, Product.sku_normalized.op("%")(key))
+    else:
+        score = case((exact, 1.0), else_=literal(0.5, Float))
+        condition = or_(exact, Product.sku_normalized.startswith(key, autoescape=True))
+
+    rows = db.execute(
+        select(
+            Product.id, Product.name, Product.sku, Product.brand, Product.model,
+            Product.price, Product.stock, Product.seller_id,
+            exact.label("exact"), score.label("score"),
+        )
+        .where(condition, Product.is_active.is_not(False))
+        .order_by(exact.desc(), score.desc(), Product.id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
+
+def backfill_sku_keys(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fill ``sku_normalized`` for rows written before it existed.
+    """
+    total = 0
+    while True:
+        rows = db.execute(
+            select(Product.id, Product.sku)
+            .where(Product.sku_normalized.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        db.execute(update(Product), [
+            {"id": row.id, "sku_normalized": normalize_sku(row.sku) or ""}
+            for row in rows
+        ])
+        db.commit()
+        total += len(rows)
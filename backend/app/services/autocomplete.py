@@ -0,0 +1,329 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.cache import LocalCache, available_redis, mark_redis_down, redis
+from app.core.config import get_settings
+from app.models.order import OrderItem
+from app.models.product import Product, normalize_sku
+
+settings = get_settings()
+
+VERSION_KEY = "autocomplete:version"
+CHANGES_KEY = "autocomplete:changes"
+
+# Upper bound for ``limit``; result lists are cached at this length.
+MAX_SUGGESTIONS = 20
+
+# Word suffixes indexed per name, so "filter" finds "Oil filter Komatsu"
+MAX_INDEXED_WORDS = 8
+
+# Above this many changed keys the result cache is cleared instead of
+# invalidated prefix by prefix.
+PREFIX_INVALIDATION_LIMIT = 200
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def fold(text: str) -> str:
+    """
+    Comparison form of a term or query: case-folded words separated by
+    single spaces.
+    """
+    return " ".join(_WORD_RE.findall(text.casefold()))
+
+def _word_suffixes(text: str) -> List[str]:
+    words = fold(text).split()
+    return [" ".join(words[i:]) for i in range(min(len(words), MAX_INDEXED_WORDS))]
+
+def _sku_key(sku: str) -> str:
+    return (normalize_sku(sku) or "").casefold()
+
+class AutocompleteIndex:
+    """
+    In-process prefix index over product names, brands, models and SKUs.
+
+    Keys live in a sorted list of ``(key, suggestion_id)`` tuples; a prefix
+    is a contiguous slice found with two binary searches. Suggestions are
+    ranked by popularity (units ordered; for brands and models the sum over
+    their products) and the ranked list per prefix is cached until one of
+    its keys changes.
+
+    The index is built on first use and then kept current by
+    ``refresh_products``, called from the product write paths. Those calls
+    also append the product ids to a change log in Redis that other workers
+    replay every AUTOCOMPLETE_CHECK_INTERVAL seconds.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: List[Tuple[str, str]] = []
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._members: Dict[str, Set[int]] = {}
+        self._products: Dict[int, Dict[str, Any]] = {}
+        self._results = LocalCache(settings.AUTOCOMPLETE_CACHE_SIZE, settings.AUTOCOMPLETE_CACHE_TTL)
+        self._loaded = False
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    # Loading
+
+    def _query(self, db: Session, product_ids: Optional[List[int]] = None):
+        popularity = select(
+            OrderItem.product_id, func.sum(OrderItem.quantity).label("units")
+        ).group_by(OrderItem.product_id)
+        if product_ids is not None:
+            popularity = popularity.where(OrderItem.product_id.in_(product_ids))
+        popularity = popularity.subquery()
+        query = select(
+            Product.id, Product.name, Product.brand, Product.model, Product.sku,
+            func.coalesce(popularity.c.units, 0),
+        ).outerjoin(popularity, popularity.c.product_id == Product.id).where(
+            Product.is_active.isnot(False)
+        )
+        if product_ids is not None:
+            query = query.where(Product.id.in_(product_ids))
+        return db.execute(query)
+
+    def _build(self, db: Session) -> None:
+        self._keys = []
+        self._entries = {}
+        self._members = {}
+        self._products = {}
+        self._results.clear()
+        self._version = self._remote_version()
+        keys = []
+        for row in self._query(db):
+            keys.extend(self._add_product(*row))
+        # Brands and models shared by several products repeat their keys
+        self._keys = sorted(set(keys))
+        self._loaded = True
+        self._checked_at = time.monotonic()
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self._build(db)
+        else:
+            self._sync(db)
+
+    # Entries
+
+    def _entry_keys(self, entry: Dict[str, Any]) -> List[str]:
+        if entry["kind"] == "sku":
+            return [_sku_key(entry["text"])]
+        return _word_suffixes(entry["text"])
+
+    # _add_product and _remove_product update the entries and return the
+    # (key, suggestion_id) pairs they touched; the sorted key list is
+    # brought up to date once per batch by _build or _apply.
+
+    def _add_product(self, product_id, name, brand, model, sku, popularity) -> List[Tuple[str, str]]:
+        popularity = int(popularity or 0)
+        self._products[product_id] = {
+            "name": name, "brand": brand, "model": model, "sku": sku, "popularity": popularity,
+        }
+        added = []
+        for kind, text in (("product", name), ("sku", sku)):
+            if not text or not fold(text):
+                continue
+            suggestion_id = f"{kind}:{product_id}"
+            entry = {"text": text, "kind": kind, "product_id": product_id, "popularity": popularity}
+            self._entries[suggestion_id] = entry
+            added += [(key, suggestion_id) for key in self._entry_keys(entry) if key]
+        for kind, text in (("brand", brand), ("model", model)):
+            if not text or not fold(text):
+                continue
+            suggestion_id = f"{kind}:{fold(text)}"
+            entry = self._entries.get(suggestion_id)
+            if entry is None:
+                entry = {"text": text, "kind": kind, "product_id": None, "popularity": 0}
+                self._entries[suggestion_id] = entry
+                self._members[suggestion_id] = set()
+                added += [(key, suggestion_id) for key in self._entry_keys(entry) if key]
+            else:
+                # The score of an existing brand/model changed
+                added += [(key, suggestion_id) for key in self._entry_keys(entry)]
+            self._members[suggestion_id].add(product_id)
+            entry["popularity"] += popularity
+        return added
+
+    def _remove_product(self, product_id: int) -> List[Tuple[str, str]]:
+        state = self._products.pop(product_id, None)
+        if state is None:
+            return []
+        removed = []
+        for kind in ("product", "sku"):
+            suggestion_id = f"{kind}:{product_id}"
+            entry = self._entries.pop(suggestion_id, None)
+            if entry is None:
+                continue
+            removed += [(key, suggestion_id) for key in self._entry_keys(entry)]
+        for kind in ("brand", "model"):
+            text = state[kind]
+            if not text or not fold(text):
+                continue
+            suggestion_id = f"{kind}:{fold(text)}"
+            entry = self._entries.get(suggestion_id)
+            if entry is None:
+                continue
+            keys = self._entry_keys(entry)
+            members = self._members[suggestion_id]
+            members.discard(product_id)
+            entry["popularity"] -= state["popularity"]
+            if not members:
+                del self._entries[suggestion_id]
+                del self._members[suggestion_id]
+            removed += [(key, suggestion_id) for key in keys]
+        return removed
+
+    def _invalidate(self, keys: Iterable[Tuple[str, str]]) -> None:
+        keys = {key for key, _ in keys}
+        if len(keys) > PREFIX_INVALIDATION_LIMIT:
+            self._results.clear()
+            return
+        for key in keys:
+            for end in range(1, len(key) + 1):
+                self._results.delete(key[:end])
+
+    def _apply(self, db: Session, product_ids: List[int]) -> None:
+        changed = []
+        for product_id in product_ids:
+            changed += self._remove_product(product_id)
+        for row in self._query(db, product_ids):
+            changed += self._add_product(*row)
+        self._merge_keys(changed)
+        self._invalidate(changed)
+
+    def _merge_keys(self, changed: List[Tuple[str, str]]) -> None:
+        """
+        Bring the sorted key list up to date after a batch of changes: drop
+        the touched pairs and merge back those whose suggestion still has
+        that key, in one pass over the list instead of one per key.
+        """
+        changed = set(changed)
+        entry_keys: Dict[str, Set[str]] = {}
+        current = []
+        for key, suggestion_id in changed:
+            entry = self._entries.get(suggestion_id)
+            if entry is None:
+                continue
+            if suggestion_id not in entry_keys:
+                entry_keys[suggestion_id] = set(self._entry_keys(entry))
+            if key in entry_keys[suggestion_id]:
+                current.append((key, suggestion_id))
+        kept = [item for item in self._keys if item not in changed]
+        self._keys = list(heapq.merge(kept, sorted(current)))
+
+    # Cross-worker change log
+
+    def _remote_version(self) -> Optional[int]:
+        client = available_redis()
+        if client is None:
+            return None
+        try:
+            return int(client.get(VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            return None
+
+    def _publish(self, product_ids: List[int]) -> None:
+        client = available_redis()
+        if client is None:
+            return
+        try:
+            version = client.incr(VERSION_KEY)
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(CHANGES_KEY, {str(product_id): version for product_id in product_ids})
+            pipe.zremrangebyscore(CHANGES_KEY, "-inf", version - settings.AUTOCOMPLETE_CHANGE_LOG_SIZE)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_down(e)
+
+    def _sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < settings.AUTOCOMPLETE_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        version = self._remote_version()
+        if version is None or version == self._version:
+            return
+        if self._version is None or version - self._version > settings.AUTOCOMPLETE_CHANGE_LOG_SIZE:
+            # Changes older than the log are gone; start over
+            self._build(db)
+            return
+        client = available_redis()
+        try:
+            changed = client.zrangebyscore(CHANGES_KEY, self._version + 1, version)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            return
+        self._apply(db, [int(product_id) for product_id in changed])
+        self._version = version
+
+    # Public API
+
+    def suggest(self, db: Session, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Up to ``limit`` suggestions whose name, brand, model or SKU (or a word
+        inside a name) starts with ``prefix``, most popular first.
+        """
+        query = fold(prefix)
+        if not query:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        with self._lock:
+            self._ensure_loaded(db)
+            results = self._results.get(query)
+            if results is None:
+                results = self._rank(query)
+                self._results.set(query, results)
+        return results[:limit]
+
+    def _rank(self, query: str) -> List[Dict[str, Any]]:
+        candidates = set()
+        for prefix in {query, _sku_key(query)}:
+            if not prefix:
+                continue
+            low = bisect_left(self._keys, (prefix,))
+            high = bisect_left(self._keys, (prefix + "\U0010ffff",), low)
+            candidates.update(suggestion_id for _, suggestion_id in self._keys[low:high])
+
+        entries = self._entries
+
+        # Most popular, then shortest first. Products sharing a name are
+        # suggested once, so candidates are popped off a heap until the list
+        # is full: O(n) to build it plus O(log n) per suggestion taken.
+        heap = []
+        for suggestion_id in candidates:
+            entry = entries[suggestion_id]
+            heap.append((-entry["popularity"], len(entry["text"]), suggestion_id))
+        heapq.heapify(heap)
+        results, seen = [], set()
+        while heap:
+            suggestion_id = heapq.heappop(heap)[2]
+            entry = entries[suggestion_id]
+            text_key = (entry["kind"], fold(entry["text"]))
+            if text_key in seen:
+                continue
+            seen.add(text_key)
+            results.append(dict(entry))
+            if len(results) == MAX_SUGGESTIONS:
+                break
+        return results
+
+    def refresh_products(self, db: Session, product_ids: Iterable[int]) -> None:
+        """
+        Re-read the given products (and their popularity) after a committed
+        write; deleted or deactivated products drop out of the index.
+        """
+        product_ids = sorted(set(product_ids))
+        if not product_ids:
+            return
+        with self._lock:
+            if self._loaded:
+                self._apply(db, product_ids)
+        self._publish(product_ids)
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,36 @@
+from typing import Any, Optional, Tuple
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, Query
+from app.models.product import Product, product_category
+from app.schemas.product import ProductFilter
+from app.services.categories import descendant_ids
+from app.services.compatibility import fits_machine
+from app.services.search import search_products
+
+def filter_products(db: Session, query: Query, filter: ProductFilter) -> Tuple[Query, Optional[Any]]:
+    """
+    Apply the ``ProductFilter`` conditions shared by the catalog endpoints.
+
+    Returns the filtered query and, when ``filter.search`` is set, the
+    relevance expression to order by.
+    """
+    if filter.category_id:
+        # Products in the category or any of its subcategories
+        query = query.filter(exists().where(
+            product_category.c.product_id == Product.id,
+            product_category.c.category_id.in_(descendant_ids(filter.category_id)),
+        ))
+    if filter.min_price is not None:
+        query = query.filter(Product.price >= filter.min_price)
+    if filter.max_price is not None:
+        query = query.filter(Product.price <= filter.max_price)
+    if filter.brand:
+        query = query.filter(Product.brand == filter.brand)
+    if filter.condition:
+        query = query.filter(Product.condition == filter.condition)
+    if filter.machine:
+        query = query.filter(fits_machine(filter.machine))
+    rank = None
+    if filter.search and filter.search.strip():
+        query, rank = search_products(db, query, filter.search)
+    return query, rank
@@ -0,0 +1,214 @@
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, delete, insert, func, and_
+from sqlalchemy.orm import Session
+from app.core.cache import available_redis, mark_redis_down, redis
+from app.core.config import get_settings
+from app.core.http_cache import compute_etag, http_now
+from app.models.product import Category, category_closure
+from app.schemas.product import Category as CategorySchema
+
+settings = get_settings()
+
+TREE_VERSION_KEY = "category_tree:version"
+
+def descendant_ids(category_id: int):
+    """
+    Subquery of ``category_id`` and all categories below it, served by the
+    closure table's primary key.
+    """
+    return select(category_closure.c.descendant_id).where(
+        category_closure.c.ancestor_id == category_id
+    )
+
+def add_to_closure(db: Session, category: Category) -> None:
+    """
+    Link a newly flushed category to itself and to every ancestor of its
+    parent.
+    """
+    db.execute(insert(category_closure).values(
+        ancestor_id=category.id, descendant_id=category.id, depth=0
+    ))
+    if category.parent_id is not None:
+        db.execute(insert(category_closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                category_closure.c.ancestor_id,
+                category.id,
+                category_closure.c.depth + 1,
+            ).where(category_closure.c.descendant_id == category.parent_id),
+        ))
+
+def move_in_closure(db: Session, category: Category, new_parent_id: Optional[int]) -> None:
+    """
+    Re-hang the subtree rooted at ``category`` under ``new_parent_id``.
+    """
+    subtree = select(category_closure.c.descendant_id).where(
+        category_closure.c.ancestor_id == category.id
+    )
+    if new_parent_id is not None:
+        in_subtree = db.execute(
+            subtree.where(category_closure.c.descendant_id == new_parent_id)
+        ).first()
+        if in_subtree:
+            raise HTTPException(
+                status_code=400,
+                detail="A category cannot be moved under itself or its descendants",
+            )
+
+    # Detach the subtree from its current ancestors
+    db.execute(delete(category_closure).where(and_(
+        category_closure.c.descendant_id.in_(subtree.scalar_subquery()),
+        category_closure.c.ancestor_id.not_in(subtree.scalar_subquery()),
+    )))
+
+    # Attach it to every ancestor of the new parent
+    if new_parent_id is not None:
+        above = category_closure.alias("above")
+        below = category_closure.alias("below")
+        db.execute(insert(category_closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                above.c.ancestor_id,
+                below.c.descendant_id,
+                above.c.depth + below.c.depth + 1,
+            ).select_from(
+                above.join(below, below.c.ancestor_id == category.id)
+            ).where(above.c.descendant_id == new_parent_id),
+        ))
+
+def rebuild_closure(db: Session) -> None:
+    """
+    Recompute the closure table from ``Category.parent_id``.
+    """
+    parents = dict(db.execute(select(Category.id, Category.parent_id)).all())
+    rows = []
+    for category_id in parents:
+        ancestor_id, depth, seen = category_id, 0, set()
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            rows.append({"ancestor_id": ancestor_id, "descendant_id": category_id, "depth": depth})
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+    db.execute(delete(category_closure))
+    if rows:
+        db.execute(insert(category_closure), rows)
+
+def ensure_closure(db: Session) -> None:
+    """
+    Rebuild the closure table if any category is missing from it, e.g. on
+    first start after the table was introduced.
+    """
+    missing = db.execute(
+        select(func.count(Category.id)).where(
+            Category.id.not_in(
+                select(category_closure.c.descendant_id).where(category_closure.c.depth == 0)
+            )
+        )
+    ).scalar()
+    if missing:
+        rebuild_closure(db)
+        db.commit()
+
+class CategoryTreeCache:
+    """
+    In-memory copy of all categories, rebuilt only after a category changes.
+
+    Changes made by this worker invalidate it directly; other workers notice
+    through a version counter in Redis, checked at most every
+    CATEGORY_TREE_CHECK_INTERVAL seconds. Without Redis they cannot, so a
+    copy is also dropped CATEGORY_TREE_LOCAL_TTL seconds after it was
+    loaded.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._categories: Optional[List[Dict[str, Any]]] = None
+        self._tree: Optional[List[Dict[str, Any]]] = None
+        self._etag: Optional[str] = None
+        self._loaded_at: Optional[datetime] = None
+        self._expires_at = 0.0
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def _remote_version(self) -> Optional[int]:
+        client = available_redis()
+        if client is None:
+            return None
+        try:
+            return int(client.get(TREE_VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+            return None
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._categories = None
+        if now - self._checked_at < settings.CATEGORY_TREE_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        version = self._remote_version()
+        if version is not None and version != self._version:
+            self._categories = None
+            self._version = version
+
+    def _load(self, db: Session) -> None:
+        categories = db.query(Category).order_by(Category.name, Category.id).all()
+        flat = [
+            CategorySchema.model_validate(category).model_dump(mode="json")
+            for category in categories
+        ]
+        nodes = {item["id"]: {**item, "children": []} for item in flat}
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            (parent["children"] if parent else roots).append(node)
+        etag = compute_etag(flat)
+        # An expired copy reloaded unchanged keeps its Last-Modified
+        if etag != self._etag:
+            self._loaded_at = http_now()
+        self._categories = flat
+        self._tree = roots
+        self._etag = etag
+        self._expires_at = time.monotonic() + settings.CATEGORY_TREE_LOCAL_TTL
+
+    def categories(self, db: Session) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._check_version()
+            if self._categories is None:
+                self._load(db)
+            return self._categories
+
+    def validated_categories(self, db: Session) -> Tuple[List[Dict[str, Any]], str, datetime]:
+        """
+        The flat list with its ETag and the time it was loaded, for
+        conditional requests.
+        """
+        with self._lock:
+            self._check_version()
+            if self._categories is None:
+                self._load(db)
+            return self._categories, self._etag, self._loaded_at
+
+    def tree(self, db: Session) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._check_version()
+            if self._categories is None:
+                self._load(db)
+            return self._tree
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._categories = None
+            self._tree = None
+        client = available_redis()
+        if client is not None:
+            try:
+                self._version = client.incr(TREE_VERSION_KEY)
+            except redis.RedisError as e:
+                mark_redis_down(e)
+
+category_tree = CategoryTreeCache()
@@ -0,0 +1,92 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import delete, exists, false, insert
+from sqlalchemy.orm import Session
+from app.models.product import Product, ProductCompatibility
+
+_NON_ALNUM_RE = re.compile(r"[\W_]+", re.UNICODE)
+_LIST_SEPARATORS_RE = re.compile(r"[;,\n]")
+
+def machine_key(model: str) -> str:
+    """
+    Normalize a machine model for lookup: "Komatsu PC200-8",
+    "komatsu pc 200/8" and "KOMATSU PC2008" all become "komatsupc2008".
+    """
+    return _NON_ALNUM_RE.sub("", model.casefold())
+
+def parse_specifications(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Accept specifications as a dict or as the JSON string used in price
+    lists; anything else is rejected with ValueError.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        parsed = json.loads(value)
+        if isinstance(parsed, dict):
+            return parsed
+    raise ValueError("specifications must be a JSON object")
+
+def compatible_models(specifications: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Machine models from ``specifications["compatibility"]``, which sellers
+    send either as a list or as a comma/semicolon separated string.
+    """
+    if not specifications:
+        return []
+    raw = specifications.get("compatibility")
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        raw = _LIST_SEPARATORS_RE.split(raw)
+    elif not isinstance(raw, (list, tuple)):
+        raw = [raw]
+    models = []
+    for model in raw:
+        model = str(model).strip()
+        if model and machine_key(model):
+            models.append(model)
+    return models
+
+def sync_compatibility(db: Session, products: Iterable[Product]) -> None:
+    """
+    Rebuild the index entries of flushed products from their specifications.
+    """
+    sync_compatibility_specs(db, {product.id: product.specifications for product in products})
+
+def sync_compatibility_specs(db: Session, specifications: Dict[int, Optional[Dict[str, Any]]]) -> None:
+    """
+    Same as ``sync_compatibility`` for rows written without the ORM, given
+    as product id -> specifications.
+    """
+    if not specifications:
+        return
+    db.execute(delete(ProductCompatibility).where(
+        ProductCompatibility.product_id.in_(list(specifications))
+    ))
+    rows = {}
+    for product_id, specs in specifications.items():
+        for model in compatible_models(specs):
+            rows[(machine_key(model), product_id)] = model
+    if rows:
+        db.execute(insert(ProductCompatibility), [
+            {"machine_key": key, "product_id": product_id, "machine_model": model}
+            for (key, product_id), model in rows.items()
+        ])
+
+def fits_machine(machine: str):
+    """
+    Condition for products compatible with ``machine``. Normalized keys must
+    be equal: "PC200" and "PC2000" are different machines and prefixes would
+    not tell them apart.
+    """
+    key = machine_key(machine)
+    if not key:
+        return false()
+    return exists().where(
+        ProductCompatibility.product_id == Product.id,
+        ProductCompatibility.machine_key == key,
+    )
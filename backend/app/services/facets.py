@@ -0,0 +1,112 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy import String, case, cast, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from app.core.cache import TieredCache
+from app.core.config import get_settings
+from app.models.product import Product, Category, product_category
+from app.schemas.product import ProductFilter
+from app.services.catalog import filter_products
+
+settings = get_settings()
+
+facet_cache = TieredCache(
+    "facets",
+    local_size=1000,
+    local_ttl=settings.FACETS_CACHE_TTL,
+    redis_ttl=settings.FACETS_CACHE_TTL,
+)
+
+# ProductFilter fields that change facet counts; paging and sorting do not.
+FACET_FILTER_FIELDS = (
+    "category_id", "min_price", "max_price", "brand", "condition", "search", "machine",
+)
+
+def facet_cache_key(filter: ProductFilter) -> str:
+    values = filter.model_dump(include=set(FACET_FILTER_FIELDS))
+    if values.get("search"):
+        values["search"] = " ".join(values["search"].lower().split())
+    normalized = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+def _price_buckets() -> List[Dict[str, Optional[float]]]:
+    bounds = sorted(settings.PRICE_FACET_BOUNDARIES)
+    edges = [None] + bounds + [None]
+    return [{"min": low, "max": high} for low, high in zip(edges, edges[1:])]
+
+def _price_bucket_expr(price_column):
+    bounds = sorted(settings.PRICE_FACET_BOUNDARIES)
+    return case(
+        *[(price_column < bound, literal(str(index))) for index, bound in enumerate(bounds)],
+        else_=literal(str(len(bounds))),
+    )
+
+def compute_facets(db: Session, filter: ProductFilter) -> Dict[str, Any]:
+    """
+    Count brands, conditions, categories and price buckets for the products
+    matching ``filter`` in one statement: the filtered products are a CTE and
+    every facet is a GROUP BY branch of a UNION ALL over it.
+    """
+    query, _ = filter_products(
+        db, db.query(Product.id, Product.brand, Product.condition, Product.price), filter
+    )
+    filtered = query.cte("filtered")
+
+    def branch(facet, value, label, group_by, *joins):
+        stmt = select(
+            literal(facet).label("facet"),
+            cast(value, String).label("value"),
+            label.label("label"),
+            func.count().label("count"),
+        ).select_from(filtered)
+        for target, onclause in joins:
+            stmt = stmt.join(target, onclause)
+        if group_by is not None:
+            stmt = stmt.group_by(*group_by)
+        return stmt
+
+    bucket = _price_bucket_expr(filtered.c.price)
+    statement = union_all(
+        branch("total", null(), null(), None),
+        branch("brand", filtered.c.brand, null(), [filtered.c.brand]),
+        branch("condition", filtered.c.condition, null(), [filtered.c.condition]),
+        branch("price", bucket, null(), [bucket]),
+        branch(
+            "category", Category.id, Category.name, [Category.id, Category.name],
+            (product_category, product_category.c.product_id == filtered.c.id),
+            (Category, Category.id == product_category.c.category_id),
+        ),
+    )
+
+    result = {"total": 0, "brands": [], "conditions": [], "categories": [], "price_ranges": []}
+    buckets = _price_buckets()
+    for row in db.execute(statement):
+        if row.facet == "total":
+            result["total"] = row.count
+        elif row.value is None:
+            continue
+        elif row.facet == "brand":
+            result["brands"].append({"value": row.value, "count": row.count})
+        elif row.facet == "condition":
+            result["conditions"].append({"value": row.value, "count": row.count})
+        elif row.facet == "category":
+            result["categories"].append({"id": int(row.value), "name": row.label, "count": row.count})
+        elif row.facet == "price":
+            result["price_ranges"].append({**buckets[int(row.value)], "count": row.count})
+
+    for key in ("brands", "conditions", "categories"):
+        result[key].sort(key=lambda item: -item["count"])
+    result["price_ranges"].sort(key=lambda item: float("-inf") if item["min"] is None else item["min"])
+    return result
+
+def get_facets(db: Session, filter: ProductFilter) -> Dict[str, Any]:
+    """
+    Facet counts for ``filter``, cached for FACETS_CACHE_TTL seconds.
+    """
+    key = facet_cache_key(filter)
+    facets = facet_cache.get(key)
+    if facets is None:
+        facets = compute_facets(db, filter)
+        facet_cache.set(key, facets)
+    return facets
@@ -0,0 +1,56 @@
+"""
+CPU-bound image work, run in worker processes by ``app.services.images``.
+Kept free of application imports so that workers start quickly.
+"""
+import io
+from typing import Dict, Tuple
+from PIL import Image, ImageOps
+
+# Formats accepted for originals and the extension they are stored under
+ORIGINAL_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+class InvalidImage(ValueError):
+    pass
+
+def _encode(image: Image.Image, format: str) -> bytes:
+    output = io.BytesIO()
+    if format == "jpeg":
+        if image.mode != "RGB":
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A") if image.mode == "RGBA" else None)
+            image = background
+        image.save(output, "JPEG", quality=85, optimize=True, progressive=True)
+    else:
+        image.save(output, "WEBP", quality=80, method=4)
+    return output.getvalue()
+
+def render_variants(data: bytes, sizes: Dict[str, int]) -> Tuple[str, int, int, Dict[str, Dict[str, bytes]]]:
+    """
+    Validate an uploaded image and render a JPEG and a WebP variant per
+    size, each fitted into a ``size`` x ``size`` box without upscaling.
+
+    Returns the original's file extension, its width and height (after EXIF
+    rotation) and ``{size name: {"jpeg": bytes, "webp": bytes}}``.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            extension = ORIGINAL_FORMATS.get(original.format)
+            if extension is None:
+                raise InvalidImage(f"Unsupported image format: {original.format}")
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except Image.DecompressionBombError:
+        raise InvalidImage("image dimensions are too large")
+    except OSError:
+        raise InvalidImage("the file is not a readable image")
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    width, height = image.size
+
+    variants = {}
+    for name, edge in sizes.items():
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+        variants[name] = {format: _encode(variant, format) for format in ("jpeg", "webp")}
+    return extension, width, height, variants
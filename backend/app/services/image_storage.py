@@ -0,0 +1,83 @@
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from urllib.parse import urlparse
+from app.core.config import get_settings
+
+try:
+    from minio import Minio
+except ImportError:  # pragma: no cover - only needed for IMAGE_STORAGE="minio"
+    Minio = None
+
+settings = get_settings()
+
+class ImageStorage(ABC):
+    """
+    Write-once blob store for image files. Keys are content addressed, so a
+    key that already exists never needs to be written again.
+    """
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        ...
+
+    def url(self, key: str) -> str:
+        return f"{settings.MEDIA_URL.rstrip('/')}/{key}"
+
+class LocalImageStorage(ImageStorage):
+    """
+    Files under MEDIA_ROOT, served by the app under the path of MEDIA_URL.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = os.path.join(self.root, key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write aside and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+class MinioImageStorage(ImageStorage):
+    """
+    Objects in MINIO_BUCKET_NAME; MEDIA_URL is the bucket's public URL.
+    """
+    def __init__(self):
+        if Minio is None:
+            raise RuntimeError("IMAGE_STORAGE=minio requires the minio package")
+        self.client = Minio(
+            settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=settings.MINIO_SECURE,
+        )
+        self.bucket = settings.MINIO_BUCKET_NAME
+        if not self.client.bucket_exists(self.bucket):
+            self.client.make_bucket(self.bucket)
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            self.bucket, key, io.BytesIO(data), len(data), content_type=content_type
+        )
+
+@lru_cache()
+def get_image_storage() -> ImageStorage:
+    if settings.IMAGE_STORAGE == "minio":
+        return MinioImageStorage()
+    return LocalImageStorage(settings.MEDIA_ROOT)
+
+def media_path() -> str:
+    """
+    URL path the app serves MEDIA_ROOT under when storing locally.
+    """
+    return urlparse(settings.MEDIA_URL).path.rstrip("/") or "/media"
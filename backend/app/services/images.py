@@ -0,0 +1,87 @@
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.models.product import ProductImage
+from app.services.image_processing import InvalidImage, render_variants
+from app.services.image_storage import get_image_storage
+
+settings = get_settings()
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "gif": "image/gif",
+}
+
+# Variant formats and the extension they are stored under
+VARIANT_EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+
+# Resizing is CPU bound; worker processes keep it off the GIL. Workers are
+# spawned rather than forked because the API process runs threads.
+image_executor = ProcessPoolExecutor(
+    settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+)
+
+def _stored(db: Session, digest: str) -> Optional[Dict[str, Any]]:
+    row = db.execute(
+        select(ProductImage.url, ProductImage.width, ProductImage.height, ProductImage.variants)
+        .where(ProductImage.content_hash == digest)
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    return {
+        "content_hash": digest,
+        "url": row.url,
+        "width": row.width,
+        "height": row.height,
+        "variants": row.variants,
+    }
+
+def ingest_image(db: Session, data: bytes) -> Dict[str, Any]:
+    """
+    Store an uploaded image and its resized variants under keys derived from
+    its SHA-256, and return the ``ProductImage`` columns describing it.
+
+    An image any seller uploaded before is recognised by its hash and
+    reused without being decoded again.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    stored = _stored(db, digest)
+    if stored is not None:
+        return stored
+
+    try:
+        extension, width, height, variants = image_executor.submit(
+            render_variants, data, settings.IMAGE_SIZES
+        ).result()
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image file: {e}")
+
+    storage = get_image_storage()
+    prefix = f"{digest[:2]}/{digest}"
+    original_key = f"originals/{prefix}.{extension}"
+    storage.put(original_key, data, CONTENT_TYPES[extension])
+    urls: Dict[str, Dict[str, str]] = {}
+    for size, encoded in variants.items():
+        for format, content in encoded.items():
+            variant_extension = VARIANT_EXTENSIONS[format]
+            key = f"variants/{prefix}-{size}.{variant_extension}"
+            storage.put(key, content, CONTENT_TYPES[variant_extension])
+            urls.setdefault(size, {})[format] = storage.url(key)
+    return {
+        "content_hash": digest,
+        "url": storage.url(original_key),
+        "width": width,
+        "height": height,
+        "variants": urls,
+    }
+
+def shutdown_image_pool() -> None:
+    image_executor.shutdown(wait=False, cancel_futures=True)
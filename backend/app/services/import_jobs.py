@@ -0,0 +1,267 @@
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import BinaryIO, Optional
+from uuid import uuid4
+from fastapi import HTTPException
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.import_job import ImportJob, ImportJobError, ImportJobStatus
+from app.services.product_import import ChunkResult, import_products
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+import_executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import")
+
+# Set on shutdown; running jobs stop before their next commit and are
+# resumed by the next process.
+_stopping = threading.Event()
+
+class ImportInterrupted(Exception):
+    pass
+
+class ImportClaimLost(Exception):
+    """
+    Another worker took the job over; this one must stop without writing.
+    """
+
+def spool_path(filename: str) -> str:
+    """
+    New path in IMPORT_DIR for a copy of an uploaded price list.
+    """
+    os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+    suffix = '.xlsx' if filename.endswith('.xlsx') else '.csv'
+    return os.path.join(settings.IMPORT_DIR, f"{uuid4().hex}{suffix}")
+
+def create_import_job(
+    db: Session, path: str, filename: str, seller_id: int, upsert: bool = False
+) -> ImportJob:
+    """
+    Add a pending job for a file already spooled to ``path``. The caller
+    commits and then calls ``start_import_job``.
+    """
+    job = ImportJob(
+        seller_id=seller_id,
+        filename=filename,
+        path=path,
+        chunk_size=settings.IMPORT_CHUNK_SIZE,
+        upsert=upsert,
+        status=ImportJobStatus.PENDING,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+def start_import_job(job_id: int) -> None:
+    import_executor.submit(run_import_job, job_id)
+
+def submit_import(
+    db: Session, file: BinaryIO, filename: str, seller_id: int, upsert: bool = False
+) -> ImportJob:
+    """
+    Spool the upload to IMPORT_DIR, record a pending job and queue it.
+    """
+    path = spool_path(filename)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(file, out, 1024 * 1024)
+
+    job = create_import_job(db, path, filename, seller_id, upsert=upsert)
+    db.commit()
+    db.refresh(job)
+    start_import_job(job.id)
+    return job
+
+def _claim(db: Session, job_id: int) -> Optional[str]:
+    """
+    Mark the job as running by this worker and return the claim token its
+    writes must carry, or None if it cannot be claimed. A running job can
+    only be taken over once its heartbeat is older than
+    IMPORT_JOB_STALE_AFTER, i.e. its worker died.
+    """
+    token = uuid4().hex
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.IMPORT_JOB_STALE_AFTER)
+    result = db.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status == ImportJobStatus.PENDING,
+                and_(
+                    ImportJob.status == ImportJobStatus.RUNNING,
+                    or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < stale),
+                ),
+            ),
+        )
+        .values(status=ImportJobStatus.RUNNING, heartbeat_at=now, claim_token=token, updated_at=now)
+    )
+    db.commit()
+    return token if result.rowcount == 1 else None
+
+def _owned(job_id: int, token: str):
+    return update(ImportJob).where(ImportJob.id == job_id, ImportJob.claim_token == token)
+
+class _Heartbeat:
+    """
+    Refreshes the job's heartbeat from a thread of its own every third of
+    IMPORT_JOB_STALE_AFTER, so a chunk that takes longer than that does not
+    let another worker take the job over. Sets ``lost`` once the job is no
+    longer claimed with ``token``.
+    """
+    def __init__(self, job_id: int, token: str):
+        self.job_id = job_id
+        self.token = token
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.IMPORT_JOB_STALE_AFTER / 3):
+            db = SessionLocal()
+            try:
+                now = datetime.utcnow()
+                result = db.execute(_owned(self.job_id, self.token).values(heartbeat_at=now))
+                db.commit()
+                if result.rowcount == 0:
+                    self.lost.set()
+                    return
+            except Exception:
+                # E.g. the database is busy; the next beat tries again
+                logger.warning("Could not refresh the heartbeat of import job %s", self.job_id, exc_info=True)
+            finally:
+                db.close()
+
+    def start(self) -> None:
+        threading.Thread(target=self._run, name=f"import-heartbeat-{self.job_id}", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+def _finish(db: Session, job: ImportJob, token: str, status: ImportJobStatus, error: str = None) -> None:
+    now = datetime.utcnow()
+    finished = db.execute(
+        _owned(job.id, token)
+        .values(status=status, error=error, finished_at=now, heartbeat_at=now, updated_at=now)
+    ).rowcount
+    db.commit()
+    if not finished:
+        logger.warning("Import job %s was taken over by another worker", job.id)
+        return
+    try:
+        os.remove(job.path)
+    except FileNotFoundError:
+        pass
+
+def run_import_job(job_id: int) -> None:
+    db = SessionLocal()
+    heartbeat = None
+    try:
+        token = None if _stopping.is_set() else _claim(db, job_id)
+        if token is None:
+            return
+        heartbeat = _Heartbeat(job_id, token)
+        heartbeat.start()
+        job = db.get(ImportJob, job_id)
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+            db.commit()
+
+        def on_chunk(number: int, result: ChunkResult) -> None:
+            if _stopping.is_set():
+                raise ImportInterrupted()
+            if heartbeat.lost.is_set():
+                raise ImportClaimLost()
+            now = datetime.utcnow()
+            # The chunk's rows are only committed if the job is still ours
+            updated = db.execute(
+                _owned(job_id, token)
+                .values(
+                    chunks_done=number + 1,
+                    success_count=(
+                        ImportJob.success_count
+                        + len(result.inserted) + len(result.updated) + result.unchanged
+                    ),
+                    failed_count=ImportJob.failed_count + len(result.errors),
+                    inserted_count=ImportJob.inserted_count + len(result.inserted),
+                    updated_count=ImportJob.updated_count + len(result.updated),
+                    unchanged_count=ImportJob.unchanged_count + result.unchanged,
+                    heartbeat_at=now,
+                    updated_at=now,
+                )
+            ).rowcount
+            if not updated:
+                raise ImportClaimLost()
+            if result.errors:
+                db.execute(insert(ImportJobError), [
+                    {"job_id": job_id, "row": index + 2, "message": message}
+                    for index, message in sorted(result.errors.items())
+                ])
+
+        try:
+            with open(job.path, "rb") as file:
+                import_products(
+                    db, file, job.filename, job.seller_id,
+                    chunk_size=job.chunk_size,
+                    upsert=job.upsert,
+                    start_chunk=job.chunks_done,
+                    on_chunk=on_chunk,
+                )
+        except ImportInterrupted:
+            # Leave it running without a heartbeat so it is picked up at once
+            heartbeat.stop()
+            db.rollback()
+            db.execute(_owned(job_id, token).values(heartbeat_at=None, claim_token=None))
+            db.commit()
+            return
+        except ImportClaimLost:
+            logger.warning("Import job %s was taken over by another worker", job_id)
+            db.rollback()
+            return
+        except HTTPException as e:
+            db.rollback()
+            _finish(db, job, token, ImportJobStatus.FAILED, error=str(e.detail))
+            return
+        except Exception as e:
+            logger.exception("Import job %s failed", job_id)
+            db.rollback()
+            _finish(db, job, token, ImportJobStatus.FAILED, error=f"Error processing file: {str(e)}")
+            return
+        _finish(db, job, token, ImportJobStatus.COMPLETED)
+    finally:
+        if heartbeat is not None:
+            heartbeat.stop()
+        db.close()
+
+def resume_import_jobs() -> None:
+    """
+    Queue jobs left pending or running by a previous process. Jobs whose
+    worker may still be alive are retried once their heartbeat goes stale.
+    """
+    db = SessionLocal()
+    try:
+        jobs = db.query(ImportJob.id, ImportJob.status, ImportJob.heartbeat_at).filter(
+            ImportJob.status.in_([ImportJobStatus.PENDING, ImportJobStatus.RUNNING])
+        ).all()
+    finally:
+        db.close()
+    now = datetime.utcnow()
+    for job_id, status, heartbeat_at in jobs:
+        delay = 0.0
+        if status == ImportJobStatus.RUNNING and heartbeat_at is not None:
+            stale_at = heartbeat_at + timedelta(seconds=settings.IMPORT_JOB_STALE_AFTER)
+            delay = max(0.0, (stale_at - now).total_seconds())
+        if delay:
+            timer = threading.Timer(delay, import_executor.submit, args=(run_import_job, job_id))
+            timer.daemon = True
+            timer.start()
+        else:
+            import_executor.submit(run_import_job, job_id)
+
+def shutdown_import_jobs() -> None:
+    _stopping.set()
+    import_executor.shutdown(wait=False, cancel_futures=True)
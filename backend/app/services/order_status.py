@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+from fastapi import HTTPException
+from sqlalchemy import case, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.models.notification import Notification, NotificationType
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderStatusChange
+from app.services.analytics import invalidate_seller_analytics
+from app.services.product_cache import invalidate_products
+from app.services.sales_rollups import record_status_changes
+from app.services.stock import release_stock
+
+# Statuses an order may move to from each status
+ALLOWED_TRANSITIONS: Dict[OrderStatus, Set[OrderStatus]] = {
+    OrderStatus.PENDING: {OrderStatus.PAID, OrderStatus.CANCELLED},
+    OrderStatus.PAID: {OrderStatus.SHIPPED, OrderStatus.CANCELLED, OrderStatus.REFUNDED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: {OrderStatus.REFUNDED},
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.REFUNDED: set(),
+}
+
+MAX_BULK_CHANGES = 500
+
+def _status_notification(buyer_id: int, order_id: int, status: OrderStatus, now: datetime) -> Dict[str, Any]:
+    # Same text as create_order_status_notification
+    return {
+        "user_id": buyer_id,
+        "type": NotificationType.ORDER_STATUS_CHANGED,
+        "title": "Статус заказа изменен",
+        "message": f"Статус заказа #{order_id} изменен на {status.value}",
+        "is_read": False,
+        "created_at": now,
+        "data": {"order_id": order_id, "status": status.value},
+    }
+
+def bulk_update_orders(db: Session, seller_id: int, changes: List[OrderStatusChange]) -> List[Dict[str, Any]]:
+    """
+    Apply status changes and tracking numbers to the seller's orders in one
+    transaction: the orders are locked and read in one query, each target
+    status is set with one UPDATE, tracking numbers with one more, and the
+    buyers' notifications are inserted in one batch.
+
+    Returns a result per change, in order. Changes that are not allowed
+    fail on their own; the others are still applied. Orders that also hold
+    other sellers' items cannot be changed by one seller: their status,
+    stock and sales belong to every seller in them.
+    """
+    if len(changes) > MAX_BULK_CHANGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_CHANGES} orders can be updated at once"
+        )
+    order_ids = [change.order_id for change in changes]
+    if len(set(order_ids)) != len(order_ids):
+        raise HTTPException(status_code=400, detail="Each order may appear only once")
+
+    sells_in_order = exists().where(OrderItem.order_id == Order.id, OrderItem.seller_id == seller_id)
+    shared = exists().where(OrderItem.order_id == Order.id, OrderItem.seller_id != seller_id)
+    orders = {
+        row.id: row
+        for row in db.execute(
+            select(Order.id, Order.status, Order.buyer_id, shared.label("shared"))
+            .where(Order.id.in_(order_ids), sells_in_order)
+            .order_by(Order.id)
+            .with_for_update()
+        )
+    }
+
+    results = []
+    transitions: Dict[Tuple[OrderStatus, OrderStatus], List[int]] = defaultdict(list)
+    tracking: Dict[int, str] = {}
+    for change in changes:
+        order = orders.get(change.order_id)
+        if order is None:
+            results.append({"order_id": change.order_id, "success": False, "error": "Order not found"})
+            continue
+        if order.shared:
+            results.append({
+                "order_id": order.id,
+                "success": False,
+                "status": order.status,
+                "error": "Order contains other sellers' items",
+            })
+            continue
+        status = order.status
+        if change.status is not None and change.status != order.status:
+            if change.status not in ALLOWED_TRANSITIONS[order.status]:
+                results.append({
+                    "order_id": order.id,
+                    "success": False,
+                    "status": order.status,
+                    "error": f"Cannot change status from {order.status.value} to {change.status.value}",
+                })
+                continue
+            transitions[(order.status, change.status)].append(order.id)
+            status = change.status
+        if change.tracking_number:
+            tracking[order.id] = change.tracking_number
+        results.append({"order_id": order.id, "success": True, "status": status})
+
+    now = datetime.utcnow()
+    for (old, new), ids in transitions.items():
+        db.execute(
+            update(Order)
+            .where(Order.id.in_(ids), Order.status == old)
+            .values(status=new, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    sellers = record_status_changes(db, {
+        order_id: (old, new) for (old, new), ids in transitions.items() for order_id in ids
+    })
+    if tracking:
+        db.execute(
+            update(Order)
+            .where(Order.id.in_(list(tracking)))
+            .values(tracking_number=case(tracking, value=Order.id), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Cancelled orders give their units back, as in cancel_order
+    cancelled_ids = [
+        order_id
+        for (old, new), ids in transitions.items() if new == OrderStatus.CANCELLED
+        for order_id in ids
+    ]
+    quantities: Dict[int, int] = {}
+    if cancelled_ids:
+        quantities = dict(db.execute(
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(cancelled_ids))
+            .group_by(OrderItem.product_id)
+        ).all())
+        release_stock(db, quantities)
+
+    if transitions:
+        db.execute(
+            insert(Notification),
+            [
+                _status_notification(orders[order_id].buyer_id, order_id, new, now)
+                for (old, new), ids in transitions.items()
+                for order_id in ids
+            ],
+        )
+    db.commit()
+    if quantities:
+        invalidate_products(quantities)
+    invalidate_seller_analytics(sellers)
+    return results
@@ -0,0 +1,61 @@
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.cache import TieredCache
+from app.core.config import get_settings
+from app.core.http_cache import compute_etag, http_now
+from app.models.product import Product, product_category
+from app.schemas.product import Product as ProductSchema
+from app.services.stock_holds import invalidate_stock_levels
+
+settings = get_settings()
+
+product_cache = TieredCache(
+    "product",
+    local_size=settings.PRODUCT_CACHE_LOCAL_SIZE,
+    local_ttl=settings.PRODUCT_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PRODUCT_CACHE_TTL,
+)
+
+def get_cached_product(product_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Cache entry for a product, if cached: the serialized ``ProductSchema``
+    payload with its ETag and the time it was built.
+    """
+    return product_cache.get(product_id)
+
+def cache_product(product: Product) -> Dict[str, Any]:
+    """
+    Serialize a product with its response schema and store the entry.
+    """
+    payload = ProductSchema.model_validate(product).model_dump(mode="json")
+    entry = {
+        "payload": payload,
+        "etag": compute_etag(payload),
+        "modified": http_now().isoformat(),
+    }
+    product_cache.set(product.id, entry)
+    return entry
+
+def invalidate_products(product_ids: Iterable[int]) -> None:
+    """
+    Drop cached payloads and stock levels. Call after the transaction that
+    changed the products has committed, otherwise a concurrent read can
+    re-cache the old row.
+    """
+    product_ids = set(product_ids)
+    product_cache.delete(product_ids)
+    invalidate_stock_levels(product_ids)
+
+def invalidate_category(db: Session, category_id: int) -> None:
+    """
+    Category data is embedded in product payloads, so a category change
+    invalidates every product in it.
+    """
+    product_ids = db.execute(
+        select(product_category.c.product_id).where(product_category.c.category_id == category_id)
+    ).scalars()
+    invalidate_products(product_ids)
+
+def cache_stats() -> Dict[str, Any]:
+    return product_cache.stats()
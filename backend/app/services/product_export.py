@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.product import Product, ProductImage, product_category
+from app.services.product_import import REQUIRED_COLUMNS, OPTIONAL_COLUMNS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - parquet export is optional
+    pyarrow = None
+
+import xlsxwriter
+
+settings = get_settings()
+
+# Same columns as the bulk upload, so an export can be edited and uploaded
+EXPORT_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Size of the pieces a finished XLSX/Parquet file is streamed in
+FILE_CHUNK_SIZE = 1024 * 1024
+
+def _batches(db: Session, seller_id: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Products in id order, EXPORT_BATCH_SIZE rows at a time, read through a
+    server-side cursor. Categories and images are fetched per batch.
+    """
+    query = select(
+        Product.id, Product.name, Product.description, Product.price, Product.stock,
+        Product.brand, Product.model, Product.condition, Product.sku, Product.specifications,
+    ).order_by(Product.id)
+    if seller_id is not None:
+        query = query.where(Product.seller_id == seller_id)
+
+    result = db.execute(query, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+    for partition in result.partitions():
+        ids = [row.id for row in partition]
+        categories: Dict[int, List[str]] = {}
+        for product_id, category_id in db.execute(
+            select(product_category.c.product_id, product_category.c.category_id)
+            .where(product_category.c.product_id.in_(ids))
+            .order_by(product_category.c.product_id, product_category.c.category_id)
+        ):
+            categories.setdefault(product_id, []).append(str(category_id))
+        images: Dict[int, List[str]] = {}
+        for product_id, url in db.execute(
+            select(ProductImage.product_id, ProductImage.url)
+            .where(ProductImage.product_id.in_(ids))
+            .order_by(ProductImage.product_id, ProductImage.id)
+        ):
+            images.setdefault(product_id, []).append(url)
+
+        yield [
+            {
+                'name': row.name,
+                'description': row.description or "",
+                'price': row.price,
+                'stock': row.stock or 0,
+                'category_ids': ",".join(categories.get(row.id, [])),
+                'brand': row.brand or "",
+                'model': row.model or "",
+                'condition': row.condition or "",
+                'sku': row.sku,
+                'images': ",".join(images.get(row.id, [])),
+                'specifications': (
+                    json.dumps(row.specifications, ensure_ascii=False) if row.specifications else ""
+                ),
+            }
+            for row in partition
+        ]
+
+def _csv(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def _stream_file(file) -> Iterator[bytes]:
+    file.seek(0)
+    while True:
+        data = file.read(FILE_CHUNK_SIZE)
+        if not data:
+            break
+        yield data
+
+def _xlsx(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    # constant_memory flushes every row to disk as soon as the next one
+    # starts; the zip container is assembled in a temporary file.
+    with tempfile.NamedTemporaryFile(suffix=".xlsx") as file:
+        workbook = xlsxwriter.Workbook(file.name, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Products')
+        header_format = workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
+        worksheet.write_row(0, 0, EXPORT_COLUMNS, header_format)
+        row_number = 1
+        for batch in batches:
+            for item in batch:
+                worksheet.write_row(row_number, 0, [item[column] for column in EXPORT_COLUMNS])
+                row_number += 1
+        workbook.close()
+        yield from _stream_file(file)
+
+def _parquet(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    schema = pyarrow.schema([
+        (column, pyarrow.float64() if column == 'price' else pyarrow.int64() if column == 'stock' else pyarrow.string())
+        for column in EXPORT_COLUMNS
+    ])
+    with tempfile.TemporaryFile() as file:
+        # One row group per batch
+        with pyarrow.parquet.ParquetWriter(file, schema) as writer:
+            for batch in batches:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+        yield from _stream_file(file)
+
+def export_products(format: str, seller_id: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Body of a catalog export in ``format``. The generator uses its own
+    session because it runs after the request's session is closed.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format, expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if format == "parquet" and pyarrow is None:
+        raise HTTPException(status_code=400, detail="Parquet export is not available on this server")
+    writer = {"csv": _csv, "xlsx": _xlsx, "parquet": _parquet}[format]
+
+    def generate() -> Iterator[bytes]:
+        db = SessionLocal()
+        try:
+            yield from writer(_batches(db, seller_id))
+        finally:
+            db.close()
+
+    return generate()
@@ -0,0 +1,370 @@
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+import pandas as pd
+from fastapi import HTTPException
+from openpyxl import load_workbook
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.models.product import Category, Product, ProductImage, normalize_sku, product_category
+from app.services.autocomplete import autocomplete_index
+from app.services.compatibility import parse_specifications, sync_compatibility_specs
+from app.services.product_cache import invalidate_products
+from app.services.search import index_products
+
+settings = get_settings()
+
+REQUIRED_COLUMNS = ['name', 'description', 'price', 'stock', 'category_ids']
+OPTIONAL_COLUMNS = ['brand', 'model', 'condition', 'sku', 'images', 'specifications']
+
+# Imported fields whose change makes a re-imported row an update
+HASHED_FIELDS = [
+    'name', 'description', 'price', 'stock', 'brand', 'model', 'condition', 'specifications',
+]
+
+_SLUG_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+class PendingProduct(NamedTuple):
+    index: int  # data row; the spreadsheet row is index + 2
+    values: Dict[str, Any]
+    category_ids: List[int]
+    image_urls: List[str]
+
+class ChunkResult(NamedTuple):
+    inserted: List[int]
+    updated: List[int]
+    unchanged: int
+    errors: Dict[int, str]
+
+def slugify(text: str) -> str:
+    return _SLUG_RE.sub("-", text.lower()).strip("-")
+
+def content_hash(values: Dict[str, Any], category_ids: List[int], image_urls: List[str]) -> str:
+    payload = [values[field] for field in HASHED_FIELDS] + [sorted(category_ids), image_urls]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _xlsx_chunks(file: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_cell(value).strip() for value in next(rows, ())]
+        batch, index, yielded = [], [], False
+        for position, row in enumerate(rows):
+            if all(value is None for value in row):
+                continue
+            values = [_cell(value) for value in row[:len(header)]]
+            batch.append(values + [""] * (len(header) - len(values)))
+            index.append(position)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header, index=index)
+                batch, index, yielded = [], [], True
+        if batch or not yielded:
+            yield pd.DataFrame(batch, columns=header, index=index)
+    finally:
+        workbook.close()
+
+def read_chunks(file: BinaryIO, filename: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a price list as DataFrames of at most ``chunk_size`` rows with
+    every cell as a string. The index is the 0-based data row, so
+    ``index + 2`` is the row number in the spreadsheet.
+    """
+    if filename.endswith('.xlsx'):
+        return _xlsx_chunks(file, chunk_size)
+    return iter(pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False))
+
+def format_errors(errors: Dict[int, str]) -> List[str]:
+    return [f"Row {index + 2}: {message}" for index, message in sorted(errors.items())]
+
+def check_columns(columns) -> None:
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(missing_columns)}"
+        )
+
+def _validate(
+    chunk: pd.DataFrame,
+    categories: Set[int],
+    seen_skus: Set[str],
+    errors: Dict[int, str],
+) -> List[PendingProduct]:
+    """
+    Check a chunk column by column and return the rows that passed. The
+    first problem of every failed row is recorded in ``errors`` with the
+    same wording the row-by-row import used.
+    """
+    frame = chunk.reindex(columns=REQUIRED_COLUMNS + OPTIONAL_COLUMNS, fill_value="")
+    frame = frame.fillna("").astype(str).apply(lambda column: column.str.strip())
+
+    def fail(mask: pd.Series, messages: pd.Series) -> None:
+        for index, message in messages[mask].items():
+            errors.setdefault(index, message)
+
+    # category_ids: comma separated integers; unknown ids are ignored
+    parts = frame['category_ids'].str.split(',').explode().str.strip()
+    parsed = pd.to_numeric(parts, errors='coerce')
+    bad = parsed.isna() | (parsed % 1 != 0)
+    fail(bad, "invalid literal for int() with base 10: '" + parts + "'")
+    valid = parsed[~bad].astype(int)
+    category_lists: Dict[int, List[int]] = {}
+    for index, category_id in valid[valid.isin(categories)].items():
+        category_lists.setdefault(index, []).append(category_id)
+
+    price = pd.to_numeric(frame['price'], errors='coerce')
+    fail(price.isna(), "could not convert string to float: '" + frame['price'] + "'")
+
+    stock = pd.to_numeric(frame['stock'], errors='coerce')
+    fail(stock.isna() | (stock % 1 != 0), "invalid literal for int() with base 10: '" + frame['stock'] + "'")
+
+    fail(frame['name'] == "", pd.Series("name is required", index=frame.index))
+    fail(frame['sku'] == "", pd.Series("sku is required", index=frame.index))
+
+    sku_keys = frame['sku'].map(normalize_sku)
+    duplicated = sku_keys.duplicated() | (sku_keys.isin(seen_skus) & (frame['sku'] != ""))
+    fail(duplicated, "duplicate sku " + frame['sku'] + " in file")
+
+    specifications = {}
+    for index, raw in frame['specifications'][frame['specifications'] != ""].items():
+        try:
+            specifications[index] = parse_specifications(raw)
+        except ValueError as e:
+            errors.setdefault(index, str(e))
+
+    seen_skus.update(sku_keys[frame['sku'] != ""])
+    pending = []
+    for index, row in zip(frame.index, frame.to_dict('records')):
+        if index in errors:
+            continue
+        product_categories = category_lists.get(index, [])
+        image_urls = [url.strip() for url in row['images'].split(',') if url.strip()]
+        values = {
+            'name': row['name'],
+            'slug': f"{slugify(row['name'])}-{sku_keys[index].lower()}",
+            'description': row['description'],
+            'price': float(price[index]),
+            'stock': int(stock[index]),
+            'sku': row['sku'],
+            'sku_normalized': sku_keys[index],
+            'brand': row['brand'] or None,
+            'model': row['model'] or None,
+            'condition': row['condition'] or 'new',
+            'specifications': specifications.get(index),
+        }
+        values['content_hash'] = content_hash(values, product_categories, image_urls)
+        pending.append(PendingProduct(index, values, product_categories, image_urls))
+    return pending
+
+def _add_images(db: Session, image_urls: Dict[int, List[str]], now: datetime) -> None:
+    images = [
+        {'product_id': product_id, 'url': url, 'created_at': now, 'updated_at': now}
+        for product_id, urls in image_urls.items()
+        for url in urls
+    ]
+    if images:
+        db.execute(insert(ProductImage), images)
+
+def _sync_images(db: Session, ids: List[int], pending: List[PendingProduct], now: datetime) -> None:
+    """
+    Make the images of updated products match their rows. Images whose URL
+    is still listed are kept as they are, so uploaded images keep their
+    size and resized variants; only the difference is deleted or inserted.
+    """
+    missing = {product_id: list(item.image_urls) for product_id, item in zip(ids, pending)}
+    stale = []
+    for image in db.execute(
+        select(ProductImage.id, ProductImage.product_id, ProductImage.url)
+        .where(ProductImage.product_id.in_(ids))
+        .order_by(ProductImage.id)
+    ):
+        urls = missing[image.product_id]
+        if image.url in urls:
+            urls.remove(image.url)
+        else:
+            stale.append(image.id)
+    if stale:
+        db.execute(delete(ProductImage).where(ProductImage.id.in_(stale)))
+    _add_images(db, missing, now)
+
+def _link(db: Session, ids: List[int], pending: List[PendingProduct]) -> None:
+    """
+    Categories, compatibility and search documents of written rows.
+    """
+    links = [
+        {'product_id': product_id, 'category_id': category_id}
+        for product_id, item in zip(ids, pending)
+        for category_id in item.category_ids
+    ]
+    if links:
+        db.execute(insert(product_category), links)
+    sync_compatibility_specs(db, {
+        product_id: item.values['specifications'] for product_id, item in zip(ids, pending)
+    })
+    index_products(db, ids)
+
+def _write(db: Session, pending: List[PendingProduct], seller_id: int) -> List[int]:
+    now = datetime.utcnow()
+    ids = db.execute(
+        insert(Product).returning(Product.id, sort_by_parameter_order=True),
+        [
+            {**item.values, 'seller_id': seller_id, 'is_active': True, 'created_at': now, 'updated_at': now}
+            for item in pending
+        ],
+    ).scalars().all()
+    _add_images(db, {product_id: item.image_urls for product_id, item in zip(ids, pending)}, now)
+    _link(db, ids, pending)
+    return ids
+
+def _update(db: Session, changes: List[Tuple[int, PendingProduct]]) -> List[int]:
+    """
+    Overwrite changed products with one executemany UPDATE by primary key
+    and replace their categories; images are synced, see ``_sync_images``.
+    Slugs are kept, so product URLs stay stable.
+    """
+    if not changes:
+        return []
+    now = datetime.utcnow()
+    ids = [product_id for product_id, _ in changes]
+    pending = [item for _, item in changes]
+    db.execute(update(Product), [
+        {
+            'id': product_id,
+            **{field: item.values[field] for field in HASHED_FIELDS},
+            'content_hash': item.values['content_hash'],
+            'updated_at': now,
+        }
+        for product_id, item in changes
+    ])
+    db.execute(delete(product_category).where(product_category.c.product_id.in_(ids)))
+    _sync_images(db, ids, pending, now)
+    _link(db, ids, pending)
+    return ids
+
+def _insert(db: Session, pending: List[PendingProduct], seller_id: int, errors: Dict[int, str]) -> List[int]:
+    """
+    Insert a chunk in one round of multi-row INSERTs. If the database
+    rejects it (e.g. a SKU taken meanwhile), retry row by row to report
+    exactly the offending rows.
+    """
+    if not pending:
+        return []
+    try:
+        with db.begin_nested():
+            return _write(db, pending, seller_id)
+    except IntegrityError:
+        pass
+    ids = []
+    for item in pending:
+        try:
+            with db.begin_nested():
+                ids += _write(db, [item], seller_id)
+        except IntegrityError as e:
+            errors[item.index] = str(e.orig).splitlines()[0]
+    return ids
+
+def _import_chunk(
+    db: Session,
+    pending: List[PendingProduct],
+    seller_id: int,
+    upsert: bool,
+    errors: Dict[int, str],
+) -> ChunkResult:
+    """
+    Write the validated rows of a chunk. SKUs are unique across the catalog;
+    in upsert mode a SKU the seller already has is compared by content hash
+    and only rewritten when the row changed.
+    """
+    existing = {
+        row.sku: row for row in db.execute(
+            select(Product.id, Product.sku, Product.seller_id, Product.content_hash)
+            .where(Product.sku.in_([item.values['sku'] for item in pending]))
+        )
+    }
+    new, changed, unchanged = [], [], 0
+    for item in pending:
+        current = existing.get(item.values['sku'])
+        if current is None:
+            new.append(item)
+        elif not upsert or current.seller_id != seller_id:
+            errors[item.index] = f"SKU {item.values['sku']} already exists"
+        elif current.content_hash == item.values['content_hash']:
+            unchanged += 1
+        else:
+            changed.append((current.id, item))
+
+    inserted = _insert(db, new, seller_id, errors)
+    updated = _update(db, changed)
+    return ChunkResult(inserted, updated, unchanged, errors)
+
+def import_products(
+    db: Session,
+    file: BinaryIO,
+    filename: str,
+    seller_id: int,
+    chunk_size: Optional[int] = None,
+    upsert: bool = False,
+    start_chunk: int = 0,
+    on_chunk: Optional[Callable[[int, ChunkResult], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Import a CSV/XLSX price list chunk by chunk: every chunk is validated
+    column-wise, written with multi-row statements and committed, so memory
+    use does not grow with the file and the database never holds one huge
+    transaction.
+
+    With ``upsert`` rows whose SKU the seller already has update that
+    product when their content changed and are skipped otherwise.
+
+    Chunks before ``start_chunk`` are skipped, which resumes an import
+    whose first chunks were committed earlier. ``on_chunk(number, result)``
+    runs inside each chunk's transaction, so progress recorded there is
+    committed together with the rows.
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    categories = set(db.scalars(select(Category.id)))
+    seen_skus: Set[str] = set()
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    failed_count = 0
+    errors = []
+
+    for number, chunk in enumerate(read_chunks(file, filename, chunk_size)):
+        if number == 0:
+            check_columns(chunk.columns)
+        if number < start_chunk:
+            if 'sku' in chunk.columns:
+                seen_skus.update(key for key in chunk['sku'].fillna("").str.strip().map(normalize_sku) if key)
+            continue
+        chunk_errors: Dict[int, str] = {}
+        pending = _validate(chunk, categories, seen_skus, chunk_errors)
+        result = _import_chunk(db, pending, seller_id, upsert, chunk_errors)
+        if on_chunk is not None:
+            on_chunk(number, result)
+        db.commit()
+        if result.updated:
+            invalidate_products(result.updated)
+        autocomplete_index.refresh_products(db, result.inserted + result.updated)
+
+        counts["inserted"] += len(result.inserted)
+        counts["updated"] += len(result.updated)
+        counts["unchanged"] += result.unchanged
+        failed_count += len(chunk_errors)
+        errors += format_errors(chunk_errors)
+
+    return {
+        "success": sum(counts.values()),
+        "failed": failed_count,
+        "errors": errors,
+        **counts,
+    }
@@ -0,0 +1,167 @@
+"""
+Daily sales rollups for the seller analytics.
+
+    python -m app.services.sales_rollups [--seller-id ID]
+
+``sales_daily_product`` and ``sales_daily_status`` are kept up to date in
+the transaction that creates an order or changes its status, by adding
+deltas with INSERT ... ON CONFLICT DO UPDATE. Running this module rebuilds
+them from the orders, e.g. to backfill history or after fixing data by hand.
+"""
+import argparse
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.sales_rollup import SalesDailyProduct, SalesDailyStatus
+from app.services.analytics import invalidate_seller_analytics
+
+_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+def _add(db: Session, model, deltas: Dict[Tuple, Dict[str, float]], keys: Tuple[str, ...]) -> None:
+    """
+    Add ``deltas`` (key values -> column increments) to ``model``'s rows in
+    one statement, creating missing rows.
+    """
+    if not deltas:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise RuntimeError(f"Sales rollups are not supported on {dialect}")
+    stmt = _INSERTS[dialect](model).values([
+        {**dict(zip(keys, key)), **values} for key, values in deltas.items()
+    ])
+    columns = next(iter(deltas.values())).keys()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in columns},
+    )
+    db.execute(stmt)
+
+def _order_sales(db: Session, order_ids: Iterable[int]):
+    """
+    Per order, seller and product: units and revenue, and the order's day.
+    """
+    return db.execute(
+        select(
+            OrderItem.order_id,
+            OrderItem.seller_id,
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity).label("quantity"),
+            func.sum(OrderItem.price * OrderItem.quantity).label("revenue"),
+            Order.created_at,
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(OrderItem.order_id.in_(list(order_ids)))
+        .group_by(OrderItem.order_id, OrderItem.seller_id, OrderItem.product_id, Order.created_at)
+    ).all()
+
+def record_new_orders(db: Session, order_ids: Iterable[int], status: OrderStatus = OrderStatus.PENDING) -> Set[int]:
+    """
+    Add just created orders to the rollups. Call after the orders are
+    flushed, in the same transaction. Returns the sellers whose rollups
+    changed, for invalidate_seller_analytics once committed.
+    """
+    products: Dict[Tuple, Dict[str, float]] = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+    statuses: Dict[Tuple, Dict[str, float]] = defaultdict(lambda: {"orders": 0, "revenue": 0.0})
+    counted = set()
+    for row in _order_sales(db, order_ids):
+        day = row.created_at.date()
+        product = products[(row.seller_id, day, row.product_id)]
+        product["quantity"] += row.quantity
+        product["revenue"] += row.revenue
+        seller_status = statuses[(row.seller_id, day, status)]
+        seller_status["revenue"] += row.revenue
+        if (row.order_id, row.seller_id) not in counted:
+            counted.add((row.order_id, row.seller_id))
+            seller_status["orders"] += 1
+    _add(db, SalesDailyProduct, products, ("seller_id", "day", "product_id"))
+    _add(db, SalesDailyStatus, statuses, ("seller_id", "day", "status"))
+    return {seller_id for seller_id, _, _ in statuses}
+
+def record_status_changes(db: Session, changes: Dict[int, Tuple[OrderStatus, OrderStatus]]) -> Set[int]:
+    """
+    Move orders between status rows; ``changes`` maps order ids to their
+    (old, new) status. Call in the transaction that changes the status.
+    Returns the sellers whose rollups changed.
+    """
+    changes = {order_id: change for order_id, change in changes.items() if change[0] != change[1]}
+    if not changes:
+        return set()
+    # Per order and seller: the order's day and the seller's revenue in it
+    sales: Dict[Tuple[int, int], Tuple[date, float]] = {}
+    for row in _order_sales(db, changes):
+        day, revenue = sales.get((row.order_id, row.seller_id), (row.created_at.date(), 0.0))
+        sales[(row.order_id, row.seller_id)] = (day, revenue + row.revenue)
+
+    statuses: Dict[Tuple, Dict[str, float]] = defaultdict(lambda: {"orders": 0, "revenue": 0.0})
+    for (order_id, seller_id), (day, revenue) in sales.items():
+        old, new = changes[order_id]
+        statuses[(seller_id, day, old)]["orders"] -= 1
+        statuses[(seller_id, day, old)]["revenue"] -= revenue
+        statuses[(seller_id, day, new)]["orders"] += 1
+        statuses[(seller_id, day, new)]["revenue"] += revenue
+    _add(db, SalesDailyStatus, statuses, ("seller_id", "day", "status"))
+    return {seller_id for _, seller_id in sales}
+
+def rebuild_rollups(db: Session, seller_id: Optional[int] = None) -> None:
+    """
+    Recompute the rollups of one seller, or of everyone, from the orders.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Orders placed meanwhile wait for the rebuild instead of adding
+        # their deltas to rows that are about to be replaced
+        db.execute(text("LOCK TABLE sales_daily_product, sales_daily_status IN EXCLUSIVE MODE"))
+    for model in (SalesDailyProduct, SalesDailyStatus):
+        stmt = delete(model)
+        if seller_id is not None:
+            stmt = stmt.where(model.seller_id == seller_id)
+        db.execute(stmt)
+
+    day = func.date(Order.created_at)
+    items = select(OrderItem.seller_id, OrderItem.product_id, OrderItem.order_id, OrderItem.quantity,
+                   (OrderItem.price * OrderItem.quantity).label("revenue"), Order.status, day.label("day"))
+    items = items.join(Order, Order.id == OrderItem.order_id)
+    if seller_id is not None:
+        items = items.where(OrderItem.seller_id == seller_id)
+    items = items.subquery()
+
+    db.execute(SalesDailyProduct.__table__.insert().from_select(
+        ["seller_id", "day", "product_id", "quantity", "revenue"],
+        select(items.c.seller_id, items.c.day, items.c.product_id,
+               func.sum(items.c.quantity), func.sum(items.c.revenue))
+        .group_by(items.c.seller_id, items.c.day, items.c.product_id),
+    ))
+    db.execute(SalesDailyStatus.__table__.insert().from_select(
+        ["seller_id", "day", "status", "orders", "revenue"],
+        select(items.c.seller_id, items.c.day, items.c.status,
+               func.count(items.c.order_id.distinct()), func.sum(items.c.revenue))
+        .group_by(items.c.seller_id, items.c.day, items.c.status),
+    ))
+    db.commit()
+    invalidate_seller_analytics(None if seller_id is None else [seller_id])
+
+def main() -> None:
+    from app.db.session import SessionLocal
+    import app.db.base  # noqa: F401  (configures every mapper)
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seller-id", type=int, help="rebuild only this seller's rollups")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        started = datetime.utcnow()
+        rebuild_rollups(db, args.seller_id)
+        print(f"Rebuilt sales rollups in {(datetime.utcnow() - started).total_seconds():.1f}s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
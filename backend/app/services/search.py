@@ -0,0 +1,255 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, List, Optional, Tuple, Union
+from sqlalchemy import func, select, delete, literal_column, text, column, table, Float
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.product import Product
+from app.models.search import ProductSearch
+
+# Text search configurations combined into every search vector / query, so
+# that both Russian and English word forms are stemmed.
+SEARCH_CONFIGS = ("russian", "english")
+
+FTS_TABLE = "product_search_fts"
+
+# Column weights for SQLite bm25(): name, sku, brand, model, description
+FTS_WEIGHTS = (10.0, 8.0, 5.0, 5.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def _coalesce(value) -> Any:
+    return func.coalesce(value, "")
+
+def _document_expr():
+    return func.concat_ws(
+        " ",
+        _coalesce(Product.name),
+        _coalesce(Product.sku),
+        _coalesce(Product.brand),
+        _coalesce(Product.model),
+        _coalesce(Product.description),
+    )
+
+class SearchBackend(ABC):
+    """
+    Keeps the search documents in sync with ``products`` and turns a search
+    term into a filtered, ranked product query.
+    """
+    name = "base"
+
+    def ensure_schema(self, engine: Engine) -> None:
+        pass
+
+    @abstractmethod
+    def index(self, db: Session, product_ids: List[int]) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, db: Session, product_ids: List[int]) -> None:
+        ...
+
+    @abstractmethod
+    def apply(self, query: Query, term: str) -> Tuple[Query, Any]:
+        ...
+
+    @abstractmethod
+    def indexed_ids(self):
+        ...
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector documents in ``product_search`` with a GIN index, weighted
+    name/sku (A), brand/model (B) and description (C).
+    """
+    name = "postgresql"
+
+    def _vector_expr(self):
+        def weighted(config, value, weight):
+            return func.setweight(func.to_tsvector(config, _coalesce(value)), weight)
+
+        parts = []
+        for config in SEARCH_CONFIGS:
+            parts += [
+                weighted(config, Product.name, "A"),
+                weighted(config, Product.brand, "B"),
+                weighted(config, Product.model, "B"),
+                weighted(config, Product.description, "C"),
+            ]
+        # Part numbers must not be stemmed
+        parts.append(weighted("simple", Product.sku, "A"))
+
+        vector = parts[0]
+        for part in parts[1:]:
+            vector = vector.op("||")(part)
+        return vector
+
+    def _query_expr(self, term: str):
+        tsquery = func.plainto_tsquery("simple", term)
+        for config in SEARCH_CONFIGS:
+            tsquery = tsquery.op("||")(func.websearch_to_tsquery(config, term))
+        return tsquery
+
+    def index(self, db: Session, product_ids: List[int]) -> None:
+        if not product_ids:
+            return
+        source = select(
+            Product.id,
+            _document_expr(),
+            self._vector_expr(),
+            func.now(),
+        ).where(Product.id.in_(product_ids))
+        stmt = pg_insert(ProductSearch).from_select(
+            ["product_id", "document", "search_vector", "updated_at"], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductSearch.product_id],
+            set_={
+                "document": stmt.excluded.document,
+                "search_vector": stmt.excluded.search_vector,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+    def remove(self, db: Session, product_ids: List[int]) -> None:
+        # Rows go away with ON DELETE CASCADE; this covers explicit removals.
+        if product_ids:
+            db.execute(delete(ProductSearch).where(ProductSearch.product_id.in_(product_ids)))
+
+    def indexed_ids(self):
+        return select(ProductSearch.product_id)
+
+    def apply(self, query: Query, term: str) -> Tuple[Query, Any]:
+        tsquery = self._query_expr(term)
+        rank = func.ts_rank_cd(ProductSearch.search_vector, tsquery)
+        query = query.join(ProductSearch, ProductSearch.product_id == Product.id).filter(
+            ProductSearch.search_vector.op("@@")(tsquery)
+        )
+        return query, rank
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 virtual table keyed by product id, used for tests and local
+    development. Stemming is limited to the porter (English) tokenizer.
+    """
+    name = "sqlite"
+
+    fts = table(FTS_TABLE, column("rowid"), column("name"), column("sku"),
+                column("brand"), column("model"), column("description"))
+
+    def ensure_schema(self, engine: Engine) -> None:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "name, sku, brand, model, description, "
+                "tokenize = 'porter unicode61 remove_diacritics 2')"
+            ))
+
+    def index(self, db: Session, product_ids: List[int]) -> None:
+        if not product_ids:
+            return
+        self.remove(db, product_ids)
+        source = select(
+            Product.id,
+            _coalesce(Product.name),
+            _coalesce(Product.sku),
+            _coalesce(Product.brand),
+            _coalesce(Product.model),
+            _coalesce(Product.description),
+        ).where(Product.id.in_(product_ids))
+        db.execute(self.fts.insert().from_select(
+            ["rowid", "name", "sku", "brand", "model", "description"], source
+        ))
+
+    def remove(self, db: Session, product_ids: List[int]) -> None:
+        if product_ids:
+            db.execute(self.fts.delete().where(self.fts.c.rowid.in_(product_ids)))
+
+    def indexed_ids(self):
+        return select(self.fts.c.rowid)
+
+    @staticmethod
+    def match_expression(term: str) -> Optional[str]:
+        """
+        Quote every token so user input can never be parsed as FTS5 syntax;
+        the last token is matched as a prefix.
+        """
+        tokens = _TOKEN_RE.findall(term)
+        if not tokens:
+            return None
+        quoted = ['"%s"' % token.replace('"', '""') for token in tokens]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def apply(self, query: Query, term: str) -> Tuple[Query, Any]:
+        match = self.match_expression(term)
+        if match is None:
+            return query.filter(literal_column("0") == 1), literal_column("0")
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        hits = (
+            select(
+                self.fts.c.rowid.label("product_id"),
+                literal_column(f"-bm25({FTS_TABLE}, {weights})", Float).label("rank"),
+            )
+            .where(literal_column(FTS_TABLE).op("MATCH")(match))
+            .subquery("search_hits")
+        )
+        query = query.join(hits, hits.c.product_id == Product.id)
+        return query, hits.c.rank
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+
+def get_search_backend(bind: Union[Session, Engine]) -> SearchBackend:
+    if isinstance(bind, Session):
+        bind = bind.get_bind()
+    dialect = bind.dialect.name
+    if dialect not in _BACKENDS:
+        raise RuntimeError(f"Full-text search is not supported on {dialect}")
+    return _BACKENDS[dialect]
+
+def index_products(db: Session, product_ids: Iterable[int]) -> None:
+    """
+    (Re)build search documents for the given products. Must run after the
+    product rows are flushed and in the same transaction.
+    """
+    get_search_backend(db).index(db, list(product_ids))
+
+def remove_products(db: Session, product_ids: Iterable[int]) -> None:
+    get_search_backend(db).remove(db, list(product_ids))
+
+def reindex_all(db: Session, batch_size: int = 1000, missing_only: bool = False) -> int:
+    """
+    Rebuild search documents in batches, e.g. after a backfill or a config
+    change. With ``missing_only`` only products without a document are indexed.
+    """
+    backend = get_search_backend(db)
+    total = 0
+    last_id = 0
+    while True:
+        ids_query = select(Product.id).where(Product.id > last_id)
+        if missing_only:
+            ids_query = ids_query.where(Product.id.not_in(backend.indexed_ids()))
+        ids = [
+            row[0] for row in db.execute(ids_query.order_by(Product.id).limit(batch_size))
+        ]
+        if not ids:
+            break
+        backend.index(db, ids)
+        db.commit()
+        total += len(ids)
+        last_id = ids[-1]
+    return total
+
+def search_products(db: Session, query: Query, term: str) -> Tuple[Query, Any]:
+    """
+    Restrict ``query`` to products matching ``term``.
+
+    Returns the filtered query and a relevance expression (higher is better)
+    that callers can order by.
+    """
+    return get_search_backend(db).apply(query, term.strip())
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+from fastapi import HTTPException
+from sqlalchemy import case, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.product import Product
+
+def order_quantities(items: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    """
+    Units per product for ``(product_id, quantity)`` pairs; a product may
+    appear on several lines of one order.
+    """
+    quantities: Dict[int, int] = {}
+    for product_id, quantity in items:
+        if quantity <= 0:
+            raise HTTPException(status_code=400, detail="Quantity must be positive")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+def lock_products(db: Session, product_ids: Iterable[int]) -> Dict[int, Row]:
+    """
+    Lock the products' rows until the transaction ends, in id order so that
+    concurrent orders for overlapping products cannot deadlock.
+    """
+    rows = db.execute(
+        select(Product.id, Product.name, Product.price, Product.stock, Product.seller_id)
+        .where(Product.id.in_(sorted(set(product_ids))))
+        .order_by(Product.id)
+        .with_for_update()
+    ).all()
+    return {row.id: row for row in rows}
+
+def _change_stock(db: Session, quantities: Dict[int, int], sign: int) -> int:
+    delta = case({product_id: sign * quantity for product_id, quantity in quantities.items()}, value=Product.id)
+    statement = (
+        update(Product)
+        .where(Product.id.in_(list(quantities)))
+        # Stock is part of the import content hash
+        .values(stock=Product.stock + delta, content_hash=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if sign < 0:
+        statement = statement.where(Product.stock + delta >= 0)
+    return db.execute(statement).rowcount
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> None:
+    """
+    Take ``quantities`` out of stock in one statement. Either every product
+    has enough stock and all are decremented, or the transaction is rolled
+    back and nothing is.
+    """
+    if not quantities:
+        return
+    if _change_stock(db, quantities, -1) != len(quantities):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Not enough stock for one or more products")
+
+def release_stock(db: Session, quantities: Dict[int, int]) -> None:
+    """
+    Put ``quantities`` back into stock in one statement.
+    """
+    if quantities:
+        _change_stock(db, quantities, 1)
@@ -0,0 +1,374 @@
+"""
+Time-limited stock holds taken when checkout starts.
+
+A hold reserves units of some products for one buyer for STOCK_HOLD_TTL
+seconds. Contention between checkouts is resolved here, in Redis (or, when
+Redis is unavailable, in this process), instead of on the products' rows:
+only buyers holding stock go on to ``create_order``, which converts the
+hold into the order. Holds nobody converts or releases are swept in the
+background.
+
+Availability is ``stock - held``, where ``stock`` is a copy of
+``products.stock`` cached for STOCK_LEVEL_TTL seconds and dropped whenever
+the product changes. The products table stays authoritative: orders still
+take stock with a conditional UPDATE there.
+"""
+import heapq
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.cache import available_redis, mark_redis_down, redis
+from app.core.config import get_settings
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LEVEL_KEY = "stock:level:{}"
+HELD_KEY = "stock:held:{}"
+HOLD_KEY = "stock:hold:{}"
+EXPIRY_KEY = "stock:hold-expiry"
+
+# Hold ids say which store holds them
+REDIS_PREFIX = "r-"
+LOCAL_PREFIX = "l-"
+
+SWEEP_BATCH = 500
+
+# KEYS: hold, expiry set, then level and held per product
+# ARGV: hold id, expiry (ms), payload, then quantity per product
+# Returns {1, 0} on success, {0, i} if product i lacks stock and {-1, i}
+# if its stock level is not cached.
+_HOLD_SCRIPT = """
+local n = #ARGV - 3
+for i = 1, n do
+  local level = redis.call('GET', KEYS[1 + 2 * i])
+  if not level then return {-1, i} end
+  local held = tonumber(redis.call('GET', KEYS[2 + 2 * i]) or '0')
+  if tonumber(level) - held < tonumber(ARGV[3 + i]) then return {0, i} end
+end
+for i = 1, n do
+  redis.call('INCRBY', KEYS[2 + 2 * i], ARGV[3 + i])
+end
+redis.call('SET', KEYS[1], ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+return {1, 0}
+"""
+
+# KEYS: hold, expiry set, then held per product
+# ARGV: hold id, then quantity per product
+# Returns 1 if the hold existed; releasing twice is a no-op.
+_RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+if redis.call('DEL', KEYS[1]) == 0 then return 0 end
+for i = 2, #ARGV do
+  local left = redis.call('DECRBY', KEYS[1 + i], ARGV[i])
+  if left <= 0 then redis.call('DEL', KEYS[1 + i]) end
+end
+return 1
+"""
+
+def _load_stock(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    return dict(db.execute(
+        select(Product.id, Product.stock).where(Product.id.in_(list(product_ids)))
+    ).all())
+
+def _load_held_products(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    product_ids = list(product_ids)
+    stock = _load_stock(db, product_ids)
+    for product_id in product_ids:
+        if product_id not in stock:
+            raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+    return stock
+
+def _not_enough(product_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Not enough stock available for product {product_id}"
+    )
+
+class LocalHoldStore:
+    """
+    In-process holds, used while Redis is unavailable.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels: Dict[int, Tuple[float, int]] = {}  # product -> (expires, stock)
+        self._held: Dict[int, int] = {}
+        self._holds: Dict[str, Dict[str, Any]] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def _level(self, product_id: int, now: float) -> Optional[int]:
+        entry = self._levels.get(product_id)
+        if entry is None or entry[0] < now:
+            return None
+        return entry[1]
+
+    def hold(self, db: Session, hold: Dict[str, Any], quantities: Dict[int, int]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            missing = [product_id for product_id in quantities if self._level(product_id, now) is None]
+        if missing:
+            self.set_levels(_load_held_products(db, missing))
+        with self._lock:
+            for product_id, quantity in quantities.items():
+                level = self._level(product_id, now)
+                if level is None or level - self._held.get(product_id, 0) < quantity:
+                    raise _not_enough(product_id)
+            for product_id, quantity in quantities.items():
+                self._held[product_id] = self._held.get(product_id, 0) + quantity
+            self._holds[hold["id"]] = hold
+            heapq.heappush(self._expiry, (hold["expires_at"], hold["id"]))
+
+    def get(self, hold_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._holds.get(hold_id)
+
+    def release(self, hold_id: str) -> bool:
+        with self._lock:
+            hold = self._holds.pop(hold_id, None)
+            if hold is None:
+                return False
+            for product_id, quantity in hold["items"].items():
+                left = self._held.get(product_id, 0) - quantity
+                if left > 0:
+                    self._held[product_id] = left
+                else:
+                    self._held.pop(product_id, None)
+            return True
+
+    def set_levels(self, stock: Dict[int, int]) -> None:
+        expires = time.monotonic() + settings.STOCK_LEVEL_TTL
+        with self._lock:
+            for product_id, level in stock.items():
+                self._levels[product_id] = (expires, level)
+
+    def availability(self, product_ids: List[int]) -> Dict[int, Tuple[Optional[int], int]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                product_id: (self._level(product_id, now), self._held.get(product_id, 0))
+                for product_id in product_ids
+            }
+
+    def invalidate_levels(self, product_ids: Iterable[int]) -> None:
+        with self._lock:
+            for product_id in product_ids:
+                self._levels.pop(product_id, None)
+
+    def sweep(self, now: float) -> int:
+        expired = []
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry)[1])
+        return sum(self.release(hold_id) for hold_id in expired)
+
+class RedisHoldStore:
+    """
+    Holds shared by all workers. Taking and releasing a hold are Lua
+    scripts, so the check and the increments are atomic.
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def hold(self, db: Session, hold: Dict[str, Any], quantities: Dict[int, int]) -> None:
+        product_ids = list(quantities)
+        keys = [HOLD_KEY.format(hold["id"]), EXPIRY_KEY]
+        for product_id in product_ids:
+            keys += [LEVEL_KEY.format(product_id), HELD_KEY.format(product_id)]
+        args = [hold["id"], int(hold["expires_at"] * 1000), json.dumps(hold)]
+        args += [quantities[product_id] for product_id in product_ids]
+        for _ in range(2):
+            status, index = self.client.eval(_HOLD_SCRIPT, len(keys), *keys, *args)
+            if status == 1:
+                return
+            if status == 0:
+                raise _not_enough(product_ids[index - 1])
+            # Cache missing stock levels and try once more
+            self.set_levels(_load_held_products(db, product_ids))
+        raise _not_enough(product_ids[index - 1])
+
+    def get(self, hold_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(HOLD_KEY.format(hold_id))
+        if raw is None:
+            return None
+        hold = json.loads(raw)
+        hold["items"] = {int(product_id): quantity for product_id, quantity in hold["items"].items()}
+        return hold
+
+    def release(self, hold_id: str) -> bool:
+        hold = self.get(hold_id)
+        if hold is None:
+            self.client.zrem(EXPIRY_KEY, hold_id)
+            return False
+        keys = [HOLD_KEY.format(hold_id), EXPIRY_KEY]
+        keys += [HELD_KEY.format(product_id) for product_id in hold["items"]]
+        args = [hold_id, *hold["items"].values()]
+        return bool(self.client.eval(_RELEASE_SCRIPT, len(keys), *keys, *args))
+
+    def set_levels(self, stock: Dict[int, int]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for product_id, level in stock.items():
+            # NX: a level dropped by a concurrent write stays dropped
+            pipe.set(LEVEL_KEY.format(product_id), level, nx=True, ex=settings.STOCK_LEVEL_TTL)
+        pipe.execute()
+
+    def availability(self, product_ids: List[int]) -> Dict[int, Tuple[Optional[int], int]]:
+        keys = [LEVEL_KEY.format(product_id) for product_id in product_ids]
+        keys += [HELD_KEY.format(product_id) for product_id in product_ids]
+        values = self.client.mget(keys)
+        count = len(product_ids)
+        return {
+            product_id: (
+                None if values[i] is None else int(values[i]),
+                int(values[count + i] or 0),
+            )
+            for i, product_id in enumerate(product_ids)
+        }
+
+    def invalidate_levels(self, product_ids: Iterable[int]) -> None:
+        keys = [LEVEL_KEY.format(product_id) for product_id in product_ids]
+        if keys:
+            self.client.delete(*keys)
+
+    def sweep(self, now: float) -> int:
+        expired = self.client.zrangebyscore(EXPIRY_KEY, "-inf", int(now * 1000), start=0, num=SWEEP_BATCH)
+        return sum(self.release(hold_id.decode() if isinstance(hold_id, bytes) else hold_id) for hold_id in expired)
+
+local_holds = LocalHoldStore()
+
+def _redis_store() -> Optional[RedisHoldStore]:
+    client = available_redis()
+    return RedisHoldStore(client) if client is not None else None
+
+def _store_for(hold_id: str):
+    if hold_id.startswith(REDIS_PREFIX):
+        return _redis_store()
+    if hold_id.startswith(LOCAL_PREFIX):
+        return local_holds
+    return None
+
+def create_hold(db: Session, user_id: int, quantities: Dict[int, int]) -> Dict[str, Any]:
+    """
+    Hold ``quantities`` (product id -> units) for STOCK_HOLD_TTL seconds, or
+    raise 409 if any product lacks available stock. Nothing is held then.
+    """
+    hold = {
+        "user_id": user_id,
+        "items": quantities,
+        "expires_at": time.time() + settings.STOCK_HOLD_TTL,
+    }
+    store = _redis_store()
+    if store is not None:
+        hold["id"] = f"{REDIS_PREFIX}{uuid.uuid4().hex}"
+        try:
+            store.hold(db, hold, quantities)
+            return hold
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    hold["id"] = f"{LOCAL_PREFIX}{uuid.uuid4().hex}"
+    local_holds.hold(db, hold, quantities)
+    return hold
+
+def get_hold(hold_id: str) -> Optional[Dict[str, Any]]:
+    store = _store_for(hold_id)
+    if store is None:
+        return None
+    try:
+        hold = store.get(hold_id)
+    except redis.RedisError as e:
+        mark_redis_down(e)
+        return None
+    if hold is None or hold["expires_at"] < time.time():
+        return None
+    return hold
+
+def release_hold(hold_id: str) -> bool:
+    """
+    Give the held units back. Used both when an order converts the hold and
+    when checkout is abandoned.
+    """
+    store = _store_for(hold_id)
+    if store is None:
+        return False
+    try:
+        return store.release(hold_id)
+    except redis.RedisError as e:
+        # The sweeper releases it once Redis is back
+        mark_redis_down(e)
+        return False
+
+def invalidate_stock_levels(product_ids: Iterable[int]) -> None:
+    """
+    Drop cached stock levels after ``products.stock`` changed.
+    """
+    product_ids = list(product_ids)
+    local_holds.invalidate_levels(product_ids)
+    store = _redis_store()
+    if store is not None:
+        try:
+            store.invalidate_levels(product_ids)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+
+def stock_availability(db: Session, product_ids: List[int]) -> List[Dict[str, int]]:
+    """
+    Stock, held and available-to-sell units per product. Served from the
+    hold store; the products table is only read for levels not cached.
+    """
+    store = _redis_store() or local_holds
+    try:
+        levels = store.availability(product_ids)
+    except redis.RedisError as e:
+        mark_redis_down(e)
+        store = local_holds
+        levels = store.availability(product_ids)
+    missing = [product_id for product_id, (level, _) in levels.items() if level is None]
+    if missing:
+        loaded = _load_stock(db, missing)
+        try:
+            store.set_levels(loaded)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+        levels.update({
+            product_id: (loaded[product_id], levels[product_id][1]) for product_id in loaded
+        })
+    return [
+        {"product_id": product_id, "stock": level, "held": held, "available": max(0, level - held)}
+        for product_id, (level, held) in levels.items()
+        if level is not None
+    ]
+
+def sweep_expired_holds() -> int:
+    now = time.time()
+    released = local_holds.sweep(now)
+    store = _redis_store()
+    if store is not None:
+        try:
+            released += store.sweep(now)
+        except redis.RedisError as e:
+            mark_redis_down(e)
+    return released
+
+_stop_sweeper = threading.Event()
+
+def _sweep_loop() -> None:
+    while not _stop_sweeper.wait(settings.STOCK_HOLD_SWEEP_INTERVAL):
+        try:
+            released = sweep_expired_holds()
+            if released:
+                logger.info("Released %s expired stock holds", released)
+        except Exception:
+            logger.exception("Stock hold sweep failed")
+
+def start_hold_sweeper() -> None:
+    threading.Thread(target=_sweep_loop, name="stock-hold-sweeper", daemon=True).start()
+
+def stop_hold_sweeper() -> None:
+    _stop_sweeper.set()
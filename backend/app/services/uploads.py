@@ -0,0 +1,219 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from typing import BinaryIO, Optional
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.models.import_job import ImportJob
+from app.models.upload import UploadPart, UploadSession, UploadStatus
+from app.services.import_jobs import create_import_job, spool_path, start_import_job
+
+settings = get_settings()
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+def _checksum(value: str) -> str:
+    value = value.strip().lower()
+    if not _SHA256_RE.match(value):
+        raise HTTPException(status_code=400, detail="Checksum must be a hex-encoded SHA-256")
+    return value
+
+def _session_dir(upload: UploadSession) -> str:
+    return os.path.join(settings.UPLOAD_DIR, str(upload.id))
+
+def _part_path(upload: UploadSession, number: int) -> str:
+    return os.path.join(_session_dir(upload), f"{number:06d}.part")
+
+def _discard_parts(upload_id: int) -> None:
+    shutil.rmtree(os.path.join(settings.UPLOAD_DIR, str(upload_id)), ignore_errors=True)
+
+def create_upload(
+    db: Session,
+    *,
+    seller_id: int,
+    filename: str,
+    size: int,
+    sha256: Optional[str] = None,
+    upsert: bool = False,
+) -> UploadSession:
+    if not filename.endswith(('.xlsx', '.csv')):
+        raise HTTPException(
+            status_code=400,
+            detail="Only Excel (.xlsx) and CSV (.csv) files are supported"
+        )
+    if size > settings.UPLOAD_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is larger than {settings.UPLOAD_MAX_SIZE // (1024 * 1024)} MB"
+        )
+    purge_expired_uploads(db)
+    upload = UploadSession(
+        seller_id=seller_id,
+        filename=filename,
+        size=size,
+        part_size=settings.UPLOAD_PART_SIZE,
+        sha256=_checksum(sha256) if sha256 else None,
+        upsert=upsert,
+        status=UploadStatus.UPLOADING,
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.UPLOAD_SESSION_TTL),
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    os.makedirs(_session_dir(upload), exist_ok=True)
+    return upload
+
+def _check_open(upload: UploadSession) -> None:
+    if upload.status != UploadStatus.UPLOADING:
+        raise HTTPException(status_code=409, detail=f"Upload is {upload.status.value}")
+    if upload.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="Upload session expired")
+
+def store_part(db: Session, upload: UploadSession, number: int, file: BinaryIO, checksum: str) -> UploadPart:
+    """
+    Spool one part to disk, verifying its size and SHA-256. Sending a part
+    again replaces it, so a client can retry any part it is unsure about.
+    """
+    _check_open(upload)
+    if not 1 <= number <= upload.part_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Part number must be between 1 and {upload.part_count}"
+        )
+    checksum = _checksum(checksum)
+    expected_size = upload.expected_part_size(number)
+
+    path = _part_path(upload, number)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Concurrent retries of a part each write their own file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while size <= expected_size:
+                data = file.read(COPY_BUFFER_SIZE)
+                if not data:
+                    break
+                digest.update(data)
+                out.write(data)
+                size += len(data)
+        if size != expected_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Part {number} must be {expected_size} bytes"
+            )
+        if digest.hexdigest() != checksum:
+            raise HTTPException(status_code=400, detail=f"Checksum mismatch for part {number}")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    part = db.merge(UploadPart(session_id=upload.id, number=number, size=size, sha256=checksum))
+    # Every received part keeps the session alive
+    upload.expires_at = datetime.utcnow() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    db.commit()
+    return part
+
+def _set_status(db: Session, upload_id: int, old: UploadStatus, new: UploadStatus) -> bool:
+    result = db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id, UploadSession.status == old)
+        .values(status=new, updated_at=datetime.utcnow())
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def complete_upload(db: Session, upload: UploadSession) -> ImportJob:
+    """
+    Concatenate the parts into IMPORT_DIR and queue an import job for the
+    file. The parts are streamed from disk; nothing is held in memory.
+    """
+    _check_open(upload)
+    # Only one request may assemble a session
+    if not _set_status(db, upload.id, UploadStatus.UPLOADING, UploadStatus.ASSEMBLING):
+        db.refresh(upload)
+        raise HTTPException(status_code=409, detail=f"Upload is {upload.status.value}")
+
+    path = None
+    try:
+        received = {
+            number for (number,) in db.query(UploadPart.number).filter(UploadPart.session_id == upload.id)
+        }
+        missing = [number for number in range(1, upload.part_count + 1) if number not in received]
+        if missing:
+            shown = ", ".join(str(number) for number in missing[:20])
+            raise HTTPException(
+                status_code=400,
+                detail=f"Missing parts: {shown}{' ...' if len(missing) > 20 else ''}"
+            )
+
+        path = spool_path(upload.filename)
+        digest = hashlib.sha256()
+        with open(path, "wb") as out:
+            for number in range(1, upload.part_count + 1):
+                with open(_part_path(upload, number), "rb") as part:
+                    while True:
+                        data = part.read(COPY_BUFFER_SIZE)
+                        if not data:
+                            break
+                        digest.update(data)
+                        out.write(data)
+        if upload.sha256 and digest.hexdigest() != upload.sha256:
+            raise HTTPException(status_code=400, detail="Checksum mismatch for the assembled file")
+
+        job = create_import_job(db, path, upload.filename, upload.seller_id, upsert=upload.upsert)
+        upload.status = UploadStatus.COMPLETED
+        upload.import_job_id = job.id
+        db.commit()
+    except BaseException:
+        db.rollback()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        _set_status(db, upload.id, UploadStatus.ASSEMBLING, UploadStatus.UPLOADING)
+        raise
+
+    _discard_parts(upload.id)
+    db.refresh(job)
+    start_import_job(job.id)
+    return job
+
+def abort_upload(db: Session, upload: UploadSession) -> None:
+    if not _set_status(db, upload.id, UploadStatus.UPLOADING, UploadStatus.ABORTED):
+        db.refresh(upload)
+        raise HTTPException(status_code=409, detail=f"Upload is {upload.status.value}")
+    db.query(UploadPart).filter(UploadPart.session_id == upload.id).delete()
+    db.commit()
+    _discard_parts(upload.id)
+
+def purge_expired_uploads(db: Session) -> None:
+    """
+    Abort sessions nobody sent a part to within UPLOAD_SESSION_TTL, and
+    sessions left assembling by a process that died, and delete their parts.
+    """
+    now = datetime.utcnow()
+    expired = [
+        upload_id for (upload_id,) in db.query(UploadSession.id).filter(
+            UploadSession.status.in_([UploadStatus.UPLOADING, UploadStatus.ASSEMBLING]),
+            UploadSession.expires_at < now,
+        )
+    ]
+    if not expired:
+        return
+    db.execute(
+        update(UploadSession)
+        .where(UploadSession.id.in_(expired))
+        .values(status=UploadStatus.ABORTED, updated_at=now)
+    )
+    db.query(UploadPart).filter(UploadPart.session_id.in_(expired)).delete(synchronize_session=False)
+    db.commit()
+    for upload_id in expired:
+        _discard_parts(upload_id)
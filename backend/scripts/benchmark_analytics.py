@@ -0,0 +1,162 @@
+"""
+Latency and query-count regression benchmark for the seller analytics.
+
+Seeds a throwaway database with two years of orders for several sellers
+and builds the daily sales rollups from them, then times
+``seller_analytics`` for each time range and counts the SQL statements it
+issues: once with an empty analytics cache (cold) and then with the
+closed days cached (warm). Exits with status 1 if a cold call needs more
+than two statements, a warm one more than one, or a median latency
+exceeds ``--max-ms``.
+
+    python scripts/benchmark_analytics.py
+    python scripts/benchmark_analytics.py --orders 200000 --max-ms 500
+
+Runs against SQLite in a temporary directory unless
+SQLALCHEMY_DATABASE_URI is set; the database must be empty.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if "SQLALCHEMY_DATABASE_URI" not in os.environ:
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/analytics.db"
+
+from sqlalchemy import event, insert  # noqa: E402
+from app.db.init_db import run_migrations  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.order import Order, OrderItem, OrderStatus  # noqa: E402
+from app.models.product import Category, Product, product_category  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.analytics import TIME_RANGES, invalidate_seller_analytics, seller_analytics  # noqa: E402
+from app.services.sales_rollups import rebuild_rollups  # noqa: E402
+
+SELLERS = 5
+PRODUCTS_PER_SELLER = 200
+BATCH_SIZE = 5000
+
+def seed(orders: int, now: datetime) -> int:
+    """
+    Insert ``orders`` orders of 1-4 items spread over the last two years,
+    and return the id of the seller whose analytics are measured.
+    """
+    rng = random.Random(42)
+    db = SessionLocal()
+    buyer = User(email="buyer@benchmark", hashed_password="x", role=UserRole.BUYER)
+    sellers = [
+        User(email=f"seller{n}@benchmark", hashed_password="x", role=UserRole.SELLER)
+        for n in range(SELLERS)
+    ]
+    db.add_all([buyer, *sellers])
+    db.flush()
+    categories = [Category(name=f"Category {n}", slug=f"category-{n}") for n in range(10)]
+    db.add_all(categories)
+    db.flush()
+
+    products = []
+    for seller in sellers:
+        for n in range(PRODUCTS_PER_SELLER):
+            products.append({
+                "name": f"Part {seller.id}-{n}",
+                "slug": f"part-{seller.id}-{n}",
+                "price": float(rng.randint(100, 10000)),
+                "stock": 1000,
+                "sku": f"SKU-{seller.id}-{n}",
+                "condition": "new",
+                "is_active": True,
+                "seller_id": seller.id,
+                "created_at": now,
+                "updated_at": now,
+            })
+    db.execute(insert(Product), products)
+    product_rows = db.query(Product.id, Product.price, Product.seller_id).all()
+    db.execute(insert(product_category), [
+        {"product_id": row.id, "category_id": rng.choice(categories).id} for row in product_rows
+    ])
+
+    statuses = list(OrderStatus)
+    order_id = 0
+    for offset in range(0, orders, BATCH_SIZE):
+        order_rows, item_rows = [], []
+        for _ in range(min(BATCH_SIZE, orders - offset)):
+            order_id += 1
+            created_at = now - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+            total = 0.0
+            for product in rng.sample(product_rows, rng.randint(1, 4)):
+                quantity = rng.randint(1, 5)
+                total += product.price * quantity
+                item_rows.append({
+                    "order_id": order_id,
+                    "product_id": product.id,
+                    "seller_id": product.seller_id,
+                    "quantity": quantity,
+                    "price": product.price,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            order_rows.append({
+                "id": order_id,
+                "buyer_id": buyer.id,
+                "status": rng.choice(statuses),
+                "total_amount": total,
+                "shipping_address": "Benchmark street 1",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        db.execute(insert(Order), order_rows)
+        db.execute(insert(OrderItem), item_rows)
+    db.commit()
+    rebuild_rollups(db)
+    seller_id = sellers[0].id
+    db.close()
+    return seller_id
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    run_migrations()
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    seller_id = seed(args.orders, now)
+    print(f"seeded {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    failed = False
+    db = SessionLocal()
+    try:
+        for time_range in TIME_RANGES:
+            for label, max_queries, cold in (("cold", 2, True), ("warm", 1, False)):
+                timings = []
+                for _ in range(args.repeat):
+                    if cold:
+                        invalidate_seller_analytics([seller_id])
+                    statements.clear()
+                    started = time.perf_counter()
+                    result = seller_analytics(db, seller_id, time_range, now)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    db.rollback()
+                median = statistics.median(timings)
+                ok = len(statements) <= max_queries and median <= args.max_ms
+                failed = failed or not ok
+                print(
+                    f"{time_range:>5} {label}: {median:8.1f} ms median, {max(timings):8.1f} ms max, "
+                    f"{len(statements)} queries, {result['orders']['total']} orders"
+                    f"{'' if ok else '  REGRESSION'}"
+                )
+    finally:
+        db.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
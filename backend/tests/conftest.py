@@ -0,0 +1,101 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read when the app is first imported: run against a throwaway
+# SQLite database and local storage, without Redis
+_tmp = tempfile.mkdtemp(prefix="marketplace-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_tmp}/test.db"
+os.environ["REDIS_HOST"] = ""
+os.environ["MEDIA_ROOT"] = os.path.join(_tmp, "media")
+os.environ["IMPORT_DIR"] = os.path.join(_tmp, "imports")
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "parts")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.api import deps
+from app.db.init_db import run_migrations
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.services.compatibility import sync_compatibility
+from app.services.search import get_search_backend, index_products
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    run_migrations()
+    get_search_backend(engine).ensure_schema(engine)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+def make_user(db, role: UserRole = UserRole.BUYER) -> User:
+    # Tests share the database, so every user gets a fresh email
+    user = User(email=f"{role.value}-{uuid.uuid4().hex}@example.com", hashed_password="x", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+def make_product(db, seller: User, sku: str = None, **fields) -> Product:
+    sku = sku or f"SKU-{uuid.uuid4().hex[:12]}"
+    product = Product(
+        name=fields.pop("name", f"Part {sku}"), slug=sku.lower(), price=fields.pop("price", 100.0),
+        stock=fields.pop("stock", 5), sku=sku, condition="new", seller_id=seller.id, **fields,
+    )
+    db.add(product)
+    db.flush()
+    sync_compatibility(db, [product])
+    index_products(db, [product.id])
+    db.commit()
+    return product
+
+@pytest.fixture
+def seller(db):
+    return make_user(db, UserRole.SELLER)
+
+@pytest.fixture
+def buyer(db):
+    return make_user(db, UserRole.BUYER)
+
+@pytest.fixture
+def client():
+    """
+    API client; ``client.login(user)`` makes the following requests as
+    ``user``.
+    """
+    test_client = TestClient(app)
+
+    def login(user: User) -> None:
+        def current_user():
+            session = SessionLocal()
+            try:
+                return session.get(User, user.id)
+            finally:
+                session.close()
+        app.dependency_overrides[deps.get_current_user] = current_user
+
+    def place_order(user: User, quantities) -> dict:
+        """
+        Order ``{product: quantity}`` as ``user``; the response's JSON.
+        """
+        login(user)
+        response = test_client.post("/api/v1/orders/", json={
+            "shipping_address": "Test street 1",
+            "items": [
+                {"product_id": product.id, "quantity": quantity, "price": product.price}
+                for product, quantity in quantities.items()
+            ],
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    test_client.login = login
+    test_client.place_order = place_order
+    yield test_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,127 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from conftest import make_product
+from app.db.session import engine
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.services.analytics import period_bounds, seller_analytics
+from app.services.sales_rollups import rebuild_rollups
+
+def test_unknown_time_range_is_rejected(client, seller):
+    client.login(seller)
+    url = f"/api/v1/sellers/{seller.id}/analytics"
+    assert client.get(url, params={"time_range": "decade"}).status_code == 422
+    assert client.get(url, params={"time_range": "month"}).status_code == 200
+
+def add_order(db, buyer, quantities, created_at, status=OrderStatus.PENDING):
+    items = [
+        OrderItem(product_id=product.id, seller_id=product.seller_id, quantity=quantity,
+                  price=product.price, created_at=created_at)
+        for product, quantity in quantities.items()
+    ]
+    order = Order(
+        buyer_id=buyer.id, status=status, shipping_address="Test street 1", created_at=created_at,
+        total_amount=sum(item.price * item.quantity for item in items), items=items,
+    )
+    db.add(order)
+    db.commit()
+    return order
+
+def expected(db, seller_id, time_range):
+    """
+    The dashboard figures aggregated straight from the orders.
+    """
+    prev_start, start, end = period_bounds(time_range)
+    rows = db.query(
+        Order.id, Order.status, Order.created_at, OrderItem.product_id, OrderItem.quantity, OrderItem.price,
+    ).join(OrderItem, OrderItem.order_id == Order.id).filter(OrderItem.seller_id == seller_id).all()
+    days = defaultdict(lambda: [0.0, set()])
+    statuses, quantities, amounts = {}, Counter(), Counter()
+    revenue, prev_revenue = 0.0, 0.0
+    for row in rows:
+        day = row.created_at.date()
+        amount = row.price * row.quantity
+        if prev_start <= day < start:
+            prev_revenue += amount
+        if not start <= day <= end:
+            continue
+        revenue += amount
+        days[day][0] += amount
+        days[day][1].add(row.id)
+        statuses[row.id] = row.status
+        quantities[row.product_id] += row.quantity
+        amounts[row.product_id] += amount
+    by_status = Counter(statuses.values())
+    top = sorted(quantities, key=lambda product_id: (-quantities[product_id], product_id))[:5]
+    return {
+        "sales": [
+            {"date": day.isoformat(), "amount": pytest.approx(amount), "orders": len(orders)}
+            for day, (amount, orders) in sorted(days.items())
+        ],
+        "revenue": pytest.approx(revenue),
+        "growth": pytest.approx((revenue - prev_revenue) / prev_revenue * 100 if prev_revenue else 0.0),
+        "byStatus": {status.value: by_status.get(status, 0) for status in OrderStatus},
+        "topProducts": [
+            {"name": db.get(Product, product_id).name, "sales": quantities[product_id],
+             "revenue": pytest.approx(amounts[product_id])}
+            for product_id in top
+        ],
+    }
+
+def analytics(db, seller_id, time_range="week"):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = seller_analytics(db, seller_id, time_range)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    db.rollback()
+    return result, len(statements)
+
+def assert_matches(db, seller_id, time_range="week"):
+    result, _ = analytics(db, seller_id, time_range)
+    figures = expected(db, seller_id, time_range)
+    assert result["sales"] == figures["sales"]
+    assert result["revenue"]["total"] == figures["revenue"]
+    assert result["revenue"]["growth"] == figures["growth"]
+    assert result["orders"]["byStatus"] == figures["byStatus"]
+    assert result["orders"]["total"] == sum(figures["byStatus"].values())
+    assert result["topProducts"] == figures["topProducts"]
+
+def test_analytics_match_the_orders(client, db, seller, buyer):
+    pump, valve, hose = (make_product(db, seller, price=price, stock=100) for price in (50.0, 20.0, 5.0))
+    now = datetime.utcnow()
+    old = add_order(db, buyer, {pump: 1, valve: 2}, now - timedelta(days=2))
+    add_order(db, buyer, {hose: 3}, now - timedelta(days=5), OrderStatus.DELIVERED)
+    add_order(db, buyer, {pump: 2}, now - timedelta(days=9), OrderStatus.DELIVERED)  # previous week
+    rebuild_rollups(db, seller.id)
+
+    # Closed days cached after the first call, today queried every time
+    for time_range in ("week", "month", "year"):
+        _, cold = analytics(db, seller.id, time_range)
+        _, warm = analytics(db, seller.id, time_range)
+        assert cold <= 2 and warm == 1
+        assert_matches(db, seller.id, time_range)
+
+    # A new order today merges into the cached closed days
+    today = client.place_order(buyer, {valve: 4, hose: 1})
+    assert_matches(db, seller.id)
+    assert analytics(db, seller.id)[1] == 1
+
+    # A status change moves a closed day's order
+    client.login(seller)
+    response = client.post("/api/v1/orders/seller/status", json={"changes": [
+        {"order_id": old.id, "status": "paid"},
+    ]})
+    assert response.json()[0]["success"]
+    assert_matches(db, seller.id)
+
+    # Cancelling today's order
+    client.login(buyer)
+    assert client.post(f"/api/v1/orders/{today['id']}/cancel").status_code == 200
+    assert_matches(db, seller.id)
+    result, _ = analytics(db, seller.id)
+    assert result["orders"]["cancelled"] == 1
@@ -0,0 +1,36 @@
+import uuid
+from conftest import make_product
+from app.services.autocomplete import MAX_SUGGESTIONS, AutocompleteIndex
+
+def test_refresh_matches_a_fresh_build(db, seller):
+    word = f"zx{uuid.uuid4().hex[:6]}"
+    renamed = make_product(db, seller, name=f"{word} pump", brand=f"{word}brand")
+    removed = make_product(db, seller, name=f"{word} valve", brand=f"{word}brand")
+    index = AutocompleteIndex()
+    index.suggest(db, word)
+
+    renamed.name = f"{word} hose"
+    removed.is_active = False
+    db.commit()
+    added = make_product(db, seller, name=f"{word} filter", model=f"{word}model")
+    index.refresh_products(db, [renamed.id, removed.id, added.id])
+
+    fresh = AutocompleteIndex()
+    fresh.suggest(db, word)
+    assert index._keys == fresh._keys
+    assert sorted(s["text"] for s in index.suggest(db, word, 20)) == sorted(
+        [f"{word} hose", f"{word} filter", f"{word}brand", f"{word}model"]
+    )
+
+def test_duplicate_names_do_not_leave_the_list_short(db, seller):
+    word = f"zy{uuid.uuid4().hex[:6]}"
+    # Many products share one popular name; the distinct ones rank below them
+    for _ in range(MAX_SUGGESTIONS * 4):
+        make_product(db, seller, name=f"{word} common")
+    for n in range(MAX_SUGGESTIONS):
+        make_product(db, seller, name=f"{word} distinct {n:02d}")
+
+    suggestions = AutocompleteIndex().suggest(db, word, MAX_SUGGESTIONS)
+    texts = [s["text"] for s in suggestions if s["kind"] == "product"]
+    assert len(texts) == len(set(texts)) == MAX_SUGGESTIONS
+    assert f"{word} common" in texts
@@ -0,0 +1,22 @@
+import time
+import uuid
+from app.models.product import Category
+from app.services import categories
+from app.services.categories import CategoryTreeCache
+
+def test_tree_copy_expires_without_redis(monkeypatch, db):
+    monkeypatch.setattr(categories.settings, "CATEGORY_TREE_LOCAL_TTL", 0.2)
+    cache = CategoryTreeCache()
+    _, etag, loaded_at = cache.validated_categories(db)
+
+    # Reloaded unchanged: same validators
+    time.sleep(0.3)
+    assert cache.validated_categories(db)[1:] == (etag, loaded_at)
+
+    # Written by another worker, which cannot bump a Redis version
+    name = f"Cabins {uuid.uuid4().hex}"
+    db.add(Category(name=name, slug=name.lower().replace(" ", "-")))
+    db.commit()
+    assert name not in [category["name"] for category in cache.categories(db)]
+    time.sleep(0.3)
+    assert name in [category["name"] for category in cache.categories(db)]
@@ -0,0 +1,52 @@
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from app.core import idempotency as idempotency_module
+from app.core.idempotency import LocalIdempotencyStore, idempotency
+
+@pytest.fixture
+def short_lock(monkeypatch):
+    monkeypatch.setattr(idempotency_module.settings, "IDEMPOTENCY_LOCK_TTL", 0.3)
+    monkeypatch.setattr(idempotency_module.settings, "IDEMPOTENCY_WAIT_TIMEOUT", 0.1)
+
+def test_running_request_keeps_its_key_past_the_lock_ttl(short_lock):
+    started, finish = threading.Event(), threading.Event()
+    runs = []
+
+    def first():
+        with idempotency("long", "test", {"n": 1}) as request:
+            runs.append(1)
+            started.set()
+            finish.wait(5)
+            request.save({"ok": True})
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    started.wait(5)
+    time.sleep(1.0)  # several lock TTLs
+    with pytest.raises(HTTPException) as error:
+        with idempotency("long", "test", {"n": 1}):
+            runs.append(2)
+    assert error.value.status_code == 409
+    finish.set()
+    thread.join(5)
+
+    with idempotency("long", "test", {"n": 1}) as request:
+        assert request.replay is not None
+        assert request.replay.headers["Idempotent-Replayed"] == "true"
+    assert runs == [1]
+
+def test_expired_claim_cannot_release_or_complete_a_newer_one(short_lock):
+    store = LocalIdempotencyStore()
+    assert store.claim("key", {"state": "running", "fingerprint": "f", "token": "old"}) is None
+    time.sleep(0.4)
+    assert not store.extend("key", "old")
+    assert store.claim("key", {"state": "running", "fingerprint": "f", "token": "new"}) is None
+
+    store.release("key", "old")
+    store.complete("key", "old", {"state": "done", "fingerprint": "f", "content": None})
+    assert store._get("key")["token"] == "new"
+
+    store.release("key", "new")
+    assert store._get("key") is None
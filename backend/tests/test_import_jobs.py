@@ -0,0 +1,66 @@
+import time
+import uuid
+import pytest
+from app.db.session import SessionLocal
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.product import Category
+from app.services import import_jobs
+from app.services.product_import import ChunkResult
+
+@pytest.fixture
+def job(db, seller):
+    category = Category(name=f"Hydraulics {uuid.uuid4().hex}", slug=f"hydraulics-{uuid.uuid4().hex}")
+    db.add(category)
+    db.commit()
+    sku = f"JOB-{uuid.uuid4().hex[:8]}"
+    csv = f"name,description,price,stock,category_ids,sku\nPump,Gear pump,10,1,{category.id},{sku}\n"
+    path = import_jobs.spool_path("list.csv")
+    with open(path, "w") as file:
+        file.write(csv)
+    job = import_jobs.create_import_job(db, path, "list.csv", seller.id)
+    db.commit()
+    return job
+
+def reload(db, job):
+    db.expire_all()
+    return db.get(ImportJob, job.id)
+
+def test_heartbeat_keeps_a_long_chunk_claimed(monkeypatch, db, job):
+    monkeypatch.setattr(import_jobs.settings, "IMPORT_JOB_STALE_AFTER", 0.3)
+    taken_over = []
+
+    def slow_import(session, file, filename, seller_id, on_chunk=None, **kwargs):
+        time.sleep(1.0)  # several times IMPORT_JOB_STALE_AFTER
+        other = SessionLocal()
+        try:
+            taken_over.append(import_jobs._claim(other, job.id))
+        finally:
+            other.close()
+        on_chunk(0, ChunkResult([], [], 1, {}))
+
+    monkeypatch.setattr(import_jobs, "import_products", slow_import)
+    import_jobs.run_import_job(job.id)
+
+    assert taken_over == [None]
+    job = reload(db, job)
+    assert job.status == ImportJobStatus.COMPLETED
+    assert job.chunks_done == 1
+
+def test_worker_stops_when_its_job_was_taken_over(monkeypatch, db, job):
+    def import_after_takeover(session, file, filename, seller_id, on_chunk=None, **kwargs):
+        other = SessionLocal()
+        try:
+            other.query(ImportJob).filter(ImportJob.id == job.id).update({"claim_token": "other-worker"})
+            other.commit()
+        finally:
+            other.close()
+        on_chunk(0, ChunkResult([], [], 1, {}))
+
+    monkeypatch.setattr(import_jobs, "import_products", import_after_takeover)
+    import_jobs.run_import_job(job.id)
+
+    job = reload(db, job)
+    assert job.status == ImportJobStatus.RUNNING
+    assert job.claim_token == "other-worker"
+    assert job.chunks_done == 0
+    assert job.success_count == 0
@@ -0,0 +1,61 @@
+from conftest import make_product, make_user
+from app.models.order import Order, OrderStatus
+from app.models.product import Product
+from app.models.user import UserRole
+
+def bulk_update(client, seller, changes):
+    client.login(seller)
+    response = client.post("/api/v1/orders/seller/status", json={"changes": changes})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def stock(db, product):
+    db.expire_all()
+    return db.get(Product, product.id).stock
+
+def test_seller_cannot_change_an_order_shared_with_another_seller(client, db, seller, buyer):
+    other = make_user(db, UserRole.SELLER)
+    mine = make_product(db, seller, stock=10)
+    theirs = make_product(db, other, stock=10)
+    order = client.place_order(buyer, {mine: 2, theirs: 3})
+
+    [result] = bulk_update(client, seller, [{"order_id": order["id"], "status": "cancelled"}])
+    assert not result["success"]
+    assert result["status"] == "pending"
+    db.expire_all()
+    assert db.get(Order, order["id"]).status == OrderStatus.PENDING
+    assert stock(db, mine) == 8
+    assert stock(db, theirs) == 7
+
+def test_cancel_releases_stock_once(client, db, seller, buyer):
+    product = make_product(db, seller, stock=10)
+    order = client.place_order(buyer, {product: 4})
+    assert stock(db, product) == 6
+
+    client.login(buyer)
+    assert client.post(f"/api/v1/orders/{order['id']}/cancel").status_code == 200
+    assert client.post(f"/api/v1/orders/{order['id']}/cancel").status_code == 400
+    [result] = bulk_update(client, seller, [{"order_id": order["id"], "status": "cancelled"}])
+    assert result["success"] and result["status"] == "cancelled"
+    assert stock(db, product) == 10
+
+def test_bulk_cancel_releases_stock_once(client, db, seller, buyer):
+    product = make_product(db, seller, stock=10)
+    first = client.place_order(buyer, {product: 2})
+    second = client.place_order(buyer, {product: 3})
+    assert stock(db, product) == 5
+
+    results = bulk_update(client, seller, [
+        {"order_id": first["id"], "status": "cancelled"},
+        {"order_id": second["id"], "status": "paid"},
+    ])
+    assert [result["success"] for result in results] == [True, True]
+    assert stock(db, product) == 7
+
+    # Repeating the request changes nothing; cancelled orders stay cancelled
+    bulk_update(client, seller, [{"order_id": first["id"], "status": "cancelled"}])
+    [result] = bulk_update(client, seller, [{"order_id": first["id"], "status": "paid"}])
+    assert not result["success"]
+    client.login(buyer)
+    assert client.post(f"/api/v1/orders/{first['id']}/cancel").status_code == 400
+    assert stock(db, product) == 7
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+from conftest import make_product
+from app.models.order import Order
+from app.models.product import Product
+from app.services.stock import reserve_stock
+
+def stock(db, product):
+    db.expire_all()
+    return db.get(Product, product.id).stock
+
+def order(client, buyer, quantities):
+    client.login(buyer)
+    return client.post("/api/v1/orders/", json={
+        "shipping_address": "Test street 1",
+        "items": [
+            {"product_id": product.id, "quantity": quantity, "price": product.price}
+            for product, quantity in quantities.items()
+        ],
+    })
+
+def test_order_cannot_take_more_than_the_stock(client, db, seller, buyer):
+    product = make_product(db, seller, stock=3)
+    assert order(client, buyer, {product: 2}).status_code == 200
+    orders = db.query(Order).filter(Order.buyer_id == buyer.id).count()
+
+    response = order(client, buyer, {product: 2})
+    assert response.status_code == 400
+    assert stock(db, product) == 1
+    assert db.query(Order).filter(Order.buyer_id == buyer.id).count() == orders
+
+def test_order_takes_all_products_or_none(client, db, seller, buyer):
+    plenty = make_product(db, seller, stock=10)
+    scarce = make_product(db, seller, stock=1)
+    assert order(client, buyer, {plenty: 4, scarce: 2}).status_code == 400
+    assert (stock(db, plenty), stock(db, scarce)) == (10, 1)
+
+def test_reserve_stock_is_all_or_nothing(db, seller):
+    plenty = make_product(db, seller, stock=10)
+    scarce = make_product(db, seller, stock=1)
+    with pytest.raises(HTTPException) as error:
+        reserve_stock(db, {plenty.id: 4, scarce.id: 2})
+    assert error.value.status_code == 400
+    assert (stock(db, plenty), stock(db, scarce)) == (10, 1)
@@ -0,0 +1,47 @@
+import io
+import uuid
+from PIL import Image
+from app.models.product import Category, Product, ProductImage
+from app.services.product_import import import_products
+
+def price_list(sku, category_id, price, images):
+    rows = [
+        "name,description,price,stock,category_ids,sku,images",
+        f'Filter,Oil filter,{price},5,{category_id},{sku},"{",".join(images)}"',
+    ]
+    return io.BytesIO("\n".join(rows).encode())
+
+def png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_reimport_keeps_uploaded_images(client, db, seller):
+    category = Category(name=f"Filters {uuid.uuid4().hex}", slug=f"filters-{uuid.uuid4().hex}")
+    db.add(category)
+    db.commit()
+    sku = f"IMG-{uuid.uuid4().hex[:8]}"
+    import_products(db, price_list(sku, category.id, 100, ["http://cdn/old.jpg"]), "list.csv", seller.id)
+    product = db.query(Product).filter(Product.sku == sku).one()
+
+    client.login(seller)
+    response = client.post(
+        f"/api/v1/products/{product.id}/images", files={"file": ("photo.png", png(), "image/png")}
+    )
+    assert response.status_code == 200
+    uploaded = db.get(ProductImage, response.json()["id"])
+    stored = (uploaded.url, uploaded.content_hash, uploaded.width, uploaded.height, uploaded.variants)
+    assert uploaded.content_hash and uploaded.variants
+
+    result = import_products(
+        db, price_list(sku, category.id, 120, [uploaded.url, "http://cdn/new.jpg"]), "list.csv",
+        seller.id, upsert=True,
+    )
+    assert result["updated"] == 1
+
+    db.expire_all()
+    images = db.query(ProductImage).filter(ProductImage.product_id == product.id).order_by(ProductImage.id).all()
+    assert [image.url for image in images] == [uploaded.url, "http://cdn/new.jpg"]
+    kept = images[0]
+    assert kept.id == uploaded.id
+    assert (kept.url, kept.content_hash, kept.width, kept.height, kept.variants) == stored
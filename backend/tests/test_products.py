@@ -0,0 +1,42 @@
+import uuid
+from conftest import make_product
+
+def test_compatible_products(client, db, seller):
+    fits = make_product(db, seller, "FIT-1", specifications={"compatibility": ["Komatsu PC200-8"]})
+    make_product(db, seller, "OTHER-1", specifications={"compatibility": ["CAT 320D"]})
+
+    response = client.get("/api/v1/products/compatible", params={"machine": "komatsu pc 200/8"})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [fits.id]
+
+    cached = client.get(
+        "/api/v1/products/compatible",
+        params={"machine": "komatsu pc 200/8"},
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert cached.status_code == 304
+
+def test_compatible_products_require_machine(client):
+    assert client.get("/api/v1/products/compatible").status_code == 400
+
+def test_compatible_products_match_the_whole_model(client, db, seller):
+    pc200 = make_product(db, seller, specifications={"compatibility": ["Komatsu PC200"]})
+    make_product(db, seller, specifications={"compatibility": ["Komatsu PC2000", "Komatsu PC200LC"]})
+
+    response = client.get("/api/v1/products/compatible", params={"machine": "Komatsu PC-200"})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [pc200.id]
+
+def test_list_products_pages_by_keyset(client, db, seller):
+    brand = f"Brand-{uuid.uuid4().hex[:8]}"
+    products = [make_product(db, seller, brand=brand, price=price) for price in (30.0, 10.0, 20.0)]
+
+    params = {"brand": brand, "sort_by": "price", "per_page": 2}
+    first = client.get("/api/v1/products/", params=params)
+    assert first.status_code == 200
+    second = client.get("/api/v1/products/", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+    assert [p["price"] for p in first.json() + second.json()] == [10.0, 20.0, 30.0]
+    assert "X-Next-Cursor" not in second.headers
+
+    searched = client.get("/api/v1/products/", params={"brand": brand, "search": products[0].name})
+    assert [p["id"] for p in searched.json()] == [products[0].id]
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_query_plan_checks_pass():
+    # In a fresh interpreter, as run from the command line: the tests' own
+    # imports would hide a model the module forgets to import
+    result = subprocess.run(
+        [sys.executable, "-m", "app.db.query_plans"],
+        cwd=BACKEND, env=os.environ.copy(), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "FAIL" not in result.stdout
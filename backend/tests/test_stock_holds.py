@@ -0,0 +1,68 @@
+import time
+from conftest import make_product, make_user
+from app.models.product import Product
+from app.services import stock_holds
+from app.services.stock_holds import get_hold, sweep_expired_holds
+
+def available(client, product):
+    response = client.get("/api/v1/products/availability", params={"ids": [product.id]})
+    assert response.status_code == 200
+    return response.json()[0]["available"]
+
+def hold(client, user, quantities):
+    client.login(user)
+    return client.post("/api/v1/orders/holds", json={"items": [
+        {"product_id": product.id, "quantity": quantity} for product, quantity in quantities.items()
+    ]})
+
+def test_held_units_are_not_sold_to_others(client, db, seller, buyer):
+    other = make_user(db)
+    product = make_product(db, seller, stock=3)
+    response = hold(client, buyer, {product: 2})
+    assert response.status_code == 201
+    assert available(client, product) == 1
+
+    assert hold(client, other, {product: 2}).status_code == 409
+    client.login(other)
+    rejected = client.post("/api/v1/orders/", json={
+        "shipping_address": "Test street 1",
+        "items": [{"product_id": product.id, "quantity": 2, "price": product.price}],
+    })
+    assert rejected.status_code == 400
+
+    # The holder converts the hold into an order
+    client.login(buyer)
+    placed = client.post("/api/v1/orders/", json={
+        "shipping_address": "Test street 1",
+        "items": [{"product_id": product.id, "quantity": 2, "price": product.price}],
+        "hold_id": response.json()["id"],
+    })
+    assert placed.status_code == 200
+    assert get_hold(response.json()["id"]) is None
+    db.expire_all()
+    assert db.get(Product, product.id).stock == 1
+    assert available(client, product) == 1
+
+def test_released_hold_gives_its_units_back(client, db, seller, buyer):
+    product = make_product(db, seller, stock=3)
+    hold_id = hold(client, buyer, {product: 3}).json()["id"]
+    assert available(client, product) == 0
+
+    client.login(make_user(db))
+    assert client.delete(f"/api/v1/orders/holds/{hold_id}").status_code == 404  # not the holder's
+    client.login(buyer)
+    assert client.delete(f"/api/v1/orders/holds/{hold_id}").status_code == 200
+    assert available(client, product) == 3
+    assert client.delete(f"/api/v1/orders/holds/{hold_id}").status_code == 404
+
+def test_expired_hold_is_swept(monkeypatch, client, db, seller, buyer):
+    monkeypatch.setattr(stock_holds.settings, "STOCK_HOLD_TTL", 0.2)
+    product = make_product(db, seller, stock=2)
+    hold_id = hold(client, buyer, {product: 2}).json()["id"]
+    assert available(client, product) == 0
+
+    time.sleep(0.3)
+    # Expired holds cannot be converted, even before the sweep
+    assert get_hold(hold_id) is None
+    assert sweep_expired_holds() >= 1
+    assert available(client, product) == 2